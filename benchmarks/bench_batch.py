@@ -0,0 +1,101 @@
+"""
+Benchmark: one /analyze/batch call vs. the same claims sent one by one to /analyze.
+
+    python -m benchmarks.bench_batch [--claims 500] [--unique 300] [--sequential-sample 50] [--max-concurrency 16]
+
+Runs the real graph with the offline fakes of bench_concurrency (hash embeddings, a chat model
+that sleeps, an embedded in-memory Qdrant). The claim file repeats `--unique` distinct claims
+up to `--claims` entries. Sequential audits are timed on the first `--sequential-sample` claims
+and extrapolated to the whole file; each mode starts with an empty verdict cache.
+Results are also written as JSON to benchmarks/results/.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+from benchmarks.bench_concurrency import CLAIMS, DIMENSIONS, RESULTS_DIR, load_graph_modules, seeded_vector_store
+from benchmarks.fakes import FakeChatModel, HashEmbeddings
+
+
+def claim_file(n_claims: int, n_unique: int) -> list:
+    return [f"{CLAIMS[i % len(CLAIMS)]} (member {i % n_unique})" for i in range(n_claims)]
+
+
+async def run(args) -> dict:
+    graph, researcher, auditor = load_graph_modules()
+    researcher.embeddings = HashEmbeddings(DIMENSIONS, args.embed_latency_ms)
+    researcher.vs = await seeded_vector_store(args.points)
+    auditor.fast_llm = FakeChatModel(args.llm_latency_ms)
+    auditor.llm = FakeChatModel(args.llm_latency_ms)
+    claims = claim_file(args.claims, args.unique)
+
+    # Sequential /analyze calls, one graph run per claim
+    graph.verdict_cache = graph.VerdictCache()
+    sample = claims[:args.sequential_sample]
+    embed_calls = researcher.embeddings.calls
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for claim in sample:
+            await graph.audit_claim(claim)
+    sample_seconds = time.perf_counter() - start
+    sequential = {
+        "claims_timed": len(sample),
+        "seconds": round(sample_seconds, 3),
+        "extrapolated_seconds": round(sample_seconds * len(claims) / len(sample), 1),
+        "embed_calls": researcher.embeddings.calls - embed_calls,
+    }
+
+    # One batch call
+    graph.verdict_cache = graph.VerdictCache()
+    embed_calls = researcher.embeddings.calls
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        response = await graph.audit_batch(claims, max_concurrency=args.max_concurrency)
+    batch_seconds = time.perf_counter() - start
+    batch = {
+        "claims": len(claims),
+        "unique_claims": response["unique_claims"],
+        "seconds": round(batch_seconds, 3),
+        "research_ms": response["timings"]["research_ms"],
+        "embed_calls": researcher.embeddings.calls - embed_calls,
+        "in_order": [r["claim_text"] for r in response["results"]] == claims,
+    }
+    return {"sequential": sequential, "batch": batch, "speedup": round(sequential["extrapolated_seconds"] / batch_seconds, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--claims", type=int, default=500)
+    parser.add_argument("--unique", type=int, default=300)
+    parser.add_argument("--sequential-sample", type=int, default=50)
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0)
+    parser.add_argument("--embed-latency-ms", type=float, default=80.0)
+    parser.add_argument("--points", type=int, default=2000, help="Points seeded into the in-memory collection")
+    parser.add_argument("--out", default=RESULTS_DIR)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    sequential, batch = results["sequential"], results["batch"]
+    print(f"sequential: {sequential['claims_timed']} claims in {sequential['seconds']:.2f}s -> ~{sequential['extrapolated_seconds']:.0f}s for {batch['claims']} ({sequential['embed_calls']} embedding calls)")
+    print(f"batch:      {batch['claims']} claims ({batch['unique_claims']} unique) in {batch['seconds']:.2f}s, research {batch['research_ms']:.0f} ms ({batch['embed_calls']} embedding call), in order: {batch['in_order']}")
+    print(f"speedup:    {results['speedup']}x")
+
+    os.makedirs(args.out, exist_ok=True)
+    out_path = os.path.join(args.out, f"batch-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(out_path, "w") as f:
+        json.dump({
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "config": vars(args),
+            "results": results,
+        }, f, indent=2)
+    print(f"📄 Results written to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
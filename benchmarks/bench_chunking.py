@@ -0,0 +1,74 @@
+"""
+Benchmark: TokenChunker vs. the character splitters it replaced, on the bundled policy PDF.
+
+    python -m benchmarks.bench_chunking [--pdf data/policies/...pdf] [--repeat 5]
+
+Reports throughput plus how well each chunker respects the token budget and how much
+text it embeds twice (chunk tokens / source tokens).
+"""
+import argparse
+import glob
+import time
+
+import fitz  # PyMuPDF
+
+from src.ingestion.chunking import TokenChunker, budget_for
+
+
+def legacy_splitters():
+    """The splitters in use before TokenChunker, where their packages are installed."""
+    splitters = {}
+    try:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+        splitters["recursive 1000/100"] = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100).split_text
+        splitters["recursive 800/80"] = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=80).split_text
+    except ImportError:
+        pass
+    try:
+        from llama_index.core.node_parser import SentenceSplitter
+
+        splitters["llama sentence 1000/200"] = SentenceSplitter(chunk_size=1000, chunk_overlap=200).split_text
+    except ImportError:
+        pass
+    return splitters
+
+
+def run(name, split_pages, pages, counter, max_tokens, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        chunks = split_pages(pages)
+    seconds = (time.perf_counter() - start) / repeat
+
+    chunk_tokens = counter.count_tokens(chunks) if chunks else [0]
+    source_tokens = sum(counter.count_tokens(pages))
+    source_mb = sum(len(p.encode("utf-8")) for p in pages) / 1e6
+    over_budget = sum(n > max_tokens for n in chunk_tokens)
+    print(
+        f"{name:<26} {len(chunks):>7} {seconds * 1000:>9.1f} {source_mb / seconds:>8.2f} "
+        f"{max(chunk_tokens):>10} {over_budget:>12} {sum(chunk_tokens) / source_tokens:>11.2f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pdf", default=(glob.glob("data/policies/*.pdf") or [None])[0])
+    parser.add_argument("--collection", default="medicare_protocols")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with fitz.open(args.pdf) as doc:
+        pages = [page.get_text() for page in doc]
+
+    chunker = TokenChunker.for_collection(args.collection)
+    budget = chunker.budget
+    print(f"{args.pdf}: {len(pages)} pages | budget {budget.max_tokens} tokens, overlap {budget.overlap_tokens}")
+    print(f"{'chunker':<26} {'chunks':>7} {'ms/run':>9} {'MB/s':>8} {'max tokens':>10} {'over budget':>12} {'dup ratio':>11}")
+
+    run("TokenChunker", lambda ps: [c for _, c in chunker.iter_chunks(ps)], pages, chunker, budget.max_tokens, args.repeat)
+    for name, split_text in legacy_splitters().items():
+        run(name, lambda ps: [c for p in ps for c in split_text(p)], pages, chunker, budget.max_tokens, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
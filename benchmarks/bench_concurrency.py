@@ -0,0 +1,139 @@
+"""
+Benchmark: concurrent audits on one event loop (one uvicorn worker), sync nodes vs. async nodes.
+
+    python -m benchmarks.bench_concurrency [--levels 1 8 32 128] [--llm-latency-ms 800] [--embed-latency-ms 80]
+
+Runs the real graph (researcher -> auditor -> router) with offline fakes: hash embeddings and
+a chat model that sleep for the given latencies, and an embedded in-memory Qdrant. "sync" is the
+graph as it was: blocking nodes that `ainvoke` runs on the loop's default executor
+(min(32, cpu + 4) threads). "async" awaits every embedding, Qdrant and LLM call.
+For each concurrency level it fires that many audits at once and reports throughput and
+latency percentiles; results are also written as JSON to benchmarks/results/.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.fakes import FakeChatModel, HashEmbeddings, hash_vector
+from src.database.collections import get_schema
+
+RESULTS_DIR = "benchmarks/results"
+COLLECTION_NAME = "medicare_protocols"
+DIMENSIONS = get_schema(COLLECTION_NAME).dimensions
+# Claims without billing codes take the full embed -> vector search -> LLM path
+CLAIMS = [
+    "Is transcranial magnetic stimulation covered for treatment-resistant depression?",
+    "Does Medicare cover continuous glucose monitors for type 2 diabetes?",
+    "Is knee arthroscopy covered for degenerative meniscal tears?",
+    "Are home oxygen concentrators covered for nocturnal hypoxemia?",
+]
+
+
+def load_graph_modules():
+    """Imports the graph the way main.py does, with external services kept offline."""
+    os.environ.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+    os.environ["COVERAGE_TABLE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench_concurrency_"), "coverage.json")
+    os.environ.pop("QDRANT_URL", None)
+    sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+    with contextlib.redirect_stdout(io.StringIO()):
+        from agents import auditor, graph, researcher
+    return graph, researcher, auditor
+
+
+async def seeded_vector_store(n_points: int):
+    from qdrant_client import AsyncQdrantClient, QdrantClient
+    from qdrant_client.models import Batch
+
+    from src.utils.vector_store import MedicalVectorStore
+
+    texts = [f"Policy paragraph {i}: coverage criteria and documentation requirements." for i in range(n_points)]
+    batch = Batch(ids=list(range(n_points)), vectors=[hash_vector(t, DIMENSIONS) for t in texts], payloads=[{"text": t, "source": "bench.pdf"} for t in texts])
+    params = get_schema(COLLECTION_NAME).vectors_config()
+
+    # The embedded sync and async clients keep separate in-memory stores, so seed both
+    client, async_client = QdrantClient(location=":memory:"), AsyncQdrantClient(location=":memory:")
+    client.create_collection(COLLECTION_NAME, vectors_config=params)
+    client.upsert(COLLECTION_NAME, points=batch)
+    await async_client.create_collection(COLLECTION_NAME, vectors_config=params)
+    await async_client.upsert(COLLECTION_NAME, points=batch)
+    return MedicalVectorStore(client=client, async_client=async_client)
+
+
+async def run_level(app, concurrency: int) -> dict:
+    async def one(i: int) -> float:
+        start = time.perf_counter()
+        await app.ainvoke({"messages": [HumanMessage(content=CLAIMS[i % len(CLAIMS)])], "retry_count": 0})
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = sorted(await asyncio.gather(*(one(i) for i in range(concurrency))))
+    wall = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "seconds": round(wall, 3),
+        "audits_per_sec": round(concurrency / wall, 2),
+        "p50_ms": round(1000 * statistics.median(latencies), 1),
+        "p95_ms": round(1000 * latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))], 1),
+    }
+
+
+async def run(args) -> dict:
+    graph, researcher, auditor = load_graph_modules()
+    researcher.embeddings = HashEmbeddings(DIMENSIONS, args.embed_latency_ms)
+    researcher.vs = await seeded_vector_store(args.points)
+    # Confident fake verdicts settle at tier 1; tier 2 is patched too for escalations
+    auditor.fast_llm = FakeChatModel(args.llm_latency_ms)
+    auditor.llm = FakeChatModel(args.llm_latency_ms)
+
+    modes = {"sync": graph.build_workflow(use_async=False), "async": graph.build_workflow(use_async=True)}
+    results = {name: [] for name in modes}
+    for concurrency in args.levels:
+        for name, app in modes.items():
+            # Node logging is per audit; keep it out of the report
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[name].append(await run_level(app, concurrency))
+            row = results[name][-1]
+            print(
+                f"{name:<6} {concurrency:>6} {row['seconds']:>9.2f}s {row['audits_per_sec']:>11.1f} "
+                f"{row['p50_ms']:>10.0f} {row['p95_ms']:>10.0f}"
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0)
+    parser.add_argument("--embed-latency-ms", type=float, default=80.0)
+    parser.add_argument("--points", type=int, default=2000, help="Points seeded into the in-memory collection")
+    parser.add_argument("--out", default=RESULTS_DIR)
+    args = parser.parse_args()
+
+    print(f"Executor threads for sync nodes: {min(32, (os.cpu_count() or 1) + 4)} | LLM {args.llm_latency_ms:.0f} ms, embed {args.embed_latency_ms:.0f} ms")
+    print(f"{'mode':<6} {'audits':>6} {'wall':>10} {'audits/s':>11} {'p50 ms':>10} {'p95 ms':>10}")
+    results = asyncio.run(run(args))
+
+    os.makedirs(args.out, exist_ok=True)
+    out_path = os.path.join(args.out, f"concurrency-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(out_path, "w") as f:
+        json.dump({
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "cpu_count": os.cpu_count(),
+            "config": {"llm_latency_ms": args.llm_latency_ms, "embed_latency_ms": args.embed_latency_ms, "points": args.points},
+            "results": results,
+        }, f, indent=2)
+    print(f"📄 Results written to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
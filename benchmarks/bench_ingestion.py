@@ -0,0 +1,293 @@
+"""
+Offline ingestion benchmark: no OpenAI calls and no Qdrant server.
+
+    python -m benchmarks.bench_ingestion [--copies 4] [--qdrant memory|disk] [--embed-latency-ms 0]
+    python -m benchmarks.bench_ingestion --compare benchmarks/results/ingestion-<previous>.json
+
+Embeddings come from a deterministic hash -> vector fake (benchmarks/fakes.py) and points
+go to an embedded Qdrant, in memory or on disk in a scratch directory. The corpus is the
+bundled policy PDFs, copied `--copies` times with distinct content hashes.
+
+Reports PDF parse, chunk, embed and upsert throughput stage by stage, then runs each loader
+(production_ingest, policy_loader, utils/ingest) end to end in its own process so peak RSS
+is per loader. Results are written as JSON to benchmarks/results/ for comparing runs.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from itertools import islice
+
+from benchmarks.fakes import HashEmbeddings
+
+RESULTS_DIR = "benchmarks/results"
+UPSERT_BATCH_SIZE = 128
+
+# Collection each loader writes; vector sizes come from its registered schema
+LOADER_COLLECTIONS = {
+    "production_ingest": "medicare_protocols",
+    "policy_loader": "medicare_protocols",
+    "utils_ingest": "medicare_protocols",
+}
+
+
+def rate(count: int, seconds: float, unit: str) -> dict:
+    return {"count": count, "unit": unit, "seconds": round(seconds, 4), "per_sec": round(count / seconds, 2) if seconds > 0 else None}
+
+
+def peak_rss_mb(who: int) -> float:
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def qdrant_location(args, workdir: str) -> str:
+    return ":memory:" if args.qdrant == "memory" else os.path.join(workdir, "qdrant")
+
+
+def open_qdrant(location: str, name: str):
+    from qdrant_client import QdrantClient
+
+    if location == ":memory:":
+        return QdrantClient(location=":memory:")
+    return QdrantClient(path=os.path.join(location, name))
+
+
+def build_corpus(pdf_paths: list, copies: int, directory: str) -> list:
+    """Copies each PDF `copies` times; a trailing PDF comment gives every copy its own hash."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for pdf_path in pdf_paths:
+        with open(pdf_path, "rb") as f:
+            data = f.read()
+        stem = os.path.basename(pdf_path).split(".pdf")[0]
+        for i in range(copies):
+            path = os.path.join(directory, f"{stem}_copy{i}.pdf")
+            with open(path, "wb") as f:
+                f.write(data + f"\n%bench-copy-{i}\n".encode())
+            paths.append(path)
+    return paths
+
+
+def bench_stages(paths: list, args, workdir: str) -> dict:
+    """Each stage timed on its own, in this process, over the whole corpus."""
+    import fitz  # PyMuPDF
+    from qdrant_client.models import Batch
+
+    from src.database.collections import get_schema, provision_collection
+    from src.ingestion.chunking import TokenChunker
+    from src.ingestion.embedding_pipeline import EmbeddingPipeline
+    from src.ingestion.manifest import stable_point_id
+
+    start = time.perf_counter()
+    pages = []
+    for path in paths:
+        with fitz.open(path) as doc:
+            pages.extend(page.get_text() for page in doc)
+    parse_s = time.perf_counter() - start
+
+    chunker = TokenChunker.for_collection(args.collection)
+    start = time.perf_counter()
+    chunks = [chunk for _, chunk in chunker.iter_chunks(pages)]
+    chunk_s = time.perf_counter() - start
+
+    dimensions = get_schema(args.collection).dimensions
+    pipeline = EmbeddingPipeline(HashEmbeddings(dimensions, args.embed_latency_ms).embed_documents)
+    start = time.perf_counter()
+    vectors = pipeline.embed(chunks)
+    embed_s = time.perf_counter() - start
+
+    client = open_qdrant(qdrant_location(args, workdir), "stages")
+    provision_collection(client, args.collection)
+    points = iter(zip(chunks, vectors))
+    start = time.perf_counter()
+    offset = 0
+    while batch := list(islice(points, UPSERT_BATCH_SIZE)):
+        client.upsert(
+            collection_name=args.collection,
+            points=Batch(
+                ids=[stable_point_id("bench", offset + i) for i in range(len(batch))],
+                vectors=[vector for _, vector in batch],
+                payloads=[{"text": text} for text, _ in batch],
+            ),
+        )
+        offset += len(batch)
+    upsert_s = time.perf_counter() - start
+    client.close()
+
+    source_mb = sum(os.path.getsize(p) for p in paths) / 1e6
+    return {
+        "parse": {**rate(len(pages), parse_s, "pages"), "mb_per_sec": round(source_mb / parse_s, 2)},
+        "chunk": rate(len(chunks), chunk_s, "chunks"),
+        "embed": {**rate(len(chunks), embed_s, "chunks"), "batches": pipeline.last_stats.batches},
+        "upsert": rate(offset, upsert_s, "points"),
+    }
+
+
+def run_loader(name: str, corpus_dir: str, location: str, embed_latency_ms: float) -> dict:
+    """Runs one loader end to end against the embedded Qdrant (called in a child process)."""
+    from src.database.collections import get_schema
+    from src.ingestion.embedding_pipeline import EmbeddingPipeline
+
+    client = open_qdrant(location, name)
+    # Every loader provisions its collection from the schema registry itself
+    dimensions = get_schema(LOADER_COLLECTIONS[name]).dimensions
+    pipeline = EmbeddingPipeline(HashEmbeddings(dimensions, embed_latency_ms).embed_documents)
+    paths = sorted(glob.glob(os.path.join(corpus_dir, "*.pdf")))
+
+    start = time.perf_counter()
+    if name == "production_ingest":
+        from src.ingestion import production_ingest as loader
+
+        loader.client, loader.pipeline = client, pipeline
+        collection_name = loader.COLLECTION_NAME
+        loader.process_policy_directory(corpus_dir, incremental=False)
+    elif name == "policy_loader":
+        from src.ingestion import policy_loader as loader
+
+        loader.client, loader.pipeline = client, pipeline
+        collection_name = loader.COLLECTION_NAME
+        loader.ingest_medical_policies(paths, "Benchmark", incremental=False)
+    elif name == "utils_ingest":
+        from src.utils import ingest as loader
+        from src.utils.vector_store import MedicalVectorStore
+
+        vs = MedicalVectorStore(client=client)
+        collection_name = vs.default_collection
+        for path in paths:
+            loader.run_ingestion(path, vs=vs, pipeline=pipeline)
+    else:
+        raise ValueError(f"Unknown loader: {name}")
+    seconds = time.perf_counter() - start
+
+    points = client.count(collection_name, exact=True).count
+    client.close()
+    return {
+        **rate(points, seconds, "points"),
+        "files": len(paths),
+        "peak_rss_mb": peak_rss_mb(resource.RUSAGE_SELF),
+        # Largest single child, i.e. the biggest parse worker
+        "peak_child_rss_mb": peak_rss_mb(resource.RUSAGE_CHILDREN),
+    }
+
+
+def spawn_loader(name: str, corpus_dir: str, workdir: str, args) -> dict:
+    """Fresh interpreter per loader, with manifests/caches/coverage table kept in `workdir`."""
+    result_path = os.path.join(workdir, f"{name}.json")
+    loader_dir = os.path.join(workdir, name)
+    env = dict(
+        os.environ,
+        INGEST_MANIFEST_DIR=os.path.join(loader_dir, "manifests"),
+        COVERAGE_TABLE_PATH=os.path.join(loader_dir, "coverage_table.json"),
+        EMBEDDING_CACHE_PATH=os.path.join(loader_dir, "embedding_cache.sqlite3"),
+    )
+    # The loaders build OpenAI clients at import; the fake embedder means no request is ever sent
+    env.setdefault("OPENAI_API_KEY", "sk-offline-benchmark")
+    command = [
+        sys.executable, "-m", "benchmarks.bench_ingestion",
+        "--child", name, "--corpus", corpus_dir, "--location", qdrant_location(args, workdir),
+        "--embed-latency-ms", str(args.embed_latency_ms), "--result", result_path,
+    ]
+    completed = subprocess.run(command, env=env, stdout=None if args.verbose else subprocess.DEVNULL)
+    if completed.returncode != 0:
+        return {"error": f"exit code {completed.returncode}"}
+    with open(result_path) as f:
+        return json.load(f)
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results: dict, previous: dict | None) -> None:
+    def line(label: str, current: dict, before: dict | None):
+        if "error" in current:
+            print(f"  {label:<20} ❌ {current['error']}")
+            return
+        text = f"  {label:<20} {current['count']:>8} {current['unit']:<7} {current['seconds']:>9.3f}s {current['per_sec'] or 0:>10.1f}/s"
+        if "peak_rss_mb" in current:
+            text += f"   peak RSS {current['peak_rss_mb']:.0f} MB (worker {current['peak_child_rss_mb']:.0f} MB)"
+        if before and before.get("per_sec") and current.get("per_sec"):
+            text += f"   {100 * (current['per_sec'] / before['per_sec'] - 1):+.1f}% vs previous"
+        print(text)
+
+    corpus = results["corpus"]
+    print(f"Corpus: {corpus['files']} PDFs, {corpus['mb']} MB | embed latency {results['config']['embed_latency_ms']} ms/request")
+    print("Stages:")
+    for stage, current in results["stages"].items():
+        line(stage, current, (previous or {}).get("stages", {}).get(stage))
+    print("Loaders (end to end):")
+    for loader, current in results["loaders"].items():
+        line(loader, current, (previous or {}).get("loaders", {}).get(loader))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", nargs="+", default=sorted(glob.glob("data/policies/*.pdf")))
+    parser.add_argument("--copies", type=int, default=4, help="Copies of each PDF in the corpus")
+    parser.add_argument("--collection", default="medicare_protocols", help="Chunk budget used by the stage benchmark")
+    parser.add_argument("--qdrant", default="memory", choices=["memory", "disk"], help="Embedded Qdrant storage mode")
+    parser.add_argument("--embed-latency-ms", type=float, default=0.0, help="Simulated per-request embedding latency")
+    parser.add_argument("--loaders", nargs="+", default=list(LOADER_COLLECTIONS), choices=list(LOADER_COLLECTIONS))
+    parser.add_argument("--out", default=RESULTS_DIR)
+    parser.add_argument("--compare", help="A previous results JSON to diff against")
+    parser.add_argument("--verbose", action="store_true", help="Show the loaders' own output")
+    # Internal: run a single loader and write its numbers to --result
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--corpus", help=argparse.SUPPRESS)
+    parser.add_argument("--location", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        with open(args.result, "w") as f:
+            json.dump(run_loader(args.child, args.corpus, args.location, args.embed_latency_ms), f)
+        return
+
+    if not args.pdf:
+        parser.error("No PDFs found; pass --pdf")
+    workdir = tempfile.mkdtemp(prefix="bench_ingestion_")
+    try:
+        corpus_dir = os.path.join(workdir, "corpus")
+        paths = build_corpus(args.pdf, args.copies, corpus_dir)
+        print(f"🧪 Benchmarking ingestion over {len(paths)} PDFs (offline)...")
+        results = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": {"copies": args.copies, "qdrant": args.qdrant, "embed_latency_ms": args.embed_latency_ms},
+            "corpus": {"files": len(paths), "mb": round(sum(os.path.getsize(p) for p in paths) / 1e6, 2)},
+            "stages": bench_stages(paths, args, workdir),
+            "loaders": {name: spawn_loader(name, corpus_dir, workdir, args) for name in args.loaders},
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+    print_report(results, previous)
+
+    os.makedirs(args.out, exist_ok=True)
+    out_path = os.path.join(args.out, f"ingestion-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(out_path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"📄 Results written to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: search response size and client-side deserialization time per query, for the
+old nested payloads fetched whole vs. the compact schema with field projection.
+
+    python -m benchmarks.bench_payload [--points 2000] [--top-k 10] [--queries 200]
+
+Points are seeded into an embedded in-memory Qdrant twice: in the legacy production_ingest
+shape, and migrated with src/database/migrate_payloads.py. Each query's response is
+serialized to the JSON a Qdrant server would send and parsed back into `QueryResponse`, which
+is what the HTTP client does per request. Results are also written as JSON to benchmarks/results/.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from datetime import datetime, timezone
+
+from benchmarks.fakes import hash_vector
+
+RESULTS_DIR = "benchmarks/results"
+DIMENSIONS = 256  # Payload cost does not depend on the vector size
+
+
+def legacy_payload(i: int) -> dict:
+    text = f"Chunk {i}: coverage criteria for CPT 0058T and HCPCS J1234 require documentation of medical necessity. " * 8
+    return {
+        "text": text,
+        "metadata": {"policy_id": "L34555", "jurisdiction": "Palmetto GBA", "document_type": "LCD", "source": f"policy_{i % 40}.pdf"},
+        "page_number": i % 30,
+        "codes": ["0058T", "J1234"],
+    }
+
+
+def measure(client, collection_name: str, queries: list, top_k: int, with_payload) -> dict:
+    from qdrant_client.http.models import QueryResponse
+
+    sizes, parse_ms = [], []
+    for vector in queries:
+        response = client.query_points(collection_name, query=vector, limit=top_k, with_payload=with_payload)
+        raw = QueryResponse(points=response.points).model_dump_json()
+        start = time.perf_counter()
+        QueryResponse.model_validate_json(raw)
+        parse_ms.append(1000 * (time.perf_counter() - start))
+        sizes.append(len(raw))
+    return {"bytes_per_query": round(statistics.mean(sizes)), "parse_ms_per_query": round(statistics.mean(parse_ms), 4)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=2000)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--out", default=RESULTS_DIR)
+    args = parser.parse_args()
+
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import Batch, Distance, VectorParams
+
+    from src.database.migrate_payloads import migrate_collection
+    from src.ingestion.payload_schema import SEARCH_FIELDS
+
+    client = QdrantClient(location=":memory:")
+    batch = Batch(
+        ids=list(range(args.points)),
+        vectors=[hash_vector(f"chunk {i}", DIMENSIONS) for i in range(args.points)],
+        payloads=[legacy_payload(i) for i in range(args.points)],
+    )
+    for name in ("legacy", "compact"):
+        client.create_collection(name, vectors_config=VectorParams(size=DIMENSIONS, distance=Distance.COSINE))
+        client.upsert(name, points=batch)
+    migration = migrate_collection(client, "compact")
+    queries = [hash_vector(f"query {i}", DIMENSIONS) for i in range(args.queries)]
+
+    results = {
+        "legacy_full_payload": measure(client, "legacy", queries, args.top_k, True),
+        "compact_full_payload": measure(client, "compact", queries, args.top_k, True),
+        "compact_projected": measure(client, "compact", queries, args.top_k, SEARCH_FIELDS),
+    }
+    print(f"{'variant':<22} {'bytes/query':>12} {'parse ms/query':>15}")
+    for name, row in results.items():
+        print(f"{name:<22} {row['bytes_per_query']:>12} {row['parse_ms_per_query']:>15.3f}")
+
+    os.makedirs(args.out, exist_ok=True)
+    out_path = os.path.join(args.out, f"payload-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(out_path, "w") as f:
+        json.dump({
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "config": {"points": args.points, "top_k": args.top_k, "queries": args.queries},
+            "migration": migration,
+            "results": results,
+        }, f, indent=2)
+    print(f"📄 Results written to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Offline stand-ins for the paid/remote services the pipelines call, so benchmarks
+measure our code rather than the network.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from types import SimpleNamespace
+from typing import List
+
+import numpy as np
+
+
+def hash_vector(text: str, dimensions: int) -> List[float]:
+    """Deterministic unit vector for `text`: the same text always maps to the same point."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimensions, dtype=np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+class HashEmbeddings:
+    """
+    Drop-in for OpenAIEmbeddings (`embed_documents` / `embed_query`) that never leaves
+    the process. `latency_ms` adds a fixed per-request delay to mimic an API round trip.
+    """
+
+    def __init__(self, dimensions: int = 3072, latency_ms: float = 0.0, model: str = "hash-embedding"):
+        self.dimensions = dimensions
+        self.latency_ms = latency_ms
+        self.model = model
+        self.calls = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return [hash_vector(text, self.dimensions) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return [hash_vector(text, self.dimensions) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+class FakeChatModel:
+    """
+    Stands in for ChatOpenAI (`invoke` / `ainvoke`): waits `latency_ms`, then answers
+    with `content`, by default a passing audit verdict in the auditor's JSON format.
+    """
+
+    def __init__(self, latency_ms: float = 800.0, content: str | None = None):
+        self.latency_ms = latency_ms
+        self.content = content or json.dumps({
+            "faithfulness_score": 0.9,
+            "verdict": "PASS",
+            "supported_claims": 1,
+            "unsupported_claims": 0,
+            "issues": [],
+            "needs_web_search": False,
+            "confidence": 0.9,
+        })
+        self.calls = 0
+
+    def invoke(self, messages, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency_ms / 1000)
+        return SimpleNamespace(content=self.content)
+
+    async def ainvoke(self, messages, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.latency_ms / 1000)
+        return SimpleNamespace(content=self.content)
@@ -1,18 +1,25 @@
 import sys
 import os
+import asyncio
+import time
 
 # ROOT PATH FIX: Ensures sibling directories like 'workflows' are accessible
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from langgraph.graph import StateGraph, END, START
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableLambda
 from workflows.state import AgentState
 from agents.router import routing_logic
-from agents.researcher import researcher_node
-from agents.auditor import auditor_node
-from agents.tavily_search import web_search_node
+from agents.researcher import researcher_node, aresearcher_node, aresearch_batch, COLLECTION_NAME as RESEARCH_COLLECTION
+from agents.auditor import auditor_node, aauditor_node
+from agents.rewriter import rewriter_node
+from agents.tavily_search import web_search_node, aweb_search_node
 
 from langchain_qdrant import QdrantVectorStore
-from langchain_openai import OpenAIEmbeddings
+from src.database.collections import embeddings_for
+from src.ingestion.payload_schema import TEXT_FIELD
+from src.utils.verdict_cache import VerdictCache, normalize_claim, policy_version
 
 # -------------------------
 # 1. Resilient Knowledge Base Initialization
@@ -32,8 +39,9 @@ def get_vectorstore():
     try:
         # Initializing here ensures port 6333 is respected for Cloud
         vs = QdrantVectorStore.from_existing_collection(
-            embedding=OpenAIEmbeddings(),
+            embedding=embeddings_for("pubmed_docs"),
             collection_name="pubmed_docs", 
+            content_payload_key=TEXT_FIELD,
             url=url,
             api_key=api_key,
         )
@@ -49,29 +57,199 @@ vectorstore = get_vectorstore()
 # -------------------------
 # 2. Initialize the State Machine
 # -------------------------
-workflow = StateGraph(AgentState)
-
-# Define nodes
-workflow.add_node("local_research", researcher_node) 
-workflow.add_node("auditor", auditor_node)
-workflow.add_node("web_research", web_search_node)
-workflow.add_node("increment_retry", lambda state: {"retry_count": state.get("retry_count", 0) + 1})
-
-# Build the flow logic
-workflow.add_edge(START, "local_research")
-workflow.add_edge("local_research", "auditor")
-
-workflow.add_conditional_edges(
-    "auditor",
-    routing_logic,
-    {
-        "retry_research": "increment_retry",
-        "tavily_search": "web_research",
-        "finalize": END
-    }
-)
+# Node implementations (sync, async) and edges. Background jobs (src/api/jobs.py) walk the
+# same topology one Inngest step per node.
+NODES = {
+    "local_research": (researcher_node, aresearcher_node),
+    "auditor": (auditor_node, aauditor_node),
+    "web_research": (web_search_node, aweb_search_node),
+    # Retries search several query variants at once instead of repeating the same query
+    "rewriter": (rewriter_node, None),
+}
+EDGES = {"local_research": "auditor", "rewriter": "local_research", "web_research": "auditor"}
+# routing_logic's decision after the auditor -> next node
+ROUTES = {"retry_local": "rewriter", "tavily_search": "web_research", "finalize": END}
+
+def build_workflow(use_async: bool = True, entry: str = "local_research"):
+    """
+    Compiles the audit graph. With `use_async`, each node carries both implementations:
+    `ainvoke` (FastAPI) awaits the async one on the event loop, `invoke` (scripts) runs the
+    sync one. Without it, `ainvoke` pushes the blocking nodes onto executor threads.
+    `entry` is the first node; batch audits start at "auditor" with evidence already in the state.
+    """
+    def node(sync_fn, async_fn):
+        return RunnableLambda(sync_fn, afunc=async_fn) if use_async and async_fn else sync_fn
+
+    workflow = StateGraph(AgentState)
+
+    # Define nodes
+    for name, (sync_fn, async_fn) in NODES.items():
+        workflow.add_node(name, node(sync_fn, async_fn))
+
+    # Build the flow logic
+    workflow.add_edge(START, entry)
+    workflow.add_conditional_edges("auditor", routing_logic, ROUTES)
+    for source, target in EDGES.items():
+        workflow.add_edge(source, target)
+
+    return workflow.compile()
+
+app = build_workflow()
+
+# -------------------------
+# 3. Verdict Cache in front of the graph
+# -------------------------
+verdict_cache = VerdictCache()
+
+def _cacheable(result: dict) -> bool:
+    """Only real verdicts are reused; outages and unparseable LLM output are not."""
+    audit = result.get("audit_result") or {}
+    return (
+        "verdict" in audit
+        and not str(result.get("evidence_text", "")).startswith("ERROR:")
+        and "JSON Parsing Error" not in audit.get("issues", [])
+    )
+
+async def audit_claim(claim_text: str):
+    """
+    Runs one audit through the verdict cache. Repeated or reworded claims against the same
+    policy version are answered from memory without any OpenAI call.
+    Returns (final state, cache tier: "exact" | "semantic" | None).
+    """
+    version = policy_version(RESEARCH_COLLECTION)
+    cached = verdict_cache.get(claim_text, version)
+    if cached is not None:
+        print(f"⚡ Verdict cache hit ({cached[1]})")
+        return cached
+
+    # AgentState.messages is a plain list reducer, so pass a message object rather than a tuple
+    result = await app.ainvoke({"messages": [HumanMessage(content=claim_text)], "retry_count": 0})
+    if _cacheable(result):
+        verdict_cache.put(claim_text, version, result)
+    return result, None
+
+# -------------------------
+# 4. Streaming audits (one event per graph step)
+# -------------------------
+STREAM_NODES = {"local_research", "auditor", "web_research", "rewriter"}
+
+def _step_summary(node: str, update: dict) -> dict:
+    """The part of a node's state update worth showing while the audit runs."""
+    update = update or {}
+    if node == "local_research":
+        return {
+            "chunks": len(update.get("retrieved_docs", [])),
+            "evidence_tokens": update.get("evidence_tokens"),
+            "needs_web_search": update.get("needs_web_search", False),
+        }
+    if node == "auditor":
+        audit = update.get("audit_result") or {}
+        return {key: audit.get(key) for key in ("verdict", "faithfulness_score", "tier", "issues")}
+    if node == "rewriter":
+        return {"query_variants": update.get("query_variants", []), "retry_count": update.get("retry_count")}
+    if node == "web_research":
+        return {"evidence_chars": len(update.get("evidence_text", ""))}
+    return {}
+
+async def stream_audit(claim_text: str):
+    """
+    Async generator over (event, data) pairs for one audit, behind the same verdict cache
+    as `audit_claim`: "step_started" / "step_finished" per node, "token" for each auditor
+    LLM token as it is generated, then "result" with the final state and cache tier.
+    """
+    version = policy_version(RESEARCH_COLLECTION)
+    cached = verdict_cache.get(claim_text, version)
+    if cached is not None:
+        print(f"⚡ Verdict cache hit ({cached[1]})")
+        yield "result", {"result": cached[0], "cache": cached[1]}
+        return
+
+    result = None
+    inputs = {"messages": [HumanMessage(content=claim_text)], "retry_count": 0}
+    async for event in app.astream_events(inputs, version="v2"):
+        kind, name = event["event"], event["name"]
+        node = event.get("metadata", {}).get("langgraph_node")
+        if kind == "on_chain_start" and name in STREAM_NODES and node == name:
+            yield "step_started", {"node": name}
+        elif kind == "on_chain_end" and name in STREAM_NODES and node == name:
+            yield "step_finished", {"node": name, **_step_summary(name, event["data"].get("output"))}
+        elif kind == "on_chat_model_stream" and node == "auditor":
+            chunk = event["data"]["chunk"]
+            if chunk.content:
+                yield "token", {"node": node, "model": event.get("metadata", {}).get("ls_model_name"), "text": chunk.content}
+        elif kind == "on_chain_end" and not event.get("parent_ids"):
+            result = event["data"].get("output")
+
+    if result is not None and _cacheable(result):
+        verdict_cache.put(claim_text, version, result)
+    yield "result", {"result": result, "cache": None}
+
+# -------------------------
+# 5. Batch audits
+# -------------------------
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "16"))
+# Largest /analyze/batch request accepted; bigger claim files go through /jobs or several calls
+BATCH_MAX_CLAIMS = int(os.getenv("BATCH_MAX_CLAIMS", "1000"))
+# Same graph entered at the auditor: retrieval for the whole batch happens up front
+batch_app = build_workflow(entry="auditor")
 
-workflow.add_edge("increment_retry", "local_research")
-workflow.add_edge("web_research", "auditor")
+def _elapsed_ms(started: float) -> float:
+    return round(1000 * (time.perf_counter() - started), 1)
 
-app = workflow.compile()
\ No newline at end of file
+async def audit_batch(claims: list, max_concurrency: int = BATCH_MAX_CONCURRENCY) -> dict:
+    """
+    Audits many claims with shared work: duplicates (same normalized text) are audited once,
+    cached verdicts are reused, and the rest are researched with one embedding call and one
+    Qdrant batch query. The auditor stage (and any retry/web loop) then runs per claim with
+    at most `max_concurrency` in flight. Results come back in input order with timings.
+    """
+    started = time.perf_counter()
+    version = policy_version(RESEARCH_COLLECTION)
+
+    first_seen = {}
+    duplicate_of = [first_seen.setdefault(normalize_claim(claim), i) for i, claim in enumerate(claims)]
+    outcomes, pending = {}, []
+    for i in sorted(first_seen.values()):
+        cached = verdict_cache.get(claims[i], version)
+        if cached is not None:
+            outcomes[i] = {"result": cached[0], "cache": cached[1], "timings": {"audit_ms": 0.0}}
+        else:
+            pending.append(i)
+    print(f"📦 Batch of {len(claims)} claims: {len(first_seen)} unique, {len(outcomes)} cached, {len(pending)} to audit")
+
+    research_started = time.perf_counter()
+    updates = await aresearch_batch([claims[i] for i in pending]) if pending else []
+    research_ms = _elapsed_ms(research_started)
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def audit(i: int, update: dict):
+        queued = time.perf_counter()
+        async with semaphore:
+            began = time.perf_counter()
+            state = {key: value for key, value in update.items() if key in AgentState.__annotations__}
+            state["messages"] = [HumanMessage(content=claims[i])] + update.get("messages", [])
+            state["retry_count"] = 0
+            try:
+                result = await batch_app.ainvoke(state)
+            except Exception as e:
+                print(f"❌ Batch audit failed for claim {i}: {e}")
+                outcomes[i] = {"error": str(e), "cache": None, "timings": {"queued_ms": round(1000 * (began - queued), 1), "audit_ms": _elapsed_ms(began)}}
+                return
+        if _cacheable(result):
+            verdict_cache.put(claims[i], version, result)
+        outcomes[i] = {"result": result, "cache": None, "timings": {"queued_ms": round(1000 * (began - queued), 1), "audit_ms": _elapsed_ms(began)}}
+
+    await asyncio.gather(*(audit(i, update) for i, update in zip(pending, updates)))
+
+    results = []
+    for i, claim in enumerate(claims):
+        first = duplicate_of[i]
+        results.append({"claim_text": claim, "duplicate_of": first if first != i else None, **outcomes[first]})
+    return {
+        "results": results,
+        "timings": {"research_ms": research_ms, "total_ms": _elapsed_ms(started)},
+        "claims": len(claims),
+        "unique_claims": len(first_seen),
+        "cache_hits": len(first_seen) - len(pending),
+    }
@@ -1,8 +1,10 @@
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import AIMessage
 from src.schemas.state import AgentState
+from src.utils.llm_cache import cached_invoke
 
 llm = ChatOpenAI(model="gpt-4o", temperature=0)
+PROMPT_VERSION = "1"
 
 def auditor_node(state: AgentState):
     """
@@ -24,7 +26,7 @@ def auditor_node(state: AgentState):
     Your response must begin with the verdict.
     """
     
-    response = llm.invoke(prompt)
+    response = cached_invoke(llm, prompt, "nodes_auditor", PROMPT_VERSION, validate=lambda answer: answer.upper().lstrip().startswith("VERDICT"))
     content = response.content.upper()
     
     if "VALID" in content:
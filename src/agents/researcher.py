@@ -1,67 +1,120 @@
+import asyncio
+import os
+from collections import Counter
 from langchain_core.messages import AIMessage
-from langchain_openai import OpenAIEmbeddings
+from src.database.collections import embeddings_for, get_schema
 from src.workflows.state import AgentState
-from src.utils.vector_store import MedicalVectorStore
+from src.utils.vector_store import FEDERATED_COLLECTIONS, FederatedQueries, MedicalVectorStore
+from src.utils.embedding_cache import CachedEmbeddings
+from src.ingestion.code_index import extract_codes
 from src.schemas.custom_types import RAGSearchResult
+from src.utils.evidence_packing import chunks_from_result, count_tokens, pack_evidence
+from src.utils.metrics import EVIDENCE_TOKENS
 from langchain_openai import ChatOpenAI
 
+COLLECTION_NAME = "medicare_protocols"
+
 llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
+# Same model/dimensions the loaders wrote with (schema registry); cached so retries
+# and repeat claims skip the embedding round trip
+embeddings = CachedEmbeddings(embeddings_for(COLLECTION_NAME))
 vs = MedicalVectorStore()
 
-COLLECTION_NAME = "medicare_protocols"
+# "retry": also search the other local collections on retries and when the primary one finds
+# nothing (before escalating to the web). "always": every dense search. "off": primary only.
+FEDERATED_SEARCH = os.getenv("FEDERATED_SEARCH", "retry")
+# Embedders for the other federated collections, one per (model, dimensions)
+_embedders = {}
 
-def researcher_node(state: AgentState):
+def _embedder(collection_name: str):
+    if collection_name == COLLECTION_NAME:
+        return embeddings
+    schema = get_schema(collection_name)
+    key = (schema.model, schema.dimensions)
+    if key not in _embedders:
+        _embedders[key] = CachedEmbeddings(schema.embeddings())
+    return _embedders[key]
+
+def _federated_plan(user_claim: str, queries: list, collections: list):
     """
-    Researcher retrieves local policy evidence. 
-    Implements a Circuit Breaker to prevent false denials when DB is down.
+    Texts to search per existing collection (the primary one also gets the rewriter's
+    variants), grouped so each distinct embedding model embeds its texts in one call.
     """
-    user_claim = state["messages"][0].content
-    retry_count = state.get("retry_count", 0)
-    
-    print(f"\n🔍 RESEARCHER (Attempt {retry_count + 1})")
+    plan = {
+        name: (_embedder(name), queries if name == COLLECTION_NAME and len(queries) > 1 else [user_claim])
+        for name in collections
+    }
+    groups = {}
+    for embedder, texts in plan.values():
+        unique = groups.setdefault(id(embedder), (embedder, []))[1]
+        unique.extend(t for t in texts if t not in unique)
+    return plan, list(groups.values())
 
-    # 🛑 THE CIRCUIT BREAKER: Check if Qdrant is alive before searching
-    try:
-        # We ping the vector store to ensure connection
-        vs.client.get_collections() 
-    except Exception as e:
-        print(f"🔥 CRITICAL: Database unreachable ({e}). Switching to Web Escalation.")
-        return {
-            "messages": [AIMessage(content="⚠️ TECHNICAL ERROR: Local Database Offline.")],
-            "evidence_text": "ERROR: DATABASE_OFFLINE",
-            "needs_web_search": True # This triggers the Router to go to Tavily
-        }
+def _federated_queries(plan: dict, groups: list, group_vectors: list) -> FederatedQueries:
+    vectors = {}
+    for (embedder, texts), embedded in zip(groups, group_vectors):
+        vectors.update({(id(embedder), text): vector for text, vector in zip(texts, embedded)})
+    return {name: ([vectors[(id(embedder), t)] for t in texts], texts) for name, (embedder, texts) in plan.items()}
 
-    # Increase recall on retry to catch specific CPT code tables
-    top_k = 10 if retry_count > 0 else 5
-    print(f"   → Searching collection '{COLLECTION_NAME}' (top_k={top_k})...")
-    
-    try:
-        query_vector = embeddings.embed_query(user_claim)
-        search_result: RAGSearchResult = vs.search(
-            query_vector, 
-            top_k=top_k, 
-            collection_name=COLLECTION_NAME
-        )
-    except Exception as e:
-        print(f"❌ Search Execution Failed: {e}")
-        return {"evidence_text": "ERROR: SEARCH_FAILED", "needs_web_search": True}
+def federated_search(user_claim: str, queries: list, top_k: int):
+    # Missing collections are dropped before embedding (collection_info is cached)
+    collections = [name for name in FEDERATED_COLLECTIONS if vs.collection_info(name) is not None]
+    plan, groups = _federated_plan(user_claim, queries, collections)
+    print(f"   → Federated search over {len(plan)} collections ({len(groups)} embedding models, top_k={top_k})...")
+    group_vectors = [embedder.embed_documents(texts) for embedder, texts in groups]
+    return vs.federated_search(_federated_queries(plan, groups, group_vectors), top_k=top_k)
+
+async def afederated_search(user_claim: str, queries: list, top_k: int):
+    infos = await asyncio.gather(*(vs.acollection_info(name) for name in FEDERATED_COLLECTIONS))
+    collections = [name for name, info in zip(FEDERATED_COLLECTIONS, infos) if info is not None]
+    plan, groups = _federated_plan(user_claim, queries, collections)
+    print(f"   → Federated search over {len(plan)} collections ({len(groups)} embedding models, top_k={top_k})...")
+    group_vectors = await asyncio.gather(*(embedder.aembed_documents(texts) for embedder, texts in groups))
+    return await vs.afederated_search(_federated_queries(plan, groups, group_vectors), top_k=top_k)
+
+def _federate(retry_count: int) -> bool:
+    return FEDERATED_SEARCH == "always" or (FEDERATED_SEARCH == "retry" and retry_count > 0)
+
+def _offline_update() -> dict:
+    print(f"🔥 CRITICAL: Database unreachable ({vs.breaker.snapshot()}). Switching to Web Escalation.")
+    return {
+        "messages": [AIMessage(content="⚠️ TECHNICAL ERROR: Local Database Offline.")],
+        "evidence_text": "ERROR: DATABASE_OFFLINE",
+        "needs_web_search": True # This triggers the Router to go to Tavily
+    }
+
+def _render_evidence(evidence: list) -> str:
+    evidence_text = "### LOCAL POLICY EVIDENCE FOUND ###\n\n"
+    for i, (context, source) in enumerate(evidence):
+        evidence_text += f"Source {i+1} [{source}]:\n{context}\n\n"
+    return evidence_text
 
+def _evidence_update(search_result: RAGSearchResult, claim_codes: list, retry_count: int) -> dict:
     if search_result.contexts:
-        # Priority sorting for 'noncovered' keywords
-        combined_evidence = list(zip(search_result.contexts, search_result.sources))
-        combined_evidence.sort(key=lambda x: ("noncovered" in x[0].lower() or "cpt" in x[0]), reverse=True)
+        # Packing: overlapping chunks merged, near-duplicates dropped, token budget filled by score
+        packed = pack_evidence(chunks_from_result(search_result))
 
-        evidence_text = "### LOCAL POLICY EVIDENCE FOUND ###\n\n"
-        for i, (context, source) in enumerate(combined_evidence):
-            evidence_text += f"Source {i+1} [{source}]:\n{context}\n\n"
+        # Priority sorting: chunks naming the claim's codes, then 'noncovered' keywords
+        combined_evidence = [(chunk.text, chunk.source) for chunk in packed]
+        combined_evidence.sort(
+            key=lambda x: (any(code in x[0].upper() for code in claim_codes), "noncovered" in x[0].lower()),
+            reverse=True
+        )
+        evidence_text = _render_evidence(combined_evidence)
+
+        raw_text = _render_evidence(zip(search_result.contexts, search_result.sources))
+        tokens_before, tokens_after = count_tokens([raw_text, evidence_text])
+        EVIDENCE_TOKENS.labels("before").observe(tokens_before)
+        EVIDENCE_TOKENS.labels("after").observe(tokens_after)
         
-        print(f"   Found {len(search_result.contexts)} relevant chunks.")
+        print(f"   Found {len(search_result.contexts)} relevant chunks; packed {len(packed)} ({tokens_before} -> {tokens_after} tokens).")
+        if getattr(search_result, "latency_ms", None):
+            print(f"   🌐 Hits per collection: {dict(Counter(search_result.collections))} | latency ms: {search_result.latency_ms}")
         return {
             "messages": [AIMessage(content=evidence_text)],
             "retrieved_docs": [c for c, s in combined_evidence],
             "evidence_text": evidence_text,
+            "evidence_tokens": {"before": tokens_before, "after": tokens_after},
             "retry_count": retry_count
         }
     
@@ -71,4 +124,153 @@ def researcher_node(state: AgentState):
         "retrieved_docs": [],
         "evidence_text": "",
         "needs_web_search": True # Escalate if local search is empty
-    }
\ No newline at end of file
+    }
+
+def researcher_node(state: AgentState):
+    """
+    Researcher retrieves local policy evidence. 
+    Implements a Circuit Breaker to prevent false denials when DB is down.
+    """
+    user_claim = state["messages"][0].content
+    retry_count = state.get("retry_count", 0)
+    
+    print(f"\n🔍 RESEARCHER (Attempt {retry_count + 1})")
+
+    # 🛑 THE CIRCUIT BREAKER: fail fast while recent Qdrant calls are failing or slow.
+    # Reads breaker state only; no extra round trip before the real search.
+    if not vs.is_available():
+        return _offline_update()
+
+    # Increase recall on retry to catch specific CPT code tables
+    top_k = 10 if retry_count > 0 else 5
+    claim_codes = extract_codes(user_claim)
+
+    # Set by the rewriter on retries: several phrasings of the claim
+    queries = state.get("query_variants") or []
+
+    try:
+        search_result: RAGSearchResult = RAGSearchResult(contexts=[], sources=[], scores=[])
+        federated = _federate(retry_count)
+        if federated:
+            # 🌐 FEDERATED: every local collection in parallel, merged into one ranking
+            search_result = federated_search(user_claim, queries, top_k)
+
+        elif len(queries) > 1:
+            # 🔀 MULTI-QUERY: one batched embedding call, one Qdrant round trip, RRF-fused
+            print(f"   → Multi-query search over {len(queries)} variants in '{COLLECTION_NAME}' (top_k={top_k})...")
+            query_vectors = embeddings.embed_documents(queries)
+            search_result = vs.search_many(query_vectors, top_k=top_k, collection_name=COLLECTION_NAME, query_texts=queries, with_vectors=True)
+
+        # ⚡ FAST PATH: exact code lookup, no embedding call
+        elif claim_codes:
+            print(f"   → Looking up codes {claim_codes} in '{COLLECTION_NAME}' code index...")
+            search_result = vs.lookup_codes(claim_codes, top_k=top_k, collection_name=COLLECTION_NAME)
+
+        if not search_result.contexts and not federated:
+            print(f"   → Searching collection '{COLLECTION_NAME}' (top_k={top_k})...")
+            query_vector = embeddings.embed_query(user_claim)
+            # Hybrid: dense + BM25 fused in one query, so codes and policy IDs in the claim still match
+            search_result = vs.search(
+                query_vector, 
+                top_k=top_k, 
+                collection_name=COLLECTION_NAME,
+                query_text=user_claim,
+                # Vectors let evidence packing drop near-duplicate chunks
+                with_vectors=True
+            )
+
+        # The answer may sit in another local collection; look there before the web
+        if not search_result.contexts and not federated and FEDERATED_SEARCH != "off":
+            search_result = federated_search(user_claim, queries, top_k)
+    except Exception as e:
+        print(f"❌ Search Execution Failed: {e}")
+        return {"evidence_text": "ERROR: SEARCH_FAILED", "needs_web_search": True}
+
+    return _evidence_update(search_result, claim_codes, retry_count)
+
+async def aresearcher_node(state: AgentState):
+    """
+    Async `researcher_node`: embedding and Qdrant calls are awaited, so concurrent
+    audits share the event loop instead of queueing for executor threads.
+    """
+    user_claim = state["messages"][0].content
+    retry_count = state.get("retry_count", 0)
+
+    print(f"\n🔍 RESEARCHER (Attempt {retry_count + 1})")
+
+    if not vs.is_available():
+        return _offline_update()
+
+    top_k = 10 if retry_count > 0 else 5
+    claim_codes = extract_codes(user_claim)
+
+    queries = state.get("query_variants") or []
+
+    try:
+        search_result: RAGSearchResult = RAGSearchResult(contexts=[], sources=[], scores=[])
+        federated = _federate(retry_count)
+        if federated:
+            search_result = await afederated_search(user_claim, queries, top_k)
+        elif len(queries) > 1:
+            print(f"   → Multi-query search over {len(queries)} variants in '{COLLECTION_NAME}' (top_k={top_k})...")
+            query_vectors = await embeddings.aembed_documents(queries)
+            search_result = await vs.asearch_many(query_vectors, top_k=top_k, collection_name=COLLECTION_NAME, query_texts=queries, with_vectors=True)
+        elif claim_codes:
+            print(f"   → Looking up codes {claim_codes} in '{COLLECTION_NAME}' code index...")
+            search_result = await vs.alookup_codes(claim_codes, top_k=top_k, collection_name=COLLECTION_NAME)
+
+        if not search_result.contexts and not federated:
+            print(f"   → Searching collection '{COLLECTION_NAME}' (top_k={top_k})...")
+            query_vector = await embeddings.aembed_query(user_claim)
+            search_result = await vs.asearch(query_vector, top_k=top_k, collection_name=COLLECTION_NAME, query_text=user_claim, with_vectors=True)
+
+        if not search_result.contexts and not federated and FEDERATED_SEARCH != "off":
+            search_result = await afederated_search(user_claim, queries, top_k)
+    except Exception as e:
+        print(f"❌ Search Execution Failed: {e}")
+        return {"evidence_text": "ERROR: SEARCH_FAILED", "needs_web_search": True}
+
+    return _evidence_update(search_result, claim_codes, retry_count)
+
+async def aresearch_batch(claims: list) -> list:
+    """
+    First-attempt research for many claims at once, with the same fallback chain as
+    `aresearcher_node`: exact code lookups first, then one batched embedding call and one
+    `query_batch_points` round trip for the claims still without evidence, then federated
+    search for those that found nothing. Returns one researcher state update per claim,
+    in order. Retries still go through the graph.
+    """
+    print(f"\n🔍 RESEARCHER (batch of {len(claims)} claims)")
+    if not vs.is_available():
+        return [_offline_update() for _ in claims]
+
+    top_k = 5
+    codes = [extract_codes(claim) for claim in claims]
+    empty = RAGSearchResult(contexts=[], sources=[], scores=[])
+    try:
+        if _federate(0):
+            results = list(await asyncio.gather(*(afederated_search(claim, [], top_k) for claim in claims)))
+        else:
+            # ⚡ FAST PATH: exact code lookups, no embedding call
+            results = list(await asyncio.gather(*(
+                vs.alookup_codes(claim_codes, top_k=top_k, collection_name=COLLECTION_NAME) if claim_codes else asyncio.sleep(0, empty)
+                for claim_codes in codes
+            )))
+            pending = [i for i, result in enumerate(results) if not result.contexts]
+            if pending:
+                texts = [claims[i] for i in pending]
+                query_vectors = await embeddings.aembed_documents(texts)
+                batch = await vs.asearch_batch(query_vectors, top_k=top_k, collection_name=COLLECTION_NAME, query_texts=texts, with_vectors=True)
+                for i, result in zip(pending, batch):
+                    results[i] = result
+            # Another local collection may hold the answer; look there before the web
+            missing = [i for i, result in enumerate(results) if not result.contexts]
+            if missing and FEDERATED_SEARCH != "off":
+                found = await asyncio.gather(*(afederated_search(claims[i], [], top_k) for i in missing))
+                for i, result in zip(missing, found):
+                    results[i] = result
+    except Exception as e:
+        print(f"❌ Batch Search Execution Failed: {e}")
+        return [{"evidence_text": "ERROR: SEARCH_FAILED", "needs_web_search": True} for _ in claims]
+
+    return [_evidence_update(result, claim_codes, 0) for claim_codes, result in zip(codes, results)]
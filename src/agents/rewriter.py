@@ -1,18 +1,54 @@
 # src/agents/rewriter.py
-from langchain_core.messages import HumanMessage
+import re
+from typing import List
 from src.workflows.state import AgentState # <--- THE FIX
+from src.ingestion.code_index import extract_codes
+from src.ingestion.conditioning import normalize_medical_terms
+from src.ingestion.coverage_table import POLICY_ID_PATTERN
+
+# Claim wording -> the phrasing LCDs/NCDs actually use
+COVERAGE_SYNONYMS = {
+    "covered": "reasonable and necessary",
+    "cover": "reasonable and necessary",
+    "coverage": "indications and limitations of coverage",
+    "approved": "reasonable and necessary",
+    "denied": "non-covered",
+    "billed": "billing and coding",
+    "bill": "billing and coding",
+}
+SYNONYM_PATTERN = re.compile(r"\b(" + "|".join(COVERAGE_SYNONYMS) + r")\b", flags=re.IGNORECASE)
+
+def expand_queries(user_query: str) -> List[str]:
+    """
+    Query variants searched together in one batch: the claim itself, a code-focused
+    query (codes and policy IDs only), an exclusion-focused one and a synonym-expanded one.
+    """
+    variants = [user_query]
+
+    identifiers = extract_codes(user_query) + sorted(set(POLICY_ID_PATTERN.findall(user_query.upper())))
+    if identifiers:
+        variants.append(f"{' '.join(identifiers)} coverage criteria, billing and coding")
+
+    # We add specific keywords to target the PDF tables we missed
+    variants.append(f"{user_query} policy exclusions and non-covered criteria")
+
+    expanded = SYNONYM_PATTERN.sub(lambda m: f"{m.group(0)} ({COVERAGE_SYNONYMS[m.group(0).lower()]})", normalize_medical_terms(user_query))
+    variants.append(expanded)
+
+    # Keep order, drop duplicates (e.g. nothing to expand)
+    return list(dict.fromkeys(variants))
 
 def rewriter_node(state: AgentState):
     """
-    REWRITER: Takes the failed audit and improves the search query.
+    REWRITER: After a failed audit, replaces the single search query with several variants
+    the researcher embeds in one call and searches in one Qdrant round trip.
     """
-    print("🔄 REWRITER: Refining query based on failed audit...")
+    print("🔄 REWRITER: Expanding query based on failed audit...")
     user_query = state["messages"][0].content
-    
-    # We add specific keywords to target the PDF tables we missed
-    refined_query = f"{user_query} policy exclusions and non-covered criteria"
-    
+    variants = expand_queries(user_query)
+    print(f"   → {len(variants)} query variants")
+
     return {
-        "messages": [HumanMessage(content=refined_query)],
+        "query_variants": variants,
         "retry_count": state.get("retry_count", 0) + 1
-    }
\ No newline at end of file
+    }
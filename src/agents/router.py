@@ -32,6 +32,11 @@ def routing_logic(state: AgentState) -> Literal["retry_local", "tavily_search",
         print(f"   🔄 DECISION: RETRY LOCAL (Triggering Query Refinement)")
         return "retry_local" # Ensure your graph node name matches this
     
+    # Web results were already audited: escalating again would loop tavily -> auditor -> tavily
+    if state.get("web_search_done", False):
+        print("   DECISION: FINALIZE (Web search already used)")
+        return "finalize"
+
     # CASE 3: The "Escalation" Path
     # Local PDF has failed us twice OR the Auditor explicitly asked for Web data.
     print("   🌐 DECISION: ESCALATE TO WEB (Local knowledge base exhausted)")
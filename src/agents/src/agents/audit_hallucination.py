@@ -2,10 +2,12 @@ import os
 from openai import OpenAI
 from qdrant_client import QdrantClient
 from dotenv import load_dotenv
+from src.utils.llm_cache import cached_completion
 
 load_dotenv()
 client = OpenAI()
 qdrant = QdrantClient(url=os.getenv("QDRANT_URL"), api_key=os.getenv("QDRANT_KEY"))
+PROMPT_VERSION = "1"
 
 
 def verify_faithfulness(query, answer, context_chunks):
@@ -30,12 +32,15 @@ def verify_faithfulness(query, answer, context_chunks):
     - Unsupported Claims: [List any specific sentences that aren't in the evidence]
     """
 
-    response = client.chat.completions.create(
+    # Same query/answer/evidence -> cached verdict (temperature 0)
+    return cached_completion(
+        client,
+        "verify_faithfulness",
+        PROMPT_VERSION,
         model="gpt-4o",  # Use a high-reasoning model for auditing
         messages=[{"role": "system", "content": prompt}],
         temperature=0,
     )
-    return response.choices[0].message.content
 
 
 test_query = "Does zinc reduce cold duration?"
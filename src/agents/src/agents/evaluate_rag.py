@@ -1,6 +1,8 @@
 import os, time, json, numpy as np
 from qdrant_client import QdrantClient
-from langchain_openai import OpenAIEmbeddings
+from src.database.collections import embeddings_for
+from src.ingestion.payload_schema import TEXT_FIELD
+from src.utils.llm_cache import cached_completion
 from openai import OpenAI
 from dotenv import load_dotenv
 from tqdm import tqdm
@@ -12,23 +14,29 @@ load_dotenv(root_env)
 
 q_client = QdrantClient(url=os.getenv("QDRANT_URL"), api_key=os.getenv("QDRANT_KEY"))
 o_client = OpenAI()
-embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+embeddings = embeddings_for("pubmed_docs")
+JUDGE_PROMPT_VERSION = "1"
 
 
 def is_semantic_match(query, retrieved_txt, ground_truth):
     """LLM-as-a-Judge: Semantic validation."""
     prompt = f"Query: {query}\nEvidence: {retrieved_txt}\nTruth: {ground_truth}\nDoes the Evidence confirm the Truth? Reply ONLY 'YES' or 'NO'."
-    res = o_client.chat.completions.create(
+    # Re-runs of the evaluation judge the same (query, evidence, truth) triples from the cache
+    content = cached_completion(
+        o_client,
+        "is_semantic_match",
+        JUDGE_PROMPT_VERSION,
         model="gpt-4o-mini",
         messages=[{"role": "system", "content": prompt}],
         max_tokens=2,
         temperature=0,
+        validate=lambda answer: answer.strip().upper() in ("YES", "NO"),
     )
-    return "YES" in res.choices[0].message.content.upper()
+    return "YES" in content.upper()
 
 
 print("📊 Starting Validated Metric Evaluation (n=50)...")
-res = q_client.scroll(collection_name="pubmed_docs", limit=50, with_payload=True)
+res = q_client.scroll(collection_name="pubmed_docs", limit=50, with_payload=[TEXT_FIELD])
 points = res[0]
 
 total_queries = len(points)
@@ -38,7 +46,7 @@ total_retrieved = 0
 search_latencies = []
 
 for point in tqdm(points):
-    ground_truth = point.payload.get("page_content", point.payload.get("text", ""))
+    ground_truth = point.payload.get(TEXT_FIELD, "")
     if not ground_truth:
         continue
 
@@ -47,7 +55,7 @@ for point in tqdm(points):
 
     start = time.time()
     response = q_client.query_points(
-        collection_name="pubmed_docs", query=vector, limit=5, with_payload=True
+        collection_name="pubmed_docs", query=vector, limit=5, with_payload=[TEXT_FIELD]
     )
     search_latencies.append(time.time() - start)
 
@@ -56,7 +64,7 @@ for point in tqdm(points):
 
     for hit in hits:
         total_retrieved += 1
-        retrieved_txt = hit.payload.get("page_content", hit.payload.get("text", ""))
+        retrieved_txt = hit.payload.get(TEXT_FIELD, "")
 
         if is_semantic_match(query_text, retrieved_txt, ground_truth):
             tp_count += 1
@@ -1,56 +1,146 @@
 import os
-import time
-from datasets import load_dataset
+import json
+import hashlib
+import argparse
+from itertools import islice
+from typing import Iterable, Iterator, Optional, Tuple
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
-from langchain_openai import OpenAIEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_qdrant import QdrantVectorStore
 from dotenv import load_dotenv
 from tqdm import tqdm  # For that professional progress bar
+from src.database.collections import embeddings_for, provision_collection
+from src.ingestion.chunking import TokenChunker
+from src.ingestion.embedding_pipeline import EmbeddingPipeline
+from src.ingestion.manifest import stable_point_id
+from src.ingestion.payload_schema import make_payload
+from src.utils.embedding_cache import get_embedding_cache
 
 load_dotenv(os.path.join(os.path.dirname(__file__), "../../../../.env"))
 
 COLLECTION_NAME = "pubmed_docs"
-BATCH_SIZE = 100  # Senior move: Batching prevents API timeouts
+PAPERS_PER_CHECKPOINT = 100  # Progress is made durable after every segment of papers
+UPLOAD_BATCH_SIZE = 64
+UPLOAD_PARALLEL = 4
+CHECKPOINT_PATH = os.getenv("PUBMED_CHECKPOINT_PATH", "data/checkpoints/pubmed_docs.json")
 
-client = QdrantClient(url=os.getenv("QDRANT_URL"), api_key=os.getenv("QDRANT_KEY"))
-embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
 
-client.recreate_collection(
-    collection_name=COLLECTION_NAME,
-    vectors_config=models.VectorParams(size=1536, distance=models.Distance.COSINE),
-    quantization_config=models.ScalarQuantization(
-        scalar=models.ScalarQuantizationConfig(
-            type=models.ScalarType.INT8, quantile=0.99, always_ram=True
+def _iter_articles(source: Optional[str], start: int) -> Iterator[str]:
+    if source is None:
+        from datasets import load_dataset
+
+        dataset = load_dataset("ccdv/pubmed-summarization", "section", split="train", streaming=True)
+        for paper in dataset.skip(start):
+            yield paper.get("article", "")
+    elif source.endswith(".jsonl"):
+        with open(source) as f:
+            lines = (line for line in f if line.strip())
+            for line in islice(lines, start, None):
+                yield json.loads(line).get("article", "")
+    elif source.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        # Read row groups in small batches instead of loading the whole file
+        batches = pq.ParquetFile(source).iter_batches(batch_size=256, columns=["article"])
+        articles = (article or "" for batch in batches for article in batch.column("article").to_pylist())
+        yield from islice(articles, start, None)
+    else:
+        raise ValueError(f"Unsupported PubMed source: {source} (expected .jsonl or .parquet)")
+
+
+def iter_papers(source: Optional[str] = None, start: int = 0) -> Iterator[Tuple[int, str]]:
+    """
+    Streams (paper index, article text) one at a time, beginning at paper `start`.
+    `source` is a local .jsonl/.parquet dump; without one, the HF dataset is
+    streamed so nothing is materialized up front.
+    """
+    return enumerate(_iter_articles(source, start), start=start)
+
+
+def iter_chunks(papers: Iterable[Tuple[int, str]], text_splitter) -> Iterator[Tuple[str, int, int, str]]:
+    """Yields (paper hash, paper index, chunk index, chunk text) lazily."""
+    for paper_idx, article in papers:
+        paper_hash = hashlib.sha256(article.encode("utf-8")).hexdigest()
+        for chunk_idx, chunk in enumerate(text_splitter.split_text(article)):
+            yield paper_hash, paper_idx, chunk_idx, chunk
+
+
+def iter_points(chunks: list, pipeline: EmbeddingPipeline) -> Iterator[models.PointStruct]:
+    """Embeds a segment's chunks in concurrent batches, then yields points one by one."""
+    vectors = pipeline.embed([c[3] for c in chunks])
+    for (paper_hash, paper_idx, chunk_idx, text), vector in zip(chunks, vectors):
+        yield models.PointStruct(
+            # Content-derived IDs make a resumed or repeated load overwrite, never duplicate
+            id=stable_point_id(paper_hash, chunk_idx),
+            vector=vector,
+            # Compact schema; graph.get_vectorstore reads the text via content_payload_key
+            payload=make_payload(text, f"pubmed_{paper_idx}"),
         )
-    ),
-)
-
-print("Starting High-Volume Ingestion (Target: ~25,000+ chunks)...")
-dataset = load_dataset(
-    "ccdv/pubmed-summarization", "section", split="train", streaming=True
-)
-papers = list(dataset.take(500))  # 500 papers ≈ 25k-30k chunks
-
-text_splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=80)
-all_docs = []
-
-for i, paper in enumerate(papers):
-    chunks = text_splitter.split_text(paper.get("article", ""))
-    for chunk in chunks:
-        all_docs.append({"text": chunk, "metadata": {"source": f"pubmed_{i}"}})
-
-print(f"Total Chunks: {len(all_docs)}. Ingesting in batches...")
-for i in tqdm(range(0, len(all_docs), BATCH_SIZE)):
-    batch = all_docs[i : i + BATCH_SIZE]
-    QdrantVectorStore.from_texts(
-        texts=[d["text"] for d in batch],
-        embedding=embeddings,
-        metadatas=[d["metadata"] for d in batch],
-        url=os.getenv("QDRANT_URL"),
-        api_key=os.getenv("QDRANT_KEY"),
-        collection_name=COLLECTION_NAME,
-    )
-
-print(f"SUCCESS: {len(all_docs)} shards live with Optimized Latency.")
+
+
+def load_checkpoint() -> int:
+    if not os.path.exists(CHECKPOINT_PATH):
+        return 0
+    with open(CHECKPOINT_PATH) as f:
+        return json.load(f).get("papers_done", 0)
+
+
+def save_checkpoint(papers_done: int) -> None:
+    os.makedirs(os.path.dirname(CHECKPOINT_PATH), exist_ok=True)
+    tmp_path = f"{CHECKPOINT_PATH}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"papers_done": papers_done}, f)
+    os.replace(tmp_path, CHECKPOINT_PATH)
+
+
+def ensure_collection(client: QdrantClient, recreate: bool) -> None:
+    # INT8 quantization, on-disk originals and HNSW settings live in the schema registry
+    provision_collection(client, COLLECTION_NAME, recreate=recreate)
+
+
+def run_bulk_load(source: Optional[str] = None, limit: Optional[int] = 500, recreate: bool = False) -> int:
+    """
+    Streams papers → chunks → embeddings → Qdrant through one long-lived client,
+    checkpointing after every segment so a failed load restarts where it stopped.
+    """
+    # One client for the whole load; Senior move: no per-batch reconnects
+    client = QdrantClient(url=os.getenv("QDRANT_URL"), api_key=os.getenv("QDRANT_KEY"))
+    pipeline = EmbeddingPipeline.from_langchain(embeddings_for(COLLECTION_NAME), cache=get_embedding_cache())
+    text_splitter = TokenChunker.for_collection(COLLECTION_NAME)
+
+    ensure_collection(client, recreate)
+    papers_done = 0 if recreate else load_checkpoint()
+    if papers_done:
+        print(f"Resuming after {papers_done} papers (checkpoint: {CHECKPOINT_PATH})")
+
+    papers = iter_papers(source, start=papers_done)
+    if limit is not None:
+        papers = islice(papers, max(limit - papers_done, 0))
+    total_chunks = 0
+
+    print("Starting High-Volume Ingestion (streaming, resumable)...")
+    with tqdm(initial=papers_done, total=limit, unit="paper") as progress:
+        while segment := list(islice(papers, PAPERS_PER_CHECKPOINT)):
+            chunks = list(iter_chunks(segment, text_splitter))
+            client.upload_points(
+                collection_name=COLLECTION_NAME,
+                points=iter_points(chunks, pipeline),
+                batch_size=UPLOAD_BATCH_SIZE,
+                parallel=UPLOAD_PARALLEL,
+                wait=True,
+            )
+            papers_done = segment[-1][0] + 1
+            save_checkpoint(papers_done)
+            total_chunks += len(chunks)
+            progress.update(len(segment))
+
+    print(f"SUCCESS: {total_chunks} shards live with Optimized Latency ({papers_done} papers total).")
+    return total_chunks
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream PubMed articles into Qdrant.")
+    parser.add_argument("--source", help="Local .jsonl or .parquet dump (defaults to the HF streaming dataset)")
+    parser.add_argument("--limit", type=int, default=500, help="Stop after this many papers; 0 loads everything")
+    parser.add_argument("--recreate", action="store_true", help="Drop the collection and checkpoint first")
+    args = parser.parse_args()
+    run_bulk_load(args.source, limit=args.limit or None, recreate=args.recreate)
@@ -2,6 +2,28 @@ import os
 from langchain_tavily import TavilySearch
 from langchain_core.messages import ToolMessage
 
+def _web_update(results) -> dict:
+    """
+    State update for the auditor: the web results become the evidence it audits next, and
+    `web_search_done` tells the router not to escalate to the web a second time.
+    """
+    if isinstance(results, dict) and "results" in results:
+        evidence = "\n\n".join(f"[{r.get('url', 'web')}] {r.get('content', '')}" for r in results["results"])
+    else:
+        evidence = str(results)
+    return {
+        "messages": [ToolMessage(content=str(results), tool_call_id="web_search")],
+        "evidence_text": f"WEB SEARCH RESULTS:\n{evidence}" if evidence.strip() else "ERROR: NO_WEB_RESULTS",
+        "web_search_done": True,
+    }
+
+def _missing_key_update() -> dict:
+    return {
+        "messages": [ToolMessage(content="Error: TAVILY_API_KEY not found", tool_call_id="web_search")],
+        "evidence_text": "ERROR: WEB_SEARCH_UNAVAILABLE",
+        "web_search_done": True,
+    }
+
 def web_search_node(state):
     """
     Executes web research via Tavily.
@@ -10,12 +32,26 @@ def web_search_node(state):
     # 1. Verify key ONLY when the node is executed
     tavily_key = os.getenv("TAVILY_API_KEY")
     if not tavily_key:
-        return {"messages": [ToolMessage(content="Error: TAVILY_API_KEY not found", tool_call_id="web_search")]}
+        return _missing_key_update()
 
     # 2. Initialize the tool locally
     search = TavilySearch(max_results=3)
     
-    user_query = state["messages"][-1].content
+    # The claim, not the auditor's last verdict message
+    user_query = state["messages"][0].content
     results = search.invoke(user_query)
     
-    return {"messages": [ToolMessage(content=str(results), tool_call_id="web_search")]}
\ No newline at end of file
+    return _web_update(results)
+
+async def aweb_search_node(state):
+    """Async `web_search_node` using Tavily's async client."""
+    tavily_key = os.getenv("TAVILY_API_KEY")
+    if not tavily_key:
+        return _missing_key_update()
+
+    search = TavilySearch(max_results=3)
+
+    user_query = state["messages"][0].content
+    results = await search.ainvoke(user_query)
+
+    return _web_update(results)
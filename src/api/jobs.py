@@ -0,0 +1,335 @@
+"""
+Durable background audits on Inngest.
+
+POST /jobs sends an "audit/claim.submitted" event and returns a job ID at once. The Inngest
+function below runs the audit graph one retried step per node (research, auditor, rewriter,
+web research), under per-function concurrency and throttle limits, and records progress in
+a SQLite job store that GET /jobs/{id} reads. An optional `webhook_url` receives the finished
+job. With JOBS_EXECUTOR=local the same function runs in-process (`LocalExecutor`), so jobs
+work without the Inngest dev server.
+"""
+import asyncio
+import datetime
+import ipaddress
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from types import SimpleNamespace
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+import inngest
+from langchain_core.messages import HumanMessage, messages_from_dict, messages_to_dict
+from langgraph.graph import END
+
+from agents.graph import EDGES, NODES, ROUTES, RESEARCH_COLLECTION, _cacheable, verdict_cache
+from agents.router import routing_logic
+from workflows.state import AgentState
+from src.utils.verdict_cache import policy_version
+
+JOB_EVENT = "audit/claim.submitted"
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", "data/audit_jobs.sqlite3")
+JOBS_CONCURRENCY = int(os.getenv("JOBS_CONCURRENCY", "8"))
+JOBS_THROTTLE_LIMIT = int(os.getenv("JOBS_THROTTLE_LIMIT", "60"))
+JOBS_THROTTLE_PERIOD_SECONDS = int(os.getenv("JOBS_THROTTLE_PERIOD_SECONDS", "60"))
+JOBS_STEP_RETRIES = int(os.getenv("JOBS_STEP_RETRIES", "3"))
+# Same bound as LangGraph's default recursion limit
+JOBS_MAX_STEPS = 25
+# "inngest": events go to the Inngest server (docker-compose sets INNGEST_DEV); "local": in-process
+JOBS_EXECUTOR = os.getenv("JOBS_EXECUTOR", "inngest" if os.getenv("INNGEST_DEV") or os.getenv("INNGEST_SIGNING_KEY") else "local")
+# Comma-separated hosts webhooks may be sent to ("example.com" also allows its subdomains);
+# empty allows any public host. Private, loopback and link-local addresses are always refused.
+JOBS_WEBHOOK_ALLOWED_HOSTS = [h.strip().lower() for h in os.getenv("JOBS_WEBHOOK_ALLOWED_HOSTS", "").split(",") if h.strip()]
+
+
+class WebhookNotAllowedError(ValueError):
+    """A job's webhook_url points somewhere the server must not send requests."""
+
+
+async def check_webhook_url(url: str) -> None:
+    """
+    Refuses webhook targets that would let a caller reach internal services through the
+    server (Qdrant, cloud metadata, localhost): non-HTTP schemes, hosts outside
+    JOBS_WEBHOOK_ALLOWED_HOSTS, and any host resolving to a non-public address.
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.scheme not in ("http", "https") or not host:
+        raise WebhookNotAllowedError(f"webhook_url must be an http(s) URL: {url!r}")
+    if JOBS_WEBHOOK_ALLOWED_HOSTS and not any(host == allowed or host.endswith("." + allowed) for allowed in JOBS_WEBHOOK_ALLOWED_HOSTS):
+        raise WebhookNotAllowedError(f"webhook host '{host}' is not in JOBS_WEBHOOK_ALLOWED_HOSTS")
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, parts.port or (443 if parts.scheme == "https" else 80))
+    except OSError as e:
+        raise WebhookNotAllowedError(f"webhook host '{host}' does not resolve: {e}")
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if not address.is_global:
+            raise WebhookNotAllowedError(f"webhook host '{host}' resolves to non-public address {address}")
+
+
+class JobStore:
+    """
+    Job status in SQLite, so any API worker can answer a poll for a job that another
+    worker (or the Inngest function) is running.
+    """
+
+    def __init__(self, path: str = JOBS_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                claim_text TEXT NOT NULL,
+                status TEXT NOT NULL,
+                step TEXT,
+                result TEXT,
+                error TEXT,
+                webhook_url TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def create(self, claim_text: str, webhook_url: Optional[str] = None) -> dict:
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, claim_text, status, webhook_url, created_at, updated_at) VALUES (?, ?, 'queued', ?, ?, ?)",
+                (job_id, claim_text, webhook_url, now, now),
+            )
+            self._conn.commit()
+        return self.get(job_id)
+
+    def update(self, job_id: str, **fields) -> None:
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,))
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        job = dict(zip([column[0] for column in cursor.description], row))
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+jobs = JobStore()
+
+# -------------------------
+# State (de)serialization: step inputs and outputs must be JSON
+# -------------------------
+def _dump_state(state: dict) -> dict:
+    return {**state, "messages": messages_to_dict(state.get("messages", []))}
+
+def _load_state(data: dict) -> dict:
+    return {**data, "messages": messages_from_dict(data.get("messages", []))}
+
+def _merge(state: dict, update: dict) -> dict:
+    """Applies a node update the way the graph does: messages append, other keys overwrite."""
+    merged = {**state, **update}
+    merged["messages"] = state.get("messages", []) + update.get("messages", [])
+    return merged
+
+def _summary(state: dict, cache: Optional[str]) -> dict:
+    return {
+        "audit_result": state.get("audit_result"),
+        "evidence_text": state.get("evidence_text", ""),
+        "retry_count": state.get("retry_count", 0),
+        "needs_web_search": state.get("needs_web_search", False),
+        "cache": cache,
+    }
+
+# -------------------------
+# Step bodies (each retried and memoized by the executor)
+# -------------------------
+async def _cached_verdict(job_id: str, claim_text: str) -> Optional[dict]:
+    # SQLite writes go to a worker thread; the event loop keeps serving other audits
+    await asyncio.to_thread(jobs.update, job_id, status="running", step="verdict_cache")
+    cached = verdict_cache.get(claim_text, policy_version(RESEARCH_COLLECTION))
+    return _summary(*cached) if cached is not None else None
+
+async def _run_node(job_id: str, node: str, state_data: dict) -> dict:
+    await asyncio.to_thread(jobs.update, job_id, status="running", step=node)
+    sync_fn, async_fn = NODES[node]
+    state = _load_state(state_data)
+    update = await async_fn(state) if async_fn else sync_fn(state)
+    # Keys outside AgentState are dropped by the graph too
+    return _dump_state({key: value for key, value in update.items() if key in AgentState.__annotations__})
+
+async def _finish(job_id: str, claim_text: str, summary: Optional[dict], state_data: Optional[dict]) -> dict:
+    if summary is None:
+        state = _load_state(state_data)
+        if _cacheable(state):
+            verdict_cache.put(claim_text, policy_version(RESEARCH_COLLECTION), state)
+        summary = _summary(state, None)
+    await asyncio.to_thread(jobs.update, job_id, status="completed", step=None, result=summary)
+    return summary
+
+async def _notify(webhook_url: str, job_id: str) -> int:
+    # Checked again at send time: DNS may have changed since the job was submitted
+    try:
+        await check_webhook_url(webhook_url)
+    except WebhookNotAllowedError as e:
+        raise inngest.NonRetriableError(str(e))
+    async with httpx.AsyncClient(timeout=10, follow_redirects=False) as client:
+        response = await client.post(webhook_url, json=await asyncio.to_thread(jobs.get, job_id))
+        # Non-2xx raises, so the step is retried
+        response.raise_for_status()
+        return response.status_code
+
+# -------------------------
+# The Inngest function
+# -------------------------
+# Production mode needs a signing key; without one (local runs, JOBS_EXECUTOR=local) stay in dev mode
+inngest_client = inngest.Inngest(app_id="clinaudit-ai", is_production=bool(os.getenv("INNGEST_SIGNING_KEY")) and not os.getenv("INNGEST_DEV"))
+
+async def _mark_failed(ctx: inngest.Context) -> None:
+    """on_failure: a step exhausted its retries (or hit the step limit)."""
+    original = ctx.event.data.get("event", {}).get("data", {})
+    error = ctx.event.data.get("error", {}).get("message", "unknown error")
+    if original.get("job_id"):
+        await asyncio.to_thread(jobs.update, original["job_id"], status="failed", error=error)
+
+async def run_audit_job(ctx: inngest.Context) -> dict:
+    """
+    One audit, one step per graph node. Code outside the steps is replayed on every
+    invocation, so routing only reads memoized step outputs.
+    """
+    job_id, claim_text = ctx.event.data["job_id"], ctx.event.data["claim_text"]
+
+    summary = await ctx.step.run("verdict-cache", _cached_verdict, job_id, claim_text)
+    state = {"messages": [HumanMessage(content=claim_text)], "retry_count": 0}
+    if summary is None:
+        node = "local_research"
+        for i in range(JOBS_MAX_STEPS):
+            update = await ctx.step.run(f"{node}-{i}", _run_node, job_id, node, _dump_state(state))
+            state = _merge(state, _load_state(update))
+            node = ROUTES[routing_logic(state)] if node == "auditor" else EDGES[node]
+            if node == END:
+                break
+        else:
+            raise inngest.NonRetriableError(f"Audit did not finish within {JOBS_MAX_STEPS} steps")
+
+    summary = await ctx.step.run("finish", _finish, job_id, claim_text, summary, None if summary else _dump_state(state))
+    if ctx.event.data.get("webhook_url"):
+        await ctx.step.run("webhook", _notify, ctx.event.data["webhook_url"], job_id)
+    return summary
+
+audit_claim_job = inngest_client.create_function(
+    fn_id="audit-claim",
+    trigger=inngest.TriggerEvent(event=JOB_EVENT),
+    retries=JOBS_STEP_RETRIES,
+    concurrency=[inngest.Concurrency(limit=JOBS_CONCURRENCY)],
+    throttle=inngest.Throttle(limit=JOBS_THROTTLE_LIMIT, period=datetime.timedelta(seconds=JOBS_THROTTLE_PERIOD_SECONDS)),
+    on_failure=_mark_failed,
+)(run_audit_job)
+
+functions = [audit_claim_job]
+
+# -------------------------
+# In-process stand-in for the Inngest server
+# -------------------------
+class LocalStep:
+    """`ctx.step` for LocalExecutor: each step is retried in place, then memoized by ID."""
+
+    def __init__(self, retries: int):
+        self.retries = retries
+        self.memo = {}
+
+    async def run(self, step_id: str, handler, *args):
+        if step_id in self.memo:
+            return self.memo[step_id]
+        for attempt in range(self.retries + 1):
+            try:
+                output = await handler(*args)
+                break
+            except inngest.NonRetriableError:
+                raise
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                print(f"⚠️ Job step '{step_id}' failed (attempt {attempt + 1}): {e}; retrying")
+                await asyncio.sleep(min(2 ** attempt, 10))
+        # Round-trip through JSON like Inngest's step memo
+        self.memo[step_id] = json.loads(json.dumps(output))
+        return self.memo[step_id]
+
+
+class LocalExecutor:
+    """
+    Runs `run_audit_job` on the current event loop with the function's concurrency and
+    throttle limits (not durable: queued jobs are lost on restart). For tests and local runs.
+    """
+
+    def __init__(self, concurrency: int = JOBS_CONCURRENCY, throttle_limit: int = JOBS_THROTTLE_LIMIT,
+                 throttle_period: float = JOBS_THROTTLE_PERIOD_SECONDS, retries: int = JOBS_STEP_RETRIES):
+        self.concurrency = concurrency
+        self.throttle_limit = throttle_limit
+        self.throttle_period = throttle_period
+        self.retries = retries
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._throttle_lock: Optional[asyncio.Lock] = None
+        self._starts = deque()
+        self._tasks = set()
+
+    async def _throttle(self):
+        async with self._throttle_lock:
+            while len(self._starts) >= self.throttle_limit:
+                wait = self._starts[0] + self.throttle_period - time.monotonic()
+                if wait <= 0:
+                    self._starts.popleft()
+                else:
+                    await asyncio.sleep(wait)
+            self._starts.append(time.monotonic())
+
+    async def _run(self, event: inngest.Event):
+        await self._throttle()
+        async with self._semaphore:
+            ctx = SimpleNamespace(event=event, step=LocalStep(self.retries), attempt=0, run_id=uuid.uuid4().hex)
+            try:
+                await run_audit_job(ctx)
+            except Exception as e:
+                print(f"❌ Job {event.data.get('job_id')} failed: {e}")
+                await _mark_failed(SimpleNamespace(event=inngest.Event(name="inngest/function.failed", data={"event": event.model_dump(), "error": {"message": str(e)}})))
+
+    async def send(self, event: inngest.Event) -> list:
+        if self._semaphore is None:
+            self._semaphore, self._throttle_lock = asyncio.Semaphore(self.concurrency), asyncio.Lock()
+        task = asyncio.create_task(self._run(event))
+        # Keep a reference until it finishes (the loop only holds weak ones)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return [event.id]
+
+
+executor = LocalExecutor() if JOBS_EXECUTOR == "local" else inngest_client
+
+async def submit_job(claim_text: str, webhook_url: Optional[str] = None) -> dict:
+    """Raises WebhookNotAllowedError before anything is queued."""
+    if webhook_url:
+        await check_webhook_url(webhook_url)
+    job = await asyncio.to_thread(jobs.create, claim_text, webhook_url)
+    await executor.send(inngest.Event(name=JOB_EVENT, id=job["job_id"], data={"job_id": job["job_id"], "claim_text": claim_text, "webhook_url": webhook_url}))
+    return job
@@ -1,3 +1,5 @@
+import json
+
 import streamlit as st
 import requests
 
@@ -8,22 +10,58 @@ st.subheader("Agentic Healthcare Verification")
 
 user_input = st.text_area("Enter a medical statement to verify:", height=100)
 
+STEP_LABELS = {
+    "local_research": "Researcher searching Qdrant",
+    "auditor": "Auditor verifying",
+    "rewriter": "Rewriting the query for a retry",
+    "web_research": "Escalating to web search",
+}
+
+def sse_events(response):
+    """Yields (event, data) from a text/event-stream response."""
+    event = None
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: ") and event:
+            yield event, json.loads(line[len("data: "):])
+            event = None
+
 if st.button("Run Audit"):
     if user_input:
-        with st.spinner("Researcher searching Qdrant... Auditor verifying..."):
-            try:
-                # Calls your FastAPI main.py
-                res = requests.post("http://localhost:8001/analyze", params={"claim": user_input})
-                data = res.json()
-                
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.info("Researcher Findings")
-                    st.write(data["analysis"])
-                
-                with col2:
-                    st.success("Audit Results")
-                    status = "CLEAN" if data["audit_passed"] else "❌ FLAG FOR REVISION"
-                    st.metric("Final Status", status)
-            except Exception as e:
-                st.error("Is your FastAPI backend running? Run 'uv run python src/main.py' first.")
\ No newline at end of file
+        col1, col2 = st.columns(2)
+        with col1:
+            st.info("Researcher Findings")
+            steps = st.container()
+        with col2:
+            st.success("Audit Results")
+            verdict_box = st.empty()
+            status_box = st.empty()
+
+        try:
+            # Calls your FastAPI main.py; each graph step shows up as soon as it finishes
+            res = requests.post("http://localhost:8001/analyze/stream", json={"claim_text": user_input}, stream=True)
+            verdict_text, verdict_model = "", None
+            for event, data in sse_events(res):
+                if event == "step_started":
+                    steps.write(f"⏳ {STEP_LABELS.get(data['node'], data['node'])}...")
+                    if data["node"] == "auditor":
+                        verdict_text = ""
+                elif event == "step_finished" and data["node"] == "local_research":
+                    steps.write(f"📄 {data['chunks']} evidence chunks found")
+                elif event == "token":
+                    # A new model means the auditor escalated; show the deciding answer only
+                    if data["model"] != verdict_model:
+                        verdict_text, verdict_model = "", data["model"]
+                    verdict_text += data["text"]
+                    verdict_box.code(verdict_text, language="json")
+                elif event == "result":
+                    audit = (data["result"] or {}).get("audit_result", {})
+                    status = "CLEAN" if audit.get("verdict") == "PASS" else "❌ FLAG FOR REVISION"
+                    status_box.metric("Final Status", status, help=f"Faithfulness {audit.get('faithfulness_score')}")
+                    if data.get("cache"):
+                        steps.write(f"⚡ Answered from the verdict cache ({data['cache']})")
+                elif event == "error":
+                    st.error(data["error"])
+        except Exception as e:
+            st.error("Is your FastAPI backend running? Run 'uv run python src/main.py' first.")
@@ -0,0 +1,243 @@
+"""
+Declarative schema for every Qdrant collection: which embedding model fills it, at what
+(possibly Matryoshka-truncated) dimension, and how it is stored and indexed.
+
+Loaders provision through here and the API validates against it at startup, so a
+collection can no longer be written with one model and searched with another.
+
+    python -m src.database.collections            # provision/validate every collection
+    python -m src.database.collections --recreate pubmed_docs
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    CollectionInfo,
+    Distance,
+    HnswConfigDiff,
+    PayloadSchemaType,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    VectorParams,
+)
+
+from src.ingestion.code_index import CODES_FIELD
+from src.ingestion.sparse import SPARSE_VECTOR_NAME, sparse_vectors_config
+
+# Full output size of each embedding model; smaller `dimensions` use Matryoshka truncation
+MODEL_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+}
+
+
+class CollectionSchemaError(ValueError):
+    """A live collection is incompatible with its registered schema (e.g. vector size)."""
+
+
+@dataclass(frozen=True)
+class CollectionSchema:
+    name: str
+    model: str
+    dimensions: int
+    distance: Distance = Distance.COSINE
+    # BM25 sparse vector next to the dense one, for hybrid search
+    sparse: bool = True
+    # "int8" (4x smaller, ~no recall loss with rescoring), "binary" (32x) or None
+    quantization: Optional[str] = "int8"
+    # Keep full-precision vectors on disk and only the quantized copy in RAM
+    on_disk: bool = False
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+    # Query-time beam width and how many extra candidates to rescore with full vectors
+    search_ef: int = 128
+    oversampling: float = 2.0
+    # Multiplier on this collection's normalized scores in federated search
+    search_weight: float = 1.0
+    payload_indexes: Dict[str, PayloadSchemaType] = field(default_factory=dict)
+
+    def __post_init__(self):
+        native = MODEL_DIMENSIONS.get(self.model)
+        if native is not None and self.dimensions > native:
+            raise CollectionSchemaError(f"{self.name}: {self.model} outputs at most {native} dimensions, not {self.dimensions}")
+
+    @property
+    def truncated(self) -> bool:
+        return self.dimensions < MODEL_DIMENSIONS.get(self.model, self.dimensions)
+
+    def embeddings(self):
+        """OpenAIEmbeddings producing vectors of exactly this collection's size."""
+        from langchain_openai import OpenAIEmbeddings
+
+        if self.truncated:
+            return OpenAIEmbeddings(model=self.model, dimensions=self.dimensions)
+        return OpenAIEmbeddings(model=self.model)
+
+    def vectors_config(self) -> VectorParams:
+        return VectorParams(size=self.dimensions, distance=self.distance, on_disk=self.on_disk)
+
+    def hnsw_config(self) -> HnswConfigDiff:
+        return HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct)
+
+    def quantization_config(self):
+        if self.quantization == "int8":
+            return ScalarQuantization(scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True))
+        if self.quantization == "binary":
+            return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+        return None
+
+    def search_params(self) -> SearchParams:
+        if self.quantization is None:
+            return SearchParams(hnsw_ef=self.search_ef)
+        return SearchParams(
+            hnsw_ef=self.search_ef,
+            quantization=QuantizationSearchParams(rescore=True, oversampling=self.oversampling),
+        )
+
+
+CODE_INDEXES = {CODES_FIELD: PayloadSchemaType.KEYWORD}
+
+COLLECTIONS: Dict[str, CollectionSchema] = {
+    schema.name: schema
+    for schema in [
+        # Policy chunks the researcher audits against. 3-large truncated to 1024 keeps most
+        # of its quality at a third of the RAM and search cost of 3072 dimensions.
+        CollectionSchema(
+            name="medicare_protocols",
+            model="text-embedding-3-large",
+            dimensions=1024,
+            on_disk=True,
+            payload_indexes=CODE_INDEXES,
+        ),
+        CollectionSchema(
+            name="medical_policies",
+            model="text-embedding-3-small",
+            dimensions=1536,
+            payload_indexes=CODE_INDEXES,
+        ),
+        # Bulk literature: the largest collection, so full vectors live on disk.
+        # Supporting evidence only, so it ranks below policy text in federated search.
+        CollectionSchema(
+            name="pubmed_docs",
+            model="text-embedding-3-small",
+            dimensions=1536,
+            sparse=False,
+            on_disk=True,
+            search_weight=0.6,
+        ),
+        CollectionSchema(
+            name="medical_knowledge",
+            model="text-embedding-3-small",
+            dimensions=1536,
+            sparse=False,
+            search_weight=0.8,
+        ),
+    ]
+}
+
+
+def get_schema(collection_name: str) -> CollectionSchema:
+    try:
+        return COLLECTIONS[collection_name]
+    except KeyError:
+        raise CollectionSchemaError(f"No schema registered for '{collection_name}'. Known: {sorted(COLLECTIONS)}") from None
+
+
+def embeddings_for(collection_name: str):
+    return get_schema(collection_name).embeddings()
+
+
+def schema_problems(schema: CollectionSchema, info: CollectionInfo) -> List[str]:
+    """
+    Compares a live collection to its schema. Raises on differences that make search
+    wrong (vector size, distance); returns the ones that only cost performance or features.
+    """
+    vectors = info.config.params.vectors
+    if isinstance(vectors, dict):
+        vectors = vectors.get("")
+    if vectors is None:
+        raise CollectionSchemaError(f"'{schema.name}' has no unnamed dense vector")
+    if vectors.size != schema.dimensions:
+        raise CollectionSchemaError(
+            f"'{schema.name}' stores {vectors.size}-dim vectors but its schema embeds with "
+            f"{schema.model} at {schema.dimensions} dims. Recreate it: python -m src.database.collections --recreate {schema.name}"
+        )
+    if vectors.distance != schema.distance:
+        raise CollectionSchemaError(f"'{schema.name}' uses {vectors.distance} distance, schema says {schema.distance}")
+
+    problems = []
+    if schema.sparse and SPARSE_VECTOR_NAME not in (info.config.params.sparse_vectors or {}):
+        problems.append("no sparse vectors (hybrid search disabled until recreated)")
+    hnsw = info.config.hnsw_config
+    if (hnsw.m, hnsw.ef_construct) != (schema.hnsw_m, schema.hnsw_ef_construct):
+        problems.append(f"HNSW m={hnsw.m}/ef_construct={hnsw.ef_construct}, schema {schema.hnsw_m}/{schema.hnsw_ef_construct}")
+    if (info.config.quantization_config is None) != (schema.quantization is None):
+        problems.append(f"quantization {'missing' if schema.quantization else 'enabled'} (schema: {schema.quantization})")
+    return problems
+
+
+def validate_collection(client: QdrantClient, collection_name: str) -> List[str]:
+    return schema_problems(get_schema(collection_name), client.get_collection(collection_name))
+
+
+def provision_collection(client: QdrantClient, collection_name: str, recreate: bool = False) -> bool:
+    """
+    Makes `collection_name` match its schema: creates it if missing (or `recreate`), otherwise
+    validates it, failing fast on a dimension mismatch, and re-applies the HNSW/quantization
+    settings that can change in place. Payload indexes are ensured either way.
+    Returns True when the collection was (re)created empty.
+    """
+    schema = get_schema(collection_name)
+    exists = client.collection_exists(collection_name)
+    if exists and recreate:
+        print(f"Recreating '{collection_name}'...")
+        client.delete_collection(collection_name)
+        exists = False
+
+    if not exists:
+        print(f"Creating '{collection_name}': {schema.model} @ {schema.dimensions} dims, quantization={schema.quantization}, sparse={schema.sparse}")
+        client.create_collection(
+            collection_name=collection_name,
+            vectors_config=schema.vectors_config(),
+            sparse_vectors_config=sparse_vectors_config() if schema.sparse else None,
+            hnsw_config=schema.hnsw_config(),
+            quantization_config=schema.quantization_config(),
+        )
+    else:
+        problems = validate_collection(client, collection_name)
+        tunable = [p for p in problems if p.startswith(("HNSW", "quantization"))]
+        if tunable:
+            print(f"Updating '{collection_name}': {'; '.join(tunable)}")
+            client.update_collection(
+                collection_name=collection_name,
+                hnsw_config=schema.hnsw_config(),
+                quantization_config=schema.quantization_config(),
+            )
+        for problem in problems:
+            if problem not in tunable:
+                print(f"⚠️ '{collection_name}': {problem}")
+
+    for field_name, field_schema in schema.payload_indexes.items():
+        client.create_payload_index(collection_name=collection_name, field_name=field_name, field_schema=field_schema)
+    return not exists
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description="Provision and validate Qdrant collections from the schema registry.")
+    parser.add_argument("collections", nargs="*", default=sorted(COLLECTIONS))
+    parser.add_argument("--recreate", nargs="*", default=[], help="Collections to drop and recreate (data is lost)")
+    args = parser.parse_args()
+
+    client = QdrantClient(url=os.getenv("QDRANT_URL", "http://localhost:6333"), api_key=os.getenv("QDRANT_KEY"))
+    for name in args.collections:
+        provision_collection(client, name, recreate=name in args.recreate)
+        print(f"✅ {name}")
@@ -0,0 +1,62 @@
+"""
+Rewrites a collection's payloads into the compact schema (src/ingestion/payload_schema.py).
+Vectors are untouched; only points still in an old shape are rewritten, so re-running is cheap.
+
+    python -m src.database.migrate_payloads medicare_protocols pubmed_docs [--dry-run]
+"""
+import argparse
+import json
+import os
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import OverwritePayloadOperation, SetPayload
+
+from src.ingestion.payload_schema import is_compact, to_compact
+
+SCROLL_BATCH_SIZE = 512
+
+
+def migrate_collection(client: QdrantClient, collection_name: str, dry_run: bool = False) -> dict:
+    """
+    Scrolls every point and overwrites legacy payloads with their compact form, one
+    batched update per scroll page. Returns counts and payload bytes before/after.
+    """
+    stats = {"points": 0, "migrated": 0, "bytes_before": 0, "bytes_after": 0}
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            limit=SCROLL_BATCH_SIZE,
+            offset=offset,
+            with_payload=True,
+            with_vectors=False,
+        )
+        operations = []
+        for point in points:
+            payload = point.payload or {}
+            compact = payload if is_compact(payload) else to_compact(payload)
+            stats["points"] += 1
+            stats["bytes_before"] += len(json.dumps(payload))
+            stats["bytes_after"] += len(json.dumps(compact))
+            if compact is not payload:
+                operations.append(OverwritePayloadOperation(overwrite_payload=SetPayload(payload=compact, points=[point.id])))
+
+        if operations and not dry_run:
+            client.batch_update_points(collection_name=collection_name, update_operations=operations, wait=True)
+        stats["migrated"] += len(operations)
+        if offset is None:
+            return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rewrite collection payloads into the compact schema.")
+    parser.add_argument("collections", nargs="+")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    args = parser.parse_args()
+
+    client = QdrantClient(url=os.getenv("QDRANT_URL", "http://localhost:6333"), api_key=os.getenv("QDRANT_KEY"))
+    for name in args.collections:
+        stats = migrate_collection(client, name, dry_run=args.dry_run)
+        saved = 1 - stats["bytes_after"] / stats["bytes_before"] if stats["bytes_before"] else 0.0
+        verb = "Would migrate" if args.dry_run else "Migrated"
+        print(f"✅ {name}: {verb} {stats['migrated']}/{stats['points']} points; payload bytes {stats['bytes_before']} -> {stats['bytes_after']} ({saved:.0%} smaller)")
@@ -1,6 +1,6 @@
 from qdrant_client import QdrantClient
 from langchain_qdrant import QdrantVectorStore, RetrievalMode, FastEmbedSparse
-from langchain_openai import OpenAIEmbeddings
+from src.database.collections import embeddings_for
 
 def init_qdrant_hybrid(collection_name: str):
     """
@@ -15,7 +15,7 @@ def init_qdrant_hybrid(collection_name: str):
     return QdrantVectorStore(
         client=client,
         collection_name=collection_name,
-        embedding=OpenAIEmbeddings(),
+        embedding=embeddings_for(collection_name),
         sparse_embedding=sparse_embeddings,
         retrieval_mode=RetrievalMode.HYBRID # Combines both worlds
     )
\ No newline at end of file
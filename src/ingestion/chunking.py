@@ -0,0 +1,166 @@
+import re
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # Token counts fall back to a ~4 chars/token estimate
+    tiktoken = None
+
+from src.ingestion.code_index import CODE_PATTERN
+
+
+@dataclass(frozen=True)
+class ChunkBudget:
+    max_tokens: int
+    overlap_tokens: int
+
+
+# Token budgets per collection. Overlap is whole sentences up to `overlap_tokens`,
+# so far less text gets embedded twice than with 100-200 character overlaps.
+COLLECTION_BUDGETS = {
+    "medicare_protocols": ChunkBudget(max_tokens=256, overlap_tokens=32),
+    "medical_policies": ChunkBudget(max_tokens=256, overlap_tokens=32),
+    "medical_knowledge": ChunkBudget(max_tokens=256, overlap_tokens=32),
+    "pubmed_docs": ChunkBudget(max_tokens=200, overlap_tokens=20),
+}
+DEFAULT_BUDGET = ChunkBudget(max_tokens=256, overlap_tokens=32)
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9(\"'])")
+# Two or more runs of wide spacing on one line means aligned columns
+COLUMN_GAPS = re.compile(r"\S(?:\s{2,}|\t)\S.*\S(?:\s{2,}|\t)\S")
+
+# Texts whose units are token-counted in one tokenizer call
+ENCODE_BATCH_TEXTS = 32
+
+
+def budget_for(collection_name: str) -> ChunkBudget:
+    return COLLECTION_BUDGETS.get(collection_name, DEFAULT_BUDGET)
+
+
+def _is_table_row(line: str) -> bool:
+    first = line.split(None, 1)[0] if line.strip() else ""
+    return bool(CODE_PATTERN.fullmatch(first.upper())) or bool(COLUMN_GAPS.search(line))
+
+
+def split_units(text: str) -> List[Tuple[str, bool]]:
+    """
+    Splits text into atomic units: table rows (kept whole) and sentences.
+    Returns (unit, is_table_row) pairs in document order.
+    """
+    units: List[Tuple[str, bool]] = []
+    paragraph: List[str] = []
+
+    def flush_paragraph():
+        if paragraph:
+            for sentence in SENTENCE_BOUNDARY.split(" ".join(paragraph)):
+                if sentence.strip():
+                    units.append((sentence.strip(), False))
+            paragraph.clear()
+
+    lines = text.splitlines()
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        if not line:
+            flush_paragraph()
+        elif _is_table_row(lines[i]):
+            flush_paragraph()
+            # PDF extraction often puts a code and its description on separate lines
+            if CODE_PATTERN.fullmatch(line.upper()) and i + 1 < len(lines) and lines[i + 1].strip():
+                i += 1
+                line = f"{line} {lines[i].strip()}"
+            units.append((" ".join(line.split()), True))
+        else:
+            paragraph.append(line)
+        i += 1
+    flush_paragraph()
+    return units
+
+
+class TokenChunker:
+    """
+    The one chunking engine for every loader: packs whole sentences and table rows
+    into chunks bounded by tiktoken token counts, with sentence-aligned overlap.
+    """
+
+    def __init__(self, budget: ChunkBudget = DEFAULT_BUDGET, encoding_name: str = "cl100k_base"):
+        self.budget = budget
+        self.encoding_name = encoding_name
+        self.encoding = tiktoken.get_encoding(encoding_name) if tiktoken else None
+
+    @classmethod
+    def for_collection(cls, collection_name: str) -> "TokenChunker":
+        return cls(budget_for(collection_name))
+
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        if self.encoding is None:
+            return [len(t) // 4 + 1 for t in texts]
+        return [len(ids) for ids in self.encoding.encode_ordinary_batch(texts)]
+
+    def _split_oversized(self, unit: str) -> List[str]:
+        """Hard-splits a single unit larger than the budget on token boundaries."""
+        size = self.budget.max_tokens
+        if self.encoding is None:
+            return [unit[i : i + size * 4] for i in range(0, len(unit), size * 4)]
+        ids = self.encoding.encode_ordinary(unit)
+        return [self.encoding.decode(ids[i : i + size]) for i in range(0, len(ids), size)]
+
+    def _pack(self, units: List[Tuple[str, bool]], counts: List[int]) -> Iterator[str]:
+        max_tokens, overlap_tokens = self.budget.max_tokens, self.budget.overlap_tokens
+        chunk: List[Tuple[str, bool, int]] = []
+        chunk_tokens = 0
+        fresh = False  # Whether `chunk` holds anything beyond carried-over overlap
+
+        def render(parts) -> str:
+            out = parts[0][0]
+            for (_, prev_row, _), (unit, is_row, _) in zip(parts, parts[1:]):
+                out += ("\n" if prev_row or is_row else " ") + unit
+            return out
+
+        for (unit, is_row), n_tokens in zip(units, counts):
+            if n_tokens > max_tokens:
+                if fresh:
+                    yield render(chunk)
+                yield from self._split_oversized(unit)
+                chunk, chunk_tokens, fresh = [], 0, False
+                continue
+
+            if chunk_tokens + n_tokens > max_tokens and fresh:
+                yield render(chunk)
+                # Carry trailing whole sentences forward as overlap
+                carry, carry_tokens = [], 0
+                for part in reversed(chunk):
+                    if carry_tokens + part[2] > overlap_tokens:
+                        break
+                    carry.insert(0, part)
+                    carry_tokens += part[2]
+                chunk, chunk_tokens, fresh = carry, carry_tokens, False
+
+            if chunk_tokens + n_tokens > max_tokens:
+                chunk, chunk_tokens = [], 0  # Overlap would push this unit over budget
+            chunk.append((unit, is_row, n_tokens))
+            chunk_tokens += n_tokens
+            fresh = True
+
+        if fresh:
+            yield render(chunk)
+
+    def iter_chunks(self, texts: Iterable[str]) -> Iterator[Tuple[int, str]]:
+        """
+        Streams (text index, chunk) pairs. Chunks never span input texts (e.g. pages);
+        token counting runs in batches across several texts at a time.
+        """
+        texts = enumerate(texts)
+        while batch := list(islice(texts, ENCODE_BATCH_TEXTS)):
+            split = [(i, split_units(text)) for i, text in batch]
+            counts = iter(self.count_tokens([unit for _, units in split for unit, _ in units]))
+            for i, units in split:
+                unit_counts = [next(counts) for _ in units]
+                for chunk in self._pack(units, unit_counts):
+                    yield i, chunk
+
+    def split_text(self, text: str) -> List[str]:
+        """Drop-in replacement for LangChain/llama-index `split_text`."""
+        return [chunk for _, chunk in self.iter_chunks([text])]
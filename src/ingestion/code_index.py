@@ -0,0 +1,145 @@
+import re
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, Iterable, List, Optional
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import IsEmptyCondition, PayloadField, PayloadSchemaType, Filter
+
+CODES_FIELD = "codes"
+
+# Shape of a CPT (99213, Category II/III like 0058T), HCPCS Level II (J1234) or ICD-10-CM
+# (E11.65, I10) code. On its own it also matches ZIP codes, contract numbers and revision
+# numbers (R28), so it is only used as-is on cells already known to hold a code;
+# extract_codes() adds context rules for free text.
+CODE_PATTERN = re.compile(
+    r"\b(?:"
+    r"\d{4}[0-9TFU]"                      # CPT
+    r"|[A-V]\d{4}"                        # HCPCS
+    r"|[A-TV-Z]\d[0-9AB](?:\.[0-9A-TV-Z]{1,4})?"  # ICD-10
+    r")\b"
+)
+# Shapes no ordinary number has: Category II/III CPT, HCPCS, ICD-10 with a subcategory
+DISTINCT_CODE_PATTERN = re.compile(r"\d{4}[TFU]|[A-V]\d{4}|[A-TV-Z]\d[0-9AB]\.[0-9A-TV-Z]{1,4}")
+# Words that make a nearby 5-digit number a CPT code, or a bare 3-character token an ICD-10 code
+CPT_CONTEXT_PATTERN = re.compile(r"\b(?:CPT|HCPCS|CODES?|PROCEDURES?|COVER(?:ED|AGE)?|NON-?COVERED|BILL(?:ED|ING)?|CLAIMS?)\b")
+ICD_CONTEXT_PATTERN = re.compile(r"\b(?:ICD(?:-?10)?(?:-CM)?|DIAGNOS[EI]S|DX)\b")
+# Labels right before a number that say it is something else ("Contract 10111", "ZIP 29202")
+NOT_A_CODE_PATTERN = re.compile(r"(?:\bCONTRACT(?:\s+(?:NO\.?|NUMBER))?|\bZIP(?:\s+CODE)?|\bPO\s+BOX|\b[LA])[\s:#-]*$")
+CONTEXT_CHARS = 40
+
+
+def _is_code(text: str, match: re.Match) -> bool:
+    code, start, end = match.group(0), match.start(), match.end()
+    before = text[max(0, start - CONTEXT_CHARS):start]
+    if NOT_A_CODE_PATTERN.search(before):
+        return False
+    # Alone on its line: a code table cell
+    line_start = text.rfind("\n", 0, start) + 1
+    line_end = text.find("\n", end)
+    if text[line_start:line_end if line_end != -1 else len(text)].strip() == code:
+        return True
+    if DISTINCT_CODE_PATTERN.fullmatch(code):
+        return True
+    window = before + " " + text[end:end + CONTEXT_CHARS]
+    context = CPT_CONTEXT_PATTERN if code[0].isdigit() else ICD_CONTEXT_PATTERN
+    return bool(context.search(window))
+
+
+def extract_codes(text: str) -> List[str]:
+    """
+    Returns the unique billing/diagnosis codes in `text`, uppercased and sorted.
+    Plain 5-digit numbers count only near CPT/HCPCS/coverage wording and bare
+    3-character ICD-10 codes only near ICD/diagnosis wording, unless they sit alone on
+    a line (a table cell); numbers labelled as contract, ZIP or L/A document numbers never do.
+    """
+    text = text.upper()
+    return sorted({m.group(0) for m in CODE_PATTERN.finditer(text) if _is_code(text, m)})
+
+
+def ensure_code_payload_index(client: QdrantClient, collection_name: str) -> None:
+    """Keyword index on the `codes` payload field, so code filters skip vector search."""
+    client.create_payload_index(
+        collection_name=collection_name,
+        field_name=CODES_FIELD,
+        field_schema=PayloadSchemaType.KEYWORD,
+    )
+
+
+@dataclass
+class CodeHit:
+    point_id: str
+    text: str
+    source: str
+
+
+class CodeIndex:
+    """
+    In-process code → chunk map for one collection. Built from Qdrant once and
+    refreshed every `ttl_seconds`; lookups are plain dict reads with no embedding call.
+    With a `breaker` (CircuitBreaker), only the Qdrant scrolls of a rebuild go through it.
+    """
+
+    def __init__(self, client: QdrantClient, collection_name: str, ttl_seconds: float = 300.0, breaker=None):
+        self.client = client
+        self.collection_name = collection_name
+        self.ttl_seconds = ttl_seconds
+        self.breaker = breaker
+        self._index: Dict[str, List[CodeHit]] = {}
+        self._built_at: Optional[float] = None
+
+    def is_stale(self) -> bool:
+        """True when the next lookup rebuilds the index from Qdrant."""
+        return self._built_at is None or time.monotonic() - self._built_at > self.ttl_seconds
+
+    def _scroll(self, scroll_filter=None) -> Iterable:
+        scroll = self.client.scroll if self.breaker is None else partial(self.breaker.call, self.client.scroll)
+        offset = None
+        while True:
+            points, offset = scroll(
+                collection_name=self.collection_name,
+                scroll_filter=scroll_filter,
+                limit=512,
+                offset=offset,
+                # Only what the index keeps, not the whole payload
+                with_payload=["text", "source", CODES_FIELD],
+                with_vectors=False,
+            )
+            yield from points
+            if offset is None:
+                return
+
+    def build(self) -> None:
+        index: Dict[str, List[CodeHit]] = defaultdict(list)
+        # Only chunks that actually carry codes, served by the keyword payload index
+        has_codes = Filter(must_not=[IsEmptyCondition(is_empty=PayloadField(key=CODES_FIELD))])
+        points = list(self._scroll(has_codes))
+        if not points:
+            # Collection ingested before code extraction existed: derive codes from text
+            points = list(self._scroll())
+
+        for point in points:
+            payload = point.payload or {}
+            text = payload.get("text", "")
+            source = payload.get("source", "Unknown")
+            for code in payload.get(CODES_FIELD) or extract_codes(text):
+                index[code].append(CodeHit(str(point.id), text, source))
+
+        self._index = dict(index)
+        self._built_at = time.monotonic()
+
+    def lookup(self, codes: Iterable[str], limit: int = 10) -> List[CodeHit]:
+        """Chunks mentioning any of `codes`, those matching the most codes first."""
+        if self.is_stale():
+            self.build()
+
+        matches: Dict[str, int] = defaultdict(int)
+        hits: Dict[str, CodeHit] = {}
+        for code in codes:
+            for hit in self._index.get(code.upper(), []):
+                matches[hit.point_id] += 1
+                hits[hit.point_id] = hit
+        ranked = sorted(hits, key=lambda point_id: matches[point_id], reverse=True)
+        return [hits[point_id] for point_id in ranked[:limit]]
@@ -1,24 +1,122 @@
 from langchain_core.documents import Document
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+import csv
+import json
+import os
 import re
 
-# Simple normalization mapping
+# Clinical abbreviation list; falls back to MEDICAL_MAPPING when the file is absent
+MAPPING_PATH = os.getenv("MEDICAL_MAPPING_PATH", "data/medical_abbreviations.json")
+
+# Simple normalization mapping (term -> standardized term, matched case-insensitively)
 MEDICAL_MAPPING = {
-    r"\bhbp\b": "Hypertension",
-    r"\bhigh blood pressure\b": "Hypertension",
-    r"\bdm2\b": "Type 2 Diabetes Mellitus"
+    "hbp": "Hypertension",
+    "high blood pressure": "Hypertension",
+    "dm2": "Type 2 Diabetes Mellitus"
 }
 
+# Below this many documents, process start-up costs more than it saves
+PARALLEL_MIN_DOCS = 64
+
+def load_mapping(path: str) -> Dict[str, str]:
+    """
+    Loads a term -> replacement mapping from a JSON object or a two-column CSV/TSV
+    (term, replacement) file.
+    """
+    if path.endswith(".json"):
+        with open(path) as f:
+            return json.load(f)
+    delimiter = "\t" if path.endswith((".tsv", ".txt")) else ","
+    with open(path, newline="") as f:
+        return {row[0].strip(): row[1].strip() for row in csv.reader(f, delimiter=delimiter) if len(row) >= 2}
+
+def _trie_pattern(terms) -> str:
+    """
+    Builds a prefix-trie shaped regex, so matching cost depends on term length
+    rather than on how many terms the dictionary holds.
+    """
+    trie: dict = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # End-of-term marker
+
+    def emit(node: dict) -> str:
+        alternatives = [re.escape(ch) + emit(node[ch]) for ch in sorted(k for k in node if k)]
+        if not alternatives:
+            return ""
+        if len(alternatives) == 1 and "" not in node:
+            return alternatives[0]
+        group = "(?:" + "|".join(alternatives) + ")"
+        # Optional group: prefer the longer term, fall back to the one ending here
+        return group + "?" if "" in node else group
+
+    return emit(trie)
+
+class MedicalTermNormalizer:
+    """
+    Compiled once from a mapping and applied in a single pass per document,
+    instead of one `re.sub` per dictionary entry.
+    """
+
+    def __init__(self, mapping: Dict[str, str]):
+        self.replacements = {term.lower(): replacement for term, replacement in mapping.items() if term}
+        # Whole-term matches only; lookarounds also work for terms ending in punctuation
+        self.pattern = re.compile(
+            r"(?<!\w)(?:" + _trie_pattern(self.replacements) + r")(?!\w)",
+            flags=re.IGNORECASE
+        ) if self.replacements else None
+
+    @classmethod
+    def from_file(cls, path: str) -> "MedicalTermNormalizer":
+        return cls(load_mapping(path))
+
+    def normalize(self, text: str) -> str:
+        if self.pattern is None:
+            return text
+        return self.pattern.sub(lambda m: self.replacements[m.group(0).lower()], text)
+
+_normalizer: Optional[MedicalTermNormalizer] = None
+
+def get_normalizer() -> MedicalTermNormalizer:
+    """Process-wide normalizer, built on first use."""
+    global _normalizer
+    if _normalizer is None:
+        if os.path.exists(MAPPING_PATH):
+            _normalizer = MedicalTermNormalizer.from_file(MAPPING_PATH)
+        else:
+            _normalizer = MedicalTermNormalizer(MEDICAL_MAPPING)
+    return _normalizer
+
 def normalize_medical_terms(text: str) -> str:
     """Replaces medical slang/shorthand with standardized terms."""
-    for pattern, replacement in MEDICAL_MAPPING.items():
-        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
-    return text
+    return get_normalizer().normalize(text)
 
-def apply_conditioning(docs: list[Document]) -> list[Document]:
+def _condition_text(text: str) -> str:
+    # 1. Clean whitespace and noise
+    text = " ".join(text.split())
+    # 2. Standardize terms
+    return normalize_medical_terms(text)
+
+def _init_worker(mapping: Dict[str, str]):
+    global _normalizer
+    _normalizer = MedicalTermNormalizer(mapping)
+
+def apply_conditioning(docs: list[Document], workers: Optional[int] = None) -> list[Document]:
     """Applies cleaning and normalization before embedding."""
-    for doc in docs:
-        # 1. Clean whitespace and noise
-        doc.page_content = " ".join(doc.page_content.split())
-        # 2. Standardize terms
-        doc.page_content = normalize_medical_terms(doc.page_content)
-    return docs
\ No newline at end of file
+    if len(docs) < PARALLEL_MIN_DOCS or workers == 1:
+        texts = [_condition_text(doc.page_content) for doc in docs]
+    else:
+        # Each worker compiles the normalizer once, then streams documents through it
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(get_normalizer().replacements,)
+        ) as pool:
+            texts = list(pool.map(_condition_text, [doc.page_content for doc in docs], chunksize=32))
+
+    for doc, text in zip(docs, texts):
+        doc.page_content = text
+    return docs
@@ -0,0 +1,282 @@
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from src.ingestion.code_index import CODE_PATTERN
+from src.ingestion.manifest import file_sha256
+
+COVERAGE_TABLE_PATH = os.getenv("COVERAGE_TABLE_PATH", "data/coverage/coverage_table.json")
+
+COVERED = "COVERED"
+NON_COVERED = "NON_COVERED"
+UNKNOWN = "UNKNOWN"
+
+COLUMNS = ("code", "description", "status", "policy_id", "effective_from", "effective_to", "source")
+
+POLICY_ID_PATTERN = re.compile(r"(?<![A-Za-z0-9])[LA]\d{5}(?!\d)")
+DATE_PATTERN = re.compile(r"\b(\d{1,2})/(\d{1,2})/(\d{4})\b")
+# LCD header fields: "Original Effective Date\nFor services performed on or after 10/01/2015",
+# "Revision Ending Date\nN/A", "Retirement Date\nN/A". The comment-period
+# "Notice Period Start/End Date" says nothing about when the codes apply.
+DATE_FIELD_PATTERN = re.compile(
+    r"(?<!PERIOD\s)\b((?:ORIGINAL\s+|REVISION\s+)?EFFECTIVE\s+DATE|(?:REVISION\s+)?END(?:ING)?\s+DATE|RETIREMENT\s+DATE)"
+    r"[\s:]*(?:FOR\s+SERVICES\s+PERFORMED\s+ON\s+OR\s+AFTER\s*)?(\d{1,2}/\d{1,2}/\d{4}|N/A)",
+    re.IGNORECASE,
+)
+NON_COVERED_PATTERN = re.compile(r"non[\s-]?covered|not\s+covered|excluded", re.IGNORECASE)
+COVERED_PATTERN = re.compile(r"\bcovered\b", re.IGNORECASE)
+# Header of a code column ("CODE", "CPT/HCPCS Codes", "ICD-10 CODE") or of a code group ("Group 1 Codes:")
+CODE_COLUMN_PATTERN = re.compile(r"^(?:(?:CPT|HCPCS|ICD-?10(?:-CM|-PCS)?)(?:\s*/\s*HCPCS)?\s+)?CODES?:?$|^GROUP\s+\d+\b", re.IGNORECASE)
+# Placeholder rows of empty groups ("99999 | Not Applicable")
+FILLER_PATTERN = re.compile(r"^\s*not\s+applicable\s*$", re.IGNORECASE)
+
+
+@dataclass
+class CoverageRecord:
+    code: str
+    description: str
+    status: str
+    policy_id: str
+    effective_from: Optional[str] = None
+    effective_to: Optional[str] = None
+    source: str = ""
+
+
+def _status_of(text: str) -> Optional[str]:
+    if NON_COVERED_PATTERN.search(text):
+        return NON_COVERED
+    if COVERED_PATTERN.search(text):
+        return COVERED
+    return None
+
+
+def _iso_date(match: re.Match) -> str:
+    month, day, year = (int(g) for g in match.groups())
+    return datetime(year, month, day).date().isoformat()
+
+
+def _document_dates(text: str) -> tuple:
+    """
+    Policy-level effective window from the LCD header: from the latest (revision)
+    effective date to the earliest ending/retirement date; "N/A" leaves it open-ended.
+    """
+    effective_from = effective_to = None
+    for label, value in DATE_FIELD_PATTERN.findall(text):
+        if value.upper() == "N/A":
+            continue
+        iso = _iso_date(DATE_PATTERN.search(value))
+        if "EFFECTIVE" in label.upper():
+            effective_from = max(effective_from or iso, iso)
+        else:
+            effective_to = min(effective_to or iso, iso)
+    return effective_from, effective_to
+
+
+def _code_column(header_names: List[str], first_row: List[str]) -> Optional[int]:
+    """
+    Index of the code column, from the table header or its first row. None for tables
+    that list no codes (contractor details, revision history).
+    """
+    for cells in (header_names, first_row):
+        cells = [" ".join((c or "").split()) for c in cells]
+        for i, cell in enumerate(cells):
+            if CODE_COLUMN_PATTERN.search(cell):
+                # "Group 1 Codes:" spans the table; the codes are in its first column
+                return 0 if cell.upper().startswith("GROUP") else i
+    return None
+
+
+def _row_record(cells: List[str], status: str, policy_id: str, dates: tuple, source: str, code_column: int = 0) -> Optional[CoverageRecord]:
+    """Turns one table row into a record when its code column holds exactly a code."""
+    cells = [" ".join((c or "").split()) for c in cells]
+    if code_column >= len(cells) or not CODE_PATTERN.fullmatch(cells[code_column].upper()):
+        return None
+    rest = [c for i, c in enumerate(cells) if c and i != code_column]
+    if any(FILLER_PATTERN.match(c) for c in rest):
+        return None
+    row_dates = [_iso_date(m) for c in rest for m in DATE_PATTERN.finditer(c)]
+    description = max((c for c in rest if not DATE_PATTERN.fullmatch(c)), key=len, default="")
+    return CoverageRecord(
+        code=cells[code_column].upper(),
+        description=description,
+        status=_status_of(" ".join(rest)) or status,
+        policy_id=policy_id,
+        effective_from=row_dates[0] if row_dates else dates[0],
+        effective_to=row_dates[1] if len(row_dates) > 1 else dates[1],
+        source=source,
+    )
+
+
+def extract_coverage_rows(pdf_path: str, policy_id: Optional[str] = None) -> List[CoverageRecord]:
+    """
+    Table-aware extraction: reads code tables with PyMuPDF's table finder (falling back
+    to 'CODE description' lines) so each row stays whole instead of being split
+    across 1000-character prose chunks.
+    """
+    import fitz  # PyMuPDF
+
+    filename = os.path.basename(pdf_path)
+    with fitz.open(pdf_path) as doc:
+        pages = [(page, page.get_text()) for page in doc]
+        full_text = "\n".join(text for _, text in pages)
+
+        if policy_id is None:
+            found = POLICY_ID_PATTERN.search(filename) or POLICY_ID_PATTERN.search(full_text)
+            policy_id = found.group(0) if found else os.path.splitext(filename)[0]
+        dates = _document_dates(full_text)
+        # Rows without a status of their own take the table header's, then the page text's,
+        # then the document heading's; a 'NonCovered_Codes' file name is only the last resort
+        filename_status = _status_of(filename.replace("_", " "))
+        document_status = _status_of(full_text[:2000]) or filename_status or UNKNOWN
+
+        records: List[CoverageRecord] = []
+        for page, text in pages:
+            page_status = _status_of(text) or document_status
+            tables = page.find_tables().tables
+            for table in tables:
+                header_names = table.header.names if table.header else []
+                rows = table.extract()
+                code_column = _code_column(header_names, rows[0] if rows else [])
+                if code_column is None:
+                    continue
+                header_status = _status_of(" ".join(name or "" for name in header_names))
+                for row in rows:
+                    record = _row_record(row, header_status or page_status, policy_id, dates, filename, code_column)
+                    if record:
+                        records.append(record)
+            if not tables:
+                for line in text.splitlines():
+                    parts = line.strip().split(None, 1)
+                    if len(parts) == 2 and CODE_PATTERN.fullmatch(parts[0].upper()):
+                        record = _row_record(parts, page_status, policy_id, dates, filename)
+                        if record:
+                            records.append(record)
+    return records
+
+
+class CoverageTable:
+    """
+    Compact columnar coverage store keyed by code. Answers "is code X covered under
+    policy Y" with a dict lookup, so the auditor only needs the LLM for narrative text.
+    """
+
+    def __init__(self, columns: Optional[Dict[str, list]] = None, sources: Optional[Dict[str, str]] = None):
+        self.columns: Dict[str, list] = columns or {name: [] for name in COLUMNS}
+        # source file -> content hash it was extracted from
+        self.sources: Dict[str, str] = sources or {}
+        self._reindex()
+
+    def _reindex(self) -> None:
+        self._by_code: Dict[str, List[int]] = {}
+        for i, code in enumerate(self.columns["code"]):
+            self._by_code.setdefault(code, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.columns["code"])
+
+    def _row(self, i: int) -> CoverageRecord:
+        return CoverageRecord(**{name: self.columns[name][i] for name in COLUMNS})
+
+    def replace_source(self, source: str, records: Iterable[CoverageRecord]) -> None:
+        """Drops the rows previously extracted from `source` and appends `records`."""
+        keep = [i for i, s in enumerate(self.columns["source"]) if s != source]
+        self.columns = {name: [values[i] for i in keep] for name, values in self.columns.items()}
+        for record in records:
+            for name in COLUMNS:
+                self.columns[name].append(getattr(record, name))
+        self._reindex()
+
+    def update_from_pdf(self, pdf_path: str, policy_id: Optional[str] = None) -> bool:
+        """Re-extracts a PDF's tables if its content changed. Returns True when it did."""
+        source = os.path.basename(pdf_path)
+        doc_hash = file_sha256(pdf_path)
+        if self.sources.get(source) == doc_hash:
+            return False
+        self.replace_source(source, extract_coverage_rows(pdf_path, policy_id))
+        self.sources[source] = doc_hash
+        return True
+
+    def lookup(self, code: str, policy_id: Optional[str] = None, on_date: Optional[str] = None) -> List[CoverageRecord]:
+        """Rows for `code`, optionally restricted to a policy and to rows in effect on an ISO date."""
+        rows = [self._row(i) for i in self._by_code.get(code.upper(), [])]
+        if policy_id:
+            rows = [r for r in rows if r.policy_id == policy_id]
+        if on_date:
+            rows = [
+                r for r in rows
+                if (r.effective_from or "") <= on_date and (r.effective_to is None or on_date <= r.effective_to)
+            ]
+        return rows
+
+    def is_covered(self, code: str, policy_id: Optional[str] = None) -> Optional[bool]:
+        """True/False from the table, or None when the table has no definite answer."""
+        statuses = {r.status for r in self.lookup(code, policy_id)} - {UNKNOWN}
+        if NON_COVERED in statuses:
+            return False
+        if COVERED in statuses:
+            return True
+        return None
+
+    def save(self, path: str = COVERAGE_TABLE_PATH) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"columns": self.columns, "sources": self.sources}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = COVERAGE_TABLE_PATH) -> "CoverageTable":
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["columns"], data.get("sources", {}))
+
+
+_table: Optional[CoverageTable] = None
+_table_mtime: Optional[float] = None
+_table_lock = threading.Lock()
+
+
+def get_coverage_table() -> CoverageTable:
+    """Shared read-only store, reloaded when the file on disk changes."""
+    global _table, _table_mtime
+    mtime = os.path.getmtime(COVERAGE_TABLE_PATH) if os.path.exists(COVERAGE_TABLE_PATH) else None
+    with _table_lock:
+        if _table is None or mtime != _table_mtime:
+            _table = CoverageTable.load(COVERAGE_TABLE_PATH)
+            _table_mtime = mtime
+        return _table
+
+
+def build_coverage_table(pdf_paths: Iterable[str], path: str = COVERAGE_TABLE_PATH, prune: bool = False) -> CoverageTable:
+    """
+    Extracts code tables from changed PDFs into the store at `path`. With `prune`,
+    rows from files not in `pdf_paths` (deleted policies) are dropped.
+    """
+    table = CoverageTable.load(path)
+    pdf_paths = list(pdf_paths)
+    for pdf_path in pdf_paths:
+        if table.update_from_pdf(pdf_path):
+            print(f"   📋 Extracted coverage rows from {os.path.basename(pdf_path)}")
+    if prune:
+        current = {os.path.basename(p) for p in pdf_paths}
+        for source in sorted(set(table.sources) - current):
+            table.replace_source(source, [])
+            del table.sources[source]
+    table.save(path)
+    print(f"Coverage table: {len(table)} rows across {len(table.sources)} policies")
+    return table
+
+
+if __name__ == "__main__":
+    import sys
+
+    directory = sys.argv[1] if len(sys.argv) > 1 else "data/policies"
+    build_coverage_table(
+        os.path.join(directory, f) for f in sorted(os.listdir(directory)) if f.endswith(".pdf")
+    )
@@ -0,0 +1,136 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from src.utils.embedding_cache import EmbeddingCache, embedding_model_key
+
+try:
+    import tiktoken
+except ImportError:  # Token counts fall back to a ~4 chars/token estimate
+    tiktoken = None
+
+EmbedFn = Callable[[List[str]], List[List[float]]]
+
+# OpenAI caps a single embeddings request at 2048 inputs / 300k tokens.
+# Smaller batches sent concurrently finish sooner than one giant request.
+DEFAULT_MAX_BATCH_TOKENS = 20_000
+DEFAULT_MAX_BATCH_SIZE = 256
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+@dataclass
+class EmbeddingStats:
+    chunks: int
+    batches: int
+    tokens: int
+    seconds: float
+    cache_hits: int = 0
+
+    @property
+    def chunks_per_sec(self) -> float:
+        return self.chunks / self.seconds if self.seconds > 0 else 0.0
+
+
+class EmbeddingPipeline:
+    """
+    Shared embedding stage for every loader: groups chunks into token-bounded
+    batches and sends several batches at once under a concurrency cap.
+    With a `cache`, only chunks not already embedded under `model` are sent.
+    """
+
+    def __init__(
+        self,
+        embed_fn: EmbedFn,
+        max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        encoding_name: str = "cl100k_base",
+        cache: Optional[EmbeddingCache] = None,
+        model: Optional[str] = None,
+    ):
+        if cache is not None and model is None:
+            raise ValueError("A cached EmbeddingPipeline needs the model name for its cache keys")
+        self.embed_fn = embed_fn
+        self.cache = cache
+        self.model = model
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.max_concurrency = max_concurrency
+        self.encoding = tiktoken.get_encoding(encoding_name) if tiktoken else None
+        self.last_stats: EmbeddingStats | None = None
+
+    @classmethod
+    def from_langchain(cls, embeddings, **kwargs) -> "EmbeddingPipeline":
+        """Wraps a LangChain `Embeddings` object (e.g. OpenAIEmbeddings)."""
+        kwargs.setdefault("model", embedding_model_key(embeddings))
+        return cls(embeddings.embed_documents, **kwargs)
+
+    @classmethod
+    def from_openai(cls, client, model: str, **kwargs) -> "EmbeddingPipeline":
+        """Wraps a raw `openai.OpenAI` client."""
+        def embed_fn(texts: List[str]) -> List[List[float]]:
+            response = client.embeddings.create(input=texts, model=model)
+            return [e.embedding for e in response.data]
+        return cls(embed_fn, model=model, **kwargs)
+
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        if self.encoding is None:
+            return [len(t) // 4 + 1 for t in texts]
+        return [len(ids) for ids in self.encoding.encode_ordinary_batch(texts)]
+
+    def make_batches(self, token_counts: List[int]) -> List[List[int]]:
+        """Returns batches of chunk indices, each under the token budget."""
+        batches, current, current_tokens = [], [], 0
+        for i, n_tokens in enumerate(token_counts):
+            full = len(current) >= self.max_batch_size
+            over_budget = current and current_tokens + n_tokens > self.max_batch_tokens
+            if full or over_budget:
+                batches.append(current)
+                current, current_tokens = [], 0
+            # An oversized chunk still gets sent, just on its own
+            current.append(i)
+            current_tokens += n_tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embeds `texts` and returns vectors in the same order."""
+        if not texts:
+            return []
+
+        start = time.perf_counter()
+        if self.cache is not None:
+            vectors = self.cache.get_many(self.model, texts)
+        else:
+            vectors = [None] * len(texts)
+        missing = [i for i, v in enumerate(vectors) if v is None]
+
+        # Batch indices refer to positions in `missing`
+        token_counts = self.count_tokens([texts[i] for i in missing])
+        batches = [[missing[j] for j in batch] for batch in self.make_batches(token_counts)]
+
+        def run(batch: List[int]):
+            return batch, self.embed_fn([texts[i] for i in batch])
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            for batch, batch_vectors in pool.map(run, batches):
+                for i, vector in zip(batch, batch_vectors):
+                    vectors[i] = vector
+
+        if self.cache is not None and missing:
+            self.cache.put_many(self.model, [texts[i] for i in missing], [vectors[i] for i in missing])
+
+        self.last_stats = EmbeddingStats(
+            chunks=len(texts),
+            batches=len(batches),
+            tokens=sum(token_counts),
+            seconds=time.perf_counter() - start,
+            cache_hits=len(texts) - len(missing),
+        )
+        print(
+            f"   ⚡ Embedded {self.last_stats.chunks} chunks in {self.last_stats.batches} batches "
+            f"({self.last_stats.chunks_per_sec:.1f} chunks/sec, {self.last_stats.cache_hits} cache hits)"
+        )
+        return vectors
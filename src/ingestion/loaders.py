@@ -5,22 +5,30 @@
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_core.documents import Document
 from datetime import datetime
+from typing import Iterator
 import os
 
-def load_medical_pdf(file_path: str) -> list[Document]:
+def iter_medical_pdf(file_path: str) -> Iterator[Document]:
     """
-    Loads a PDF and injects critical medical metadata for 
-    production-grade filtering in Qdrant.
+    Streams a PDF page by page, injecting critical medical metadata for
+    production-grade filtering in Qdrant. Only one page is held in memory.
     """
     loader = PyPDFLoader(file_path)
-    docs = loader.load()
-    
+    ingestion_date = datetime.now().isoformat()
+
     # Enrichment: Add metadata for 'Freshness' and 'Source Authority'
-    for doc in docs:
+    for doc in loader.lazy_load():
         doc.metadata.update({
             "source_path": file_path,
-            "ingestion_date": datetime.now().isoformat(),
+            "ingestion_date": ingestion_date,
             "document_type": "Clinical_Note" if "note" in file_path.lower() else "Medical_Research",
             "access_level": "Restricted"
         })
-    return docs
+        yield doc
+
+def load_medical_pdf(file_path: str) -> list[Document]:
+    """
+    Loads a PDF and injects critical medical metadata for 
+    production-grade filtering in Qdrant.
+    """
+    return list(iter_medical_pdf(file_path))
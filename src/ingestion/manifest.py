@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Dict, List, Set
+
+MANIFEST_DIR = os.getenv("INGEST_MANIFEST_DIR", "data/manifests")
+
+# Fixed namespace so the same (document, chunk) pair always maps to the same point ID
+POINT_ID_NAMESPACE = uuid.UUID("6f1c9a52-3d47-4f0e-9b8a-2c5e7d1f4a90")
+
+
+def file_sha256(path: str) -> str:
+    """Content hash of a file, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stable_point_id(doc_hash: str, chunk_offset: int) -> str:
+    """
+    Deterministic Qdrant point ID. Unlike `hash()` (salted per process) or
+    `uuid4()`, re-ingesting the same document overwrites its points in place.
+    """
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{doc_hash}:{chunk_offset}"))
+
+
+def default_manifest_path(collection_name: str) -> str:
+    return os.path.join(MANIFEST_DIR, f"{collection_name}.json")
+
+
+class IngestionManifest:
+    """
+    Tracks, per source file, the content hash that was ingested and the point IDs
+    it produced, so policy syncs only re-embed what changed.
+    """
+
+    def __init__(self, path: str, entries: Dict[str, dict] | None = None):
+        self.path = path
+        self.entries = entries or {}
+
+    @classmethod
+    def load(cls, path: str) -> "IngestionManifest":
+        if not os.path.exists(path):
+            return cls(path)
+        with open(path) as f:
+            return cls(path, json.load(f).get("files", {}))
+
+    def save(self) -> None:
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Write-then-rename so a crash mid-sync never leaves a truncated manifest
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"files": self.entries}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def key(path: str) -> str:
+        return os.path.normpath(path)
+
+    def is_current(self, path: str, doc_hash: str) -> bool:
+        entry = self.entries.get(self.key(path))
+        return entry is not None and entry["sha256"] == doc_hash
+
+    def chunk_ids(self, path: str) -> List[str]:
+        return self.entries.get(self.key(path), {}).get("chunk_ids", [])
+
+    def record(self, path: str, doc_hash: str, chunk_ids: List[str]) -> None:
+        self.entries[self.key(path)] = {
+            "sha256": doc_hash,
+            "chunk_ids": chunk_ids,
+            "ingested_at": datetime.now().isoformat(),
+        }
+
+    def forget(self, path: str) -> List[str]:
+        return self.entries.pop(self.key(path), {}).get("chunk_ids", [])
+
+    def files_under(self, directory: str) -> Set[str]:
+        directory = os.path.normpath(directory)
+        return {k for k in self.entries if os.path.dirname(k) == directory}
@@ -0,0 +1,59 @@
+"""
+The one payload shape every loader writes: flat, with the chunk text under `text`.
+
+    {"text": ..., "source": "L34555.pdf", "page": 3, "codes": ["0058T"], "policy_id": "L34555", ...}
+
+Searches request only SEARCH_FIELDS, so the extra descriptive fields never cross the wire.
+`to_compact` converts the older shapes (`page_content` / `content` text, nested `metadata`,
+0-based `page_number`); src/database/migrate_payloads.py applies it to whole collections.
+"""
+from typing import List, Optional
+
+from src.ingestion.code_index import CODES_FIELD
+
+TEXT_FIELD = "text"
+SOURCE_FIELD = "source"
+PAGE_FIELD = "page"  # 1-based
+
+# What a search hit needs (researcher evidence, packing by source/page)
+SEARCH_FIELDS = [TEXT_FIELD, SOURCE_FIELD, PAGE_FIELD]
+
+LEGACY_TEXT_FIELDS = ("page_content", "content")
+LEGACY_FIELDS = LEGACY_TEXT_FIELDS + ("metadata", "page_number")
+
+
+def make_payload(text: str, source: str, page: Optional[int] = None, codes: Optional[List[str]] = None, **fields) -> dict:
+    """Compact payload for one chunk; `fields` are extra flat, filterable attributes (None is dropped)."""
+    payload = {TEXT_FIELD: text, SOURCE_FIELD: source}
+    if page is not None:
+        payload[PAGE_FIELD] = page
+    if codes is not None:
+        payload[CODES_FIELD] = codes
+    payload.update({key: value for key, value in fields.items() if value is not None})
+    return payload
+
+
+def is_compact(payload: dict) -> bool:
+    return TEXT_FIELD in payload and not any(field in payload for field in LEGACY_FIELDS)
+
+
+def to_compact(payload: dict) -> dict:
+    """Rewrites a payload written by an older loader into the compact schema."""
+    payload = dict(payload)
+    metadata = payload.pop("metadata", None) or {}
+
+    text = payload.get(TEXT_FIELD)
+    for field in LEGACY_TEXT_FIELDS:
+        value = payload.pop(field, None)
+        text = text or value
+
+    page = payload.pop("page_number", None)
+    if page is not None:
+        page += 1  # production_ingest stored the 0-based page index
+    page = payload.get(PAGE_FIELD, metadata.pop("page", page))
+    source = payload.get(SOURCE_FIELD) or metadata.pop("source", None) or "Unknown"
+    metadata.pop(SOURCE_FIELD, None)
+
+    # Remaining metadata keys become flat fields; existing top-level fields win
+    rest = {key: value for key, value in payload.items() if key not in (TEXT_FIELD, SOURCE_FIELD, PAGE_FIELD)}
+    return make_payload(text or "", source, page, **{**metadata, **rest})
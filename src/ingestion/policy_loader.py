@@ -1,63 +1,53 @@
-import fitz  # PyMuPDF
 from qdrant_client import QdrantClient
-from qdrant_client.models import PointStruct, VectorParams, Distance
-from langchain_openai import OpenAIEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-import uuid
+from src.database.collections import embeddings_for, provision_collection
+from src.ingestion.embedding_pipeline import EmbeddingPipeline
+from src.ingestion.manifest import IngestionManifest, default_manifest_path
+from src.ingestion.payload_schema import make_payload
+from src.ingestion.streaming import ChunkRecord, StreamingIngestor
+from src.utils.embedding_cache import get_embedding_cache
 
 # 1. Setup Client and Embeddings
+COLLECTION_NAME = "medicare_protocols"
+
 client = QdrantClient("localhost", port=6333)
-embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+# Model and dimensions come from the collection's schema, shared with the researcher
+embeddings = embeddings_for(COLLECTION_NAME)
+pipeline = EmbeddingPipeline.from_langchain(embeddings, cache=get_embedding_cache())
 
-# Ensure collection exists for "Clinical Protocols"
-COLLECTION_NAME = "medicare_protocols"
-if not client.collection_exists(COLLECTION_NAME):
-    client.create_collection(
-        collection_name=COLLECTION_NAME,
-        vectors_config=VectorParams(size=1536, distance=Distance.COSINE),
-    )
+def ensure_collection():
+    """Ensure collection exists for "Clinical Protocols" (checked at ingest time, not import)."""
+    provision_collection(client, COLLECTION_NAME)
 
-def ingest_medical_policy(pdf_path: str, policy_category: str):
+def ingest_medical_policies(pdf_paths: list[str], policy_category: str, incremental: bool = True):
     """
-    Parses a Medical Policy PDF and stores it with rich metadata for the Auditor.
+    Parses Medical Policy PDFs and stores them with rich metadata for the Auditor.
+    Files are parsed in parallel and streamed to Qdrant in fixed-size batches;
+    unchanged files (same content hash as the manifest) are skipped.
     """
-    doc = fitz.open(pdf_path)
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=100,
-        separators=["\n\n", "\n", ".", " "]
+    def payload(record: ChunkRecord) -> dict:
+        # Metadata is what makes this "Enterprise Grade" (flat compact schema)
+        return make_payload(
+            record.text,
+            record.source,
+            page=record.page + 1,
+            category=policy_category,
+            document_type="Official Medicare Protocol",
+        )
+
+    ensure_collection()
+    ingestor = StreamingIngestor(
+        client,
+        COLLECTION_NAME,
+        pipeline,
+        payload,
+        manifest=IngestionManifest.load(default_manifest_path(COLLECTION_NAME)),
     )
+    stats = ingestor.ingest(pdf_paths, incremental=incremental)
+    print(f"Successfully ingested {stats.upserted} chunks from {stats.files} policies")
 
-    points = []
-    
-    for page_num, page in enumerate(doc):
-        text = page.get_text()
-        chunks = text_splitter.split_text(text)
-        
-        for chunk in chunks:
-            # Generate embedding for the chunk
-            vector = embeddings.embed_query(chunk)
-            
-            # Create a "Point" for Qdrant with Metadata
-            # Metadata is what makes this "Enterprise Grade"
-            point_id = str(uuid.uuid4())
-            points.append(PointStruct(
-                id=point_id,
-                vector=vector,
-                payload={
-                    "content": chunk,
-                    "metadata": {
-                        "source": pdf_path,
-                        "page": page_num + 1,
-                        "category": policy_category,
-                        "document_type": "Official Medicare Protocol"
-                    }
-                }
-            ))
-            
-    # Batch upload to Qdrant
-    client.upsert(collection_name=COLLECTION_NAME, points=points)
-    print(f"Successfully ingested {len(points)} chunks from {pdf_path}")
+def ingest_medical_policy(pdf_path: str, policy_category: str, incremental: bool = True):
+    """Single-file convenience wrapper around `ingest_medical_policies`."""
+    ingest_medical_policies([pdf_path], policy_category, incremental=incremental)
 
 # Example Usage:
 # ingest_medical_policy("data/medicare_claims_manual.pdf", "Insurance Compliance")
\ No newline at end of file
@@ -1,48 +1,99 @@
 import os
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from qdrant_client import QdrantClient
-from qdrant_client.models import PointStruct
-from langchain_openai import OpenAIEmbeddings
+from qdrant_client.models import PointIdsList
+from src.database.collections import embeddings_for, provision_collection
+from src.ingestion.embedding_pipeline import EmbeddingPipeline
+from src.ingestion.manifest import IngestionManifest, default_manifest_path
+from src.ingestion.payload_schema import make_payload
+from src.ingestion.streaming import ChunkRecord, StreamingIngestor
+from src.ingestion.coverage_table import build_coverage_table
+from src.utils.embedding_cache import get_embedding_cache
 
 # 1. Initialize
-client = QdrantClient("localhost", port=6333)
-embeddings = OpenAIEmbeddings(model="text-embedding-3-large")
 COLLECTION_NAME = "medicare_protocols"
+client = QdrantClient("localhost", port=6333)
+embeddings = embeddings_for(COLLECTION_NAME)
+pipeline = EmbeddingPipeline.from_langchain(embeddings, cache=get_embedding_cache())
+
+def ensure_collection(recreate: bool = False) -> bool:
+    """
+    Provisions the collection from its registered schema (dense + BM25 sparse vectors,
+    quantization, HNSW settings), failing fast if it exists with another vector size.
+    Returns True when it was (re)created empty, so every file must be ingested.
+    """
+    return provision_collection(client, COLLECTION_NAME, recreate=recreate)
+
+def delete_points(point_ids: list[str]):
+    if point_ids:
+        client.delete(collection_name=COLLECTION_NAME, points_selector=PointIdsList(points=point_ids))
+
+def policy_payload(record: ChunkRecord) -> dict:
+    # Extract Metadata from filename or header (Simplified here)
+    # In a real system, use an LLM to extract these 4 fields from the first page
+    # Flat compact schema: searches project only text/source/page, the rest stays filterable
+    return make_payload(
+        record.text,
+        os.path.basename(record.source),
+        page=record.page + 1,
+        policy_id="L34555",
+        jurisdiction="Palmetto GBA",
+        document_type="LCD",
+    )
+
+def process_policy_directory(
+    directory_path: str,
+    incremental: bool = True,
+    workers: int | None = None,
+    extract_tables: bool = True,
+    recreate: bool = False,
+):
+    """
+    Syncs every PDF in `directory_path` into Qdrant. In incremental mode, files whose
+    content hash matches the manifest are skipped, and chunks of changed or deleted
+    files are removed, so a nightly sync costs time in proportion to what changed.
+    Parsing, embedding and upserting run as a streaming pipeline across all cores.
+    With `extract_tables`, code tables also land in the coverage table for direct lookups.
+    `recreate` drops and rebuilds the collection (e.g. to add sparse vectors).
+    """
+    manifest = IngestionManifest.load(default_manifest_path(COLLECTION_NAME))
+    if ensure_collection(recreate):
+        # Nothing in the new collection yet: the manifest's record of it is void
+        manifest.entries.clear()
+        incremental = False
+    paths = [
+        os.path.join(directory_path, filename)
+        for filename in sorted(os.listdir(directory_path))
+        if filename.endswith(".pdf")
+    ]
+
+    print(f"Processing {len(paths)} PDFs from {directory_path} with Production Metadata...")
+    ingestor = StreamingIngestor(
+        client,
+        COLLECTION_NAME,
+        pipeline,
+        policy_payload,
+        manifest=manifest,
+        workers=workers,
+    )
+    ingestor.ingest(paths, incremental=incremental)
+    if extract_tables:
+        build_coverage_table(paths, prune=True)
+
+    # Files removed from the directory since the last sync
+    seen = {manifest.key(path) for path in paths}
+    for removed in sorted(manifest.files_under(directory_path) - seen):
+        print(f"Removing {os.path.basename(removed)} (deleted from {directory_path})")
+        delete_points(manifest.forget(removed))
+    manifest.save()
+    print("Scale-ready Library Updated.")
+
+if __name__ == "__main__":
+    import argparse
 
-def process_policy_directory(directory_path: str):
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
-    
-    for filename in os.listdir(directory_path):
-        if filename.endswith(".pdf"):
-            path = os.path.join(directory_path, filename)
-            loader = PyPDFLoader(path)
-            
-            # Extract Metadata from filename or header (Simplified here)
-            # In a real system, use an LLM to extract these 4 fields from the first page
-            metadata = {
-                "policy_id": "L34555", 
-                "jurisdiction": "Palmetto GBA",
-                "document_type": "LCD",
-                "source": filename
-            }
-            
-            print(f"Processing {filename} with Production Metadata...")
-            pages = loader.load()
-            chunks = text_splitter.split_documents(pages)
-            
-            points = []
-            for i, chunk in enumerate(chunks):
-                vector = embeddings.embed_query(chunk.page_content)
-                points.append(PointStruct(
-                    id=hash(f"{filename}_{i}"),
-                    vector=vector,
-                    payload={
-                        "text": chunk.page_content,
-                        "metadata": metadata, # THIS IS THE SCALE KEY
-                        "page_number": chunk.metadata.get("page", 0)
-                    }
-                ))
-            
-            client.upsert(collection_name=COLLECTION_NAME, points=points)
-    print("Scale-ready Library Updated.")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Sync a directory of policy PDFs into Qdrant.")
+    parser.add_argument("directory", nargs="?", default="data/policies")
+    parser.add_argument("--full", action="store_true", help="Re-ingest every file, ignoring the manifest")
+    parser.add_argument("--no-tables", action="store_true", help="Skip coverage table extraction")
+    parser.add_argument("--recreate", action="store_true", help="Drop and recreate the collection with dense + sparse vectors")
+    args = parser.parse_args()
+    process_policy_directory(args.directory, incremental=not args.full, extract_tables=not args.no_tables, recreate=args.recreate)
@@ -0,0 +1,103 @@
+import os
+import re
+import zlib
+from collections import Counter
+from typing import List
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import Modifier, SparseVector, SparseVectorParams
+
+# Named sparse vector stored next to the unnamed dense vector in each collection
+SPARSE_VECTOR_NAME = "sparse"
+# "local": offline hashed BM25 (default, no download). "fastembed": Qdrant/bm25 via FastEmbed.
+# Ingestion and search must use the same encoder: their term indices are not compatible.
+SPARSE_ENCODER = os.getenv("SPARSE_ENCODER", "local")
+
+# Words (and billing codes like 0058t / e11.65) as terms
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:\.[a-z0-9]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have if in into is it its of on or such that the "
+    "their then there these they this to was were will with".split()
+)
+
+
+def sparse_vectors_config() -> dict:
+    """Collection config for the sparse vector; Qdrant applies IDF at query time."""
+    return {SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF)}
+
+
+def has_sparse_vectors(client: QdrantClient, collection_name: str) -> bool:
+    params = client.get_collection(collection_name).config.params
+    return SPARSE_VECTOR_NAME in (params.sparse_vectors or {})
+
+
+class LocalBM25Encoder:
+    """
+    BM25 term-frequency weights hashed into sparse indices, computed in-process.
+    Documents get saturated, length-normalized TF; the IDF half of BM25 comes from
+    the collection's `Modifier.IDF`, so no corpus statistics are kept here.
+    """
+
+    name = "local-bm25"
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, avg_doc_terms: float = 200.0):
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_terms = avg_doc_terms
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+    @staticmethod
+    def _index(term: str) -> int:
+        return zlib.crc32(term.encode("utf-8"))
+
+    def _vector(self, weights: dict) -> SparseVector:
+        # Hash collisions share an index; sum their weights
+        merged: dict = {}
+        for term, weight in weights.items():
+            index = self._index(term)
+            merged[index] = merged.get(index, 0.0) + weight
+        return SparseVector(indices=list(merged), values=list(merged.values()))
+
+    def encode_documents(self, texts: List[str]) -> List[SparseVector]:
+        vectors = []
+        for text in texts:
+            terms = self.tokenize(text)
+            norm = self.k1 * (1 - self.b + self.b * len(terms) / self.avg_doc_terms)
+            weights = {term: tf * (self.k1 + 1) / (tf + norm) for term, tf in Counter(terms).items()}
+            vectors.append(self._vector(weights))
+        return vectors
+
+    def encode_query(self, text: str) -> SparseVector:
+        return self._vector({term: 1.0 for term in set(self.tokenize(text))})
+
+
+class FastEmbedBM25Encoder:
+    """Qdrant's BM25 model through FastEmbed (downloads the model on first use)."""
+
+    name = "fastembed-bm25"
+
+    def __init__(self, model_name: str = "Qdrant/bm25"):
+        from fastembed import SparseTextEmbedding
+
+        self.model = SparseTextEmbedding(model_name=model_name)
+
+    def encode_documents(self, texts: List[str]) -> List[SparseVector]:
+        return [SparseVector(indices=e.indices.tolist(), values=e.values.tolist()) for e in self.model.embed(texts)]
+
+    def encode_query(self, text: str) -> SparseVector:
+        e = next(iter(self.model.query_embed(text)))
+        return SparseVector(indices=e.indices.tolist(), values=e.values.tolist())
+
+
+_encoder = None
+
+
+def get_sparse_encoder():
+    """Process-wide sparse encoder selected by SPARSE_ENCODER."""
+    global _encoder
+    if _encoder is None:
+        _encoder = FastEmbedBM25Encoder() if SPARSE_ENCODER == "fastembed" else LocalBM25Encoder()
+    return _encoder
@@ -0,0 +1,248 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointIdsList, PointStruct
+
+from src.ingestion.chunking import ChunkBudget, TokenChunker, budget_for
+from src.ingestion.code_index import CODES_FIELD, ensure_code_payload_index, extract_codes
+from src.ingestion.embedding_pipeline import EmbeddingPipeline
+from src.ingestion.manifest import IngestionManifest, file_sha256, stable_point_id
+from src.ingestion.sparse import SPARSE_VECTOR_NAME, get_sparse_encoder, has_sparse_vectors
+
+_DONE = object()
+
+
+@dataclass
+class ChunkRecord:
+    source: str      # PDF path as given to the ingestor
+    doc_hash: str    # Content hash of the source file
+    page: int        # 0-based page index
+    offset: int      # Chunk index within the document
+    text: str
+
+    @property
+    def point_id(self) -> str:
+        return stable_point_id(self.doc_hash, self.offset)
+
+
+@dataclass
+class StreamingStats:
+    files: int = 0
+    skipped_files: int = 0
+    chunks: int = 0
+    upserted: int = 0
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_sec(self) -> float:
+        return self.chunks / self.seconds if self.seconds > 0 else 0.0
+
+
+def parse_and_chunk_pdf(path: str, doc_hash: str, budget: ChunkBudget) -> List[ChunkRecord]:
+    """
+    Worker-process entry point: extracts text page by page with PyMuPDF and splits it
+    with the shared token-aware chunker. PyMuPDF is imported here so worker processes stay light.
+    """
+    import fitz  # PyMuPDF
+
+    chunker = TokenChunker(budget)
+    records = []
+    with fitz.open(path) as doc:
+        for page_num, text in chunker.iter_chunks(page.get_text() for page in doc):
+            records.append(ChunkRecord(path, doc_hash, page_num, len(records), text))
+    return records
+
+
+class StreamingIngestor:
+    """
+    PDF → chunk → embed → upsert engine. Parsing fans out across a process pool,
+    chunks flow through bounded queues into the embedding and upsert stages, and
+    points reach Qdrant in fixed-size batches, so memory stays flat regardless of
+    how many files are ingested.
+    """
+
+    def __init__(
+        self,
+        client: QdrantClient,
+        collection_name: str,
+        pipeline: EmbeddingPipeline,
+        payload_fn: Callable[[ChunkRecord], dict],
+        manifest: Optional[IngestionManifest] = None,
+        budget: Optional[ChunkBudget] = None,
+        workers: Optional[int] = None,
+        queue_size: int = 1024,
+        embed_batch_size: int = 256,
+        upsert_batch_size: int = 128,
+        sparse_encoder=None,
+    ):
+        self.client = client
+        self.collection_name = collection_name
+        self.pipeline = pipeline
+        self.payload_fn = payload_fn
+        self.manifest = manifest
+        self.budget = budget or budget_for(collection_name)
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.embed_batch_size = embed_batch_size
+        self.upsert_batch_size = upsert_batch_size
+        self.sparse_encoder = sparse_encoder
+
+    def ingest(self, pdf_paths: Iterable[str], incremental: bool = True) -> StreamingStats:
+        stats = StreamingStats()
+        start = time.perf_counter()
+        self._error: Optional[BaseException] = None
+        chunk_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        point_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        # source path -> (doc hash, point IDs), recorded in the manifest once upserted
+        ingested: dict = {}
+        ensure_code_payload_index(self.client, self.collection_name)
+        # BM25 sparse vectors go alongside the dense ones when the collection has a sparse slot
+        self._sparse = None
+        if has_sparse_vectors(self.client, self.collection_name):
+            self._sparse = self.sparse_encoder or get_sparse_encoder()
+
+        # Spawned, not forked, workers: the pool starts processes lazily on submit, after the
+        # stage threads (and the Qdrant/HTTP clients' threads) may already hold locks
+        pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        embedder = threading.Thread(target=self._guard, args=(self._embed_stage, chunk_queue, point_queue), daemon=True)
+        upserter = threading.Thread(target=self._guard, args=(self._upsert_stage, point_queue, stats), daemon=True)
+        embedder.start()
+        upserter.start()
+
+        try:
+            with pool:
+                self._produce(pool, self._pending_files(pdf_paths, incremental, stats), chunk_queue, stats, ingested)
+        finally:
+            self._put(chunk_queue, _DONE, force=self._error is not None)
+            embedder.join()
+            upserter.join()
+        if self._error is not None:
+            raise self._error
+
+        self._update_manifest(ingested)
+        stats.seconds = time.perf_counter() - start
+        print(
+            f"   🚀 Streamed {stats.chunks} chunks from {stats.files} files "
+            f"({stats.skipped_files} unchanged) in {stats.seconds:.1f}s ({stats.chunks_per_sec:.1f} chunks/sec)"
+        )
+        return stats
+
+    # -------------------------
+    # Stages
+    # -------------------------
+    def _pending_files(self, pdf_paths: Iterable[str], incremental: bool, stats: StreamingStats):
+        for path in pdf_paths:
+            doc_hash = file_sha256(path)
+            if incremental and self.manifest is not None and self.manifest.is_current(path, doc_hash):
+                stats.skipped_files += 1
+                continue
+            yield path, doc_hash
+
+    def _produce(self, pool: ProcessPoolExecutor, files: Iterable[Tuple[str, str]], chunk_queue: queue.Queue, stats: StreamingStats, ingested: dict):
+        inflight = deque()
+
+        def drain_one():
+            records = inflight.popleft().result()
+            if records:
+                ingested[records[0].source] = (records[0].doc_hash, [r.point_id for r in records])
+            for record in records:
+                self._put(chunk_queue, record)
+            stats.files += 1
+            stats.chunks += len(records)
+
+        for path, doc_hash in files:
+            ingested[path] = (doc_hash, [])
+            inflight.append(pool.submit(parse_and_chunk_pdf, path, doc_hash, self.budget))
+            # Keep at most two parsed files per worker waiting on the queue
+            if len(inflight) >= self.workers * 2:
+                drain_one()
+        while inflight:
+            drain_one()
+
+    def _embed_stage(self, chunk_queue: queue.Queue, point_queue: queue.Queue):
+        batch: List[ChunkRecord] = []
+
+        def flush():
+            texts = [r.text for r in batch]
+            vectors = self.pipeline.embed(texts)
+            if self._sparse is not None:
+                sparse_vectors = self._sparse.encode_documents(texts)
+                vectors = [{"": dense, SPARSE_VECTOR_NAME: sparse} for dense, sparse in zip(vectors, sparse_vectors)]
+            for record, vector in zip(batch, vectors):
+                payload = self.payload_fn(record)
+                # Every chunk carries its CPT/HCPCS/ICD-10 codes for the exact-code fast path
+                payload.setdefault(CODES_FIELD, extract_codes(record.text))
+                self._put(point_queue, PointStruct(id=record.point_id, vector=vector, payload=payload))
+            batch.clear()
+
+        while (record := chunk_queue.get()) is not _DONE:
+            batch.append(record)
+            if len(batch) >= self.embed_batch_size:
+                flush()
+        if batch:
+            flush()
+        self._put(point_queue, _DONE)
+
+    def _upsert_stage(self, point_queue: queue.Queue, stats: StreamingStats):
+        batch: List[PointStruct] = []
+
+        def flush():
+            self.client.upsert(collection_name=self.collection_name, points=batch)
+            stats.upserted += len(batch)
+            batch.clear()
+
+        while (point := point_queue.get()) is not _DONE:
+            batch.append(point)
+            if len(batch) >= self.upsert_batch_size:
+                flush()
+        if batch:
+            flush()
+
+    def _update_manifest(self, ingested: dict):
+        if self.manifest is None:
+            return
+        for path, (doc_hash, new_ids) in ingested.items():
+            stale_ids = sorted(set(self.manifest.chunk_ids(path)) - set(new_ids))
+            if stale_ids:
+                self.client.delete(collection_name=self.collection_name, points_selector=PointIdsList(points=stale_ids))
+            self.manifest.record(path, doc_hash, new_ids)
+        self.manifest.save()
+
+    # -------------------------
+    # Plumbing
+    # -------------------------
+    def _guard(self, stage, *args):
+        try:
+            stage(*args)
+        except BaseException as e:
+            # Keep the first failure; later ones are just other stages aborting
+            if self._error is None:
+                self._error = e
+            # Unblock the downstream stage so ingest() can surface the error
+            for arg in args:
+                if isinstance(arg, queue.Queue):
+                    self._put(arg, _DONE, force=True)
+
+    def _put(self, q: queue.Queue, item, force: bool = False):
+        """Blocking put that gives up once another stage has failed."""
+        while True:
+            if self._error is not None and not force:
+                raise RuntimeError("Streaming ingestion aborted") from self._error
+            try:
+                q.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                if force:
+                    # Make room for the sentinel; the run is being torn down anyway
+                    try:
+                        q.get_nowait()
+                    except queue.Empty:
+                        pass
@@ -1,7 +1,7 @@
 import os
 from qdrant_client import QdrantClient
-from qdrant_client.http import models
 from dotenv import load_dotenv
+from src.database.collections import get_schema, provision_collection
 
 load_dotenv()
 
@@ -10,23 +10,13 @@ def initialize_medical_db():
     client = QdrantClient("http://localhost:6333")
     
     collection_name = "medical_policies"
+    schema = get_schema(collection_name)
     
-    # Check if collection already exists to avoid errors
-    collections = client.get_collections().collections
-    exists = any(c.name == collection_name for c in collections)
-    
-    if not exists:
-        print(f"Creating collection: {collection_name}...")
-        client.create_collection(
-            collection_name=collection_name,
-            vectors_config=models.VectorParams(
-                size=1536,  # Standard for OpenAI embeddings
-                distance=models.Distance.COSINE # Best for text similarity
-            )
-        )
-        print("Collection created successfully!")
+    # Creates it from the registry, or checks an existing one still matches (vector size, HNSW, quantization)
+    if provision_collection(client, collection_name):
+        print(f"Collection created successfully! ({schema.model} @ {schema.dimensions} dims)")
     else:
-        print(f"ℹ️ Collection '{collection_name}' already exists. Skipping.")
+        print(f"ℹ️ Collection '{collection_name}' already exists and matches its schema.")
 
 if __name__ == "__main__":
     initialize_medical_db()
\ No newline at end of file
@@ -4,11 +4,21 @@ import sys
 # Standardize pathing for AWS App Runner
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from fastapi import FastAPI
+import asyncio
+import json
+
+import inngest.fast_api
+from fastapi import FastAPI, HTTPException
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from prometheus_client import make_asgi_app
 # CRITICAL: Removed 'src.' to match container PYTHONPATH
-from agents.graph import app as agent_graph 
+from agents.graph import BATCH_MAX_CLAIMS, BATCH_MAX_CONCURRENCY, audit_batch, audit_claim, stream_audit
+from agents.researcher import vs as vector_store
+from api.jobs import JOBS_EXECUTOR, WebhookNotAllowedError, functions, inngest_client, jobs, submit_job
 from workflows.state import AgentState
+from src.database.collections import CollectionSchemaError
 
 app = FastAPI(title="ClinAudit AI API")
 
@@ -20,13 +30,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Prometheus scrape endpoint (agent metrics, circuit breaker state)
+app.mount("/metrics", make_asgi_app())
+
+# Inngest calls back into /api/inngest to run background audit jobs step by step.
+# The local executor needs neither the endpoint nor a signing key.
+if JOBS_EXECUTOR == "inngest":
+    inngest.fast_api.serve(app, inngest_client, functions)
+
+@app.on_event("startup")
+def validate_collections():
+    """
+    Fail fast if the research collection holds vectors of another size than the
+    registered embedding model produces; every search would otherwise return garbage.
+    An unreachable Qdrant only warns, so the app still boots (see graph.get_vectorstore).
+    """
+    try:
+        problems = vector_store.validate_schema()
+    except CollectionSchemaError:
+        raise
+    except Exception as e:
+        print(f"⚠️ Could not validate '{vector_store.default_collection}' at startup: {e}")
+        return
+    for problem in problems:
+        print(f"⚠️ '{vector_store.default_collection}': {problem}")
+
 @app.get("/health")
 async def health_check():
     """AWS App Runner Health Check Endpoint"""
     return {
         "status": "healthy", 
         "version": "1.2.0",
-        "database_connected": os.getenv("QDRANT_URL") is not None
+        "database_connected": os.getenv("QDRANT_URL") is not None,
+        "circuit_breakers": {"qdrant": vector_store.breaker.snapshot()}
     }
 
 @app.get("/")
@@ -37,17 +73,76 @@ async def root():
 async def analyze_claim(request: dict):
     """Entry point for the AI Auditor"""
     try:
-        # Initialize state
-        initial_state = {
-            "messages": [("user", request.get("claim_text", ""))],
-            "retry_count": 0
-        }
-        # Run the graph
-        result = await agent_graph.ainvoke(initial_state)
-        return {"result": result}
+        # Run the graph (behind the verdict cache)
+        result, cache_tier = await audit_claim(request.get("claim_text", ""))
+        return {"result": result, "cache": cache_tier}
     except Exception as e:
         return {"error": str(e)}, 500
 
+@app.post("/analyze/batch")
+async def analyze_batch(request: dict):
+    """
+    Audits a list of claims ({"claims": [...], "max_concurrency": 16}). Duplicates are audited
+    once, retrieval for the whole batch is one embedding call and one Qdrant batch query, and
+    results come back in input order with per-claim timings.
+    """
+    claims = request.get("claims") or []
+    if not isinstance(claims, list) or not all(isinstance(claim, str) for claim in claims):
+        raise HTTPException(status_code=400, detail="claims must be a list of strings")
+    if len(claims) > BATCH_MAX_CLAIMS:
+        raise HTTPException(status_code=400, detail=f"at most {BATCH_MAX_CLAIMS} claims per batch")
+    try:
+        max_concurrency = int(request.get("max_concurrency") or BATCH_MAX_CONCURRENCY)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="max_concurrency must be an integer")
+    try:
+        return await audit_batch(claims, max_concurrency=max(1, max_concurrency))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/jobs")
+async def submit_audit_job(request: dict):
+    """
+    Queues an audit ({"claim_text": ..., "webhook_url": optional}) and returns at once.
+    Poll GET /jobs/{job_id}; `webhook_url` is POSTed the job when it completes.
+    """
+    try:
+        job = await submit_job(request.get("claim_text", ""), request.get("webhook_url"))
+    except WebhookNotAllowedError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"job_id": job["job_id"], "status": job["status"], "executor": JOBS_EXECUTOR, "poll": f"/jobs/{job['job_id']}"}
+
+@app.get("/jobs/{job_id}")
+async def get_audit_job(job_id: str):
+    """Job status: queued | running (with the current graph step) | completed (with result) | failed."""
+    job = await asyncio.to_thread(jobs.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+@app.post("/analyze/stream")
+async def analyze_claim_stream(request: dict):
+    """
+    Server-Sent Events version of /analyze: "accepted" immediately, then one event per graph
+    step ("step_started" / "step_finished" with the evidence summary or verdict), "token" for
+    each auditor token, and "result" (same body as /analyze) or "error" at the end.
+    """
+    claim_text = request.get("claim_text", "")
+
+    async def events():
+        yield _sse("accepted", {"claim_text": claim_text})
+        try:
+            async for event, data in stream_audit(claim_text):
+                yield _sse(event, data)
+        except Exception as e:
+            yield _sse("error", {"error": str(e)})
+
+    # No buffering by proxies (nginx honours X-Accel-Buffering), so events arrive as they happen
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
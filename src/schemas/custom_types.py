@@ -1,8 +1,27 @@
 from dataclasses import dataclass
-from typing import List
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, field_validator
 
 @dataclass
 class RAGSearchResult:
     contexts: List[str]
     sources: List[str]
     scores: List[float]
+    # Page of each chunk and its dense vector, when the search returned them
+    pages: Optional[List[Optional[int]]] = None
+    vectors: Optional[List[List[float]]] = None
+
+class AuditVerdict(BaseModel):
+    """Auditor verdict for one claim against the retrieved evidence."""
+    faithfulness_score: float = Field(description="0.0-1.0: how well the evidence supports the claim")
+    verdict: Literal["PASS", "FAIL"]
+    supported_claims: int = 0
+    unsupported_claims: int = 0
+    issues: List[str] = Field(default_factory=list)
+    confidence: float = Field(default=0.0, description="0.0-1.0: how certain it is that the evidence settles the verdict")
+
+    @field_validator("faithfulness_score", "confidence")
+    @classmethod
+    def _clamp(cls, value: float) -> float:
+        return min(max(value, 0.0), 1.0)
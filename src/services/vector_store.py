@@ -1,13 +1,13 @@
 from langchain_qdrant import QdrantVectorStore
-from langchain_openai import OpenAIEmbeddings
+from src.database.collections import embeddings_for
 from qdrant_client import QdrantClient
 
 def get_vector_store():
     client = QdrantClient(path="data/qdrant_db")
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+    collection_name = "medical_knowledge"
     
     return QdrantVectorStore(
         client=client,
-        collection_name="medical_knowledge",
-        embedding=embeddings
+        collection_name=collection_name,
+        embedding=embeddings_for(collection_name)
     )
\ No newline at end of file
@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, TypeVar
+
+from src.utils.metrics import CIRCUIT_BREAKER_REJECTIONS, CIRCUIT_BREAKER_STATE
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Gauge values for the prometheus `circuit_breaker_state` metric
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a dependency whose breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker over a sliding window of the last `window` calls.
+    A call counts as failed if it raises or takes longer than `slow_call_seconds`.
+    Once `min_calls` are recorded and the failure rate reaches `failure_rate_threshold`,
+    the breaker opens and callers fail fast for `open_seconds`; then up to
+    `half_open_max_calls` probes decide whether it closes again or re-opens.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = float(os.getenv("BREAKER_FAILURE_RATE", "0.5")),
+        slow_call_seconds: float = float(os.getenv("BREAKER_SLOW_CALL_SECONDS", "2.0")),
+        window: int = 20,
+        min_calls: int = 5,
+        open_seconds: float = float(os.getenv("BREAKER_OPEN_SECONDS", "30")),
+        half_open_max_calls: int = 1,
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._outcomes = deque(maxlen=window)  # True = failed or slow
+        self._latencies = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+        CIRCUIT_BREAKER_STATE.labels(name).set(STATE_VALUES[CLOSED])
+
+    def _transition(self, state: str) -> None:
+        if state == self._state:
+            return
+        print(f"🔌 Circuit '{self.name}': {self._state} -> {state}")
+        self._state = state
+        self._half_open_calls = 0
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        else:
+            self._outcomes.clear()
+        CIRCUIT_BREAKER_STATE.labels(self.name).set(STATE_VALUES[state])
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self._transition(HALF_OPEN)
+            return self._state
+
+    def is_available(self) -> bool:
+        """Whether a call would currently be attempted. No network round trip."""
+        return self.state != OPEN
+
+    def _acquire(self) -> None:
+        state = self.state
+        with self._lock:
+            if state == OPEN or (state == HALF_OPEN and self._half_open_calls >= self.half_open_max_calls):
+                CIRCUIT_BREAKER_REJECTIONS.labels(self.name).inc()
+                raise CircuitOpenError(f"Circuit '{self.name}' is open; failing fast")
+            if state == HALF_OPEN:
+                self._half_open_calls += 1
+
+    def _record(self, failed: bool, seconds: float) -> None:
+        with self._lock:
+            failed = failed or seconds > self.slow_call_seconds
+            self._latencies.append(seconds)
+            if self._state == HALF_OPEN:
+                self._transition(OPEN if failed else CLOSED)
+                return
+            self._outcomes.append(failed)
+            if len(self._outcomes) >= self.min_calls and self._failure_rate() >= self.failure_rate_threshold:
+                self._transition(OPEN)
+
+    def _failure_rate(self) -> float:
+        return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    def call(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Runs `fn` under the breaker, raising `CircuitOpenError` without calling it when open."""
+        self._acquire()
+        start = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self._record(True, time.monotonic() - start)
+            raise
+        self._record(False, time.monotonic() - start)
+        return result
+
+    async def acall(self, fn: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        """Async counterpart of `call` for coroutine functions."""
+        self._acquire()
+        start = time.monotonic()
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception:
+            self._record(True, time.monotonic() - start)
+            raise
+        self._record(False, time.monotonic() - start)
+        return result
+
+    def snapshot(self) -> dict:
+        """Breaker state for health checks and dashboards."""
+        state = self.state
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                "state": state,
+                "failure_rate": round(self._failure_rate(), 3),
+                "calls_in_window": len(self._outcomes),
+                "p50_latency_ms": round(1000 * latencies[len(latencies) // 2], 1) if latencies else None,
+                "max_latency_ms": round(1000 * latencies[-1], 1) if latencies else None,
+                "retry_in_seconds": round(max(0.0, self.open_seconds - (time.monotonic() - self._opened_at)), 1) if state == OPEN else None,
+            }
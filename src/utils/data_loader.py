@@ -1,32 +1,28 @@
-from llama_index.readers.file import PDFReader
-from llama_index.core.node_parser import SentenceSplitter
+from pypdf import PdfReader
 from dotenv import load_dotenv
+from src.ingestion.chunking import ChunkBudget, DEFAULT_BUDGET, TokenChunker
 
 # Load environment variables for any needed API keys
 load_dotenv()
 
 class MedicalDataLoader:
-    def __init__(self, chunk_size=1000, chunk_overlap=200):
-        # Tim uses SentenceSplitter to keep medical sentences intact
-        self.splitter = SentenceSplitter(
-            chunk_size=chunk_size, 
-            chunk_overlap=chunk_overlap
-        )
+    def __init__(self, budget: ChunkBudget = DEFAULT_BUDGET):
+        # Shared token-aware chunker keeps medical sentences and table rows intact
+        self.chunker = TokenChunker(budget)
+
+    def iter_chunks(self, file_path: str):
+        """Yields chunks page by page so callers can embed and upload as they go"""
+        # pypdf (what llama-index's PDFReader wraps) parses pages on access, so only the
+        # pages being chunked are held in memory instead of the whole document
+        reader = PdfReader(file_path)
+
+        # Screenshot 4 logic: Safely extract text from each page
+        texts = (page.extract_text() or "" for page in reader.pages)
+
+        # Split the text into manageable chunks
+        for _, chunk in self.chunker.iter_chunks(texts):
+            yield chunk
 
     def load_and_chunk_pdf(self, file_path: str):
         """As seen in Screenshot 4: Extracts and chunks text from a PDF"""
-        # Initialize the PDF reader
-        reader = PDFReader()
-        
-        # Load the data from the PDF file
-        docs = reader.load_data(file=file_path)
-        
-        # Screenshot 4 logic: Safely extract text from each document
-        texts = [getattr(d, "text", "") for d in docs]
-        
-        chunks = []
-        for t in texts:
-            # Split the text into manageable chunks
-            chunks.extend(self.splitter.split_text(t))
-            
-        return chunks
\ No newline at end of file
+        return list(self.iter_chunks(file_path))
\ No newline at end of file
@@ -0,0 +1,203 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "data/embedding_cache.sqlite3")
+DEFAULT_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "500000"))
+# Cache hits only record their `last_used` time in memory; it is written with the next
+# put, or once this many keys are pending
+TOUCH_FLUSH_SIZE = int(os.getenv("EMBEDDING_CACHE_TOUCH_FLUSH_SIZE", "1000"))
+
+
+class EmbeddingCache:
+    """
+    On-disk, content-addressed embedding cache keyed by (model, normalized text hash).
+    Shared by the ingestion scripts and the researcher so unchanged text is only
+    ever embedded once. Least-recently-used entries are evicted past `max_entries`.
+
+    Reads do not write: hit times are batched into the next write. Eviction keeps a
+    running row count and only runs COUNT(*) once the count passes `max_entries`
+    (other processes may have evicted in the meantime).
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON embeddings(last_used)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        self._touched = {}  # key -> last hit time, not yet written
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        # Whitespace-only differences (PDF re-extraction, line wraps) share an entry
+        return " ".join(text.split())
+
+    def key(self, model: str, text: str) -> str:
+        digest = hashlib.sha256(self.normalize(text).encode("utf-8")).hexdigest()
+        return f"{model}:{digest}"
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        keys = [self.key(model, t) for t in texts]
+        found = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i : i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                self._touched.update((k, now) for k in found)
+                if len(self._touched) >= TOUCH_FLUSH_SIZE:
+                    self._flush_touched()
+                    self._conn.commit()
+
+        results = []
+        for k in keys:
+            blob = found.get(k)
+            results.append(array("f", blob).tolist() if blob is not None else None)
+        hits = sum(r is not None for r in results)
+        self.hits += hits
+        self.misses += len(results) - hits
+        return results
+
+    def put_many(self, model: str, texts: List[str], vectors: List[List[float]]) -> None:
+        now = time.time()
+        rows = [
+            (self.key(model, t), model, array("f", v).tobytes(), now)
+            for t, v in zip(texts, vectors)
+        ]
+        with self._lock:
+            # Keys are content hashes, so an existing row already holds this vector
+            inserted = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, model, vector, last_used) VALUES (?, ?, ?, ?)",
+                rows,
+            ).rowcount
+            self._count += max(inserted, 0)
+            self._flush_touched()
+            self._evict()
+            self._conn.commit()
+
+    def flush(self) -> None:
+        """Writes pending hit times (call before handing the file to another process)."""
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+
+    def _flush_touched(self) -> None:
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(t, k) for k, t in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _evict(self) -> None:
+        if self._count <= self.max_entries:
+            return
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = self._count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                (overflow,),
+            )
+            self._count -= overflow
+
+
+_default_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide cache instance backed by `EMBEDDING_CACHE_PATH`."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = EmbeddingCache()
+    return _default_cache
+
+
+def embedding_model_key(embeddings) -> str:
+    """Cache namespace for a LangChain embeddings object, including truncated dimensions."""
+    model = getattr(embeddings, "model", type(embeddings).__name__)
+    dimensions = getattr(embeddings, "dimensions", None)
+    return f"{model}@{dimensions}" if dimensions else model
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Read-through wrapper around any LangChain `Embeddings` (e.g. OpenAIEmbeddings).
+    Only texts missing from the cache reach the underlying model.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: Optional[EmbeddingCache] = None, model: Optional[str] = None):
+        self.embeddings = embeddings
+        self.cache = cache or get_embedding_cache()
+        self.model = model or embedding_model_key(embeddings)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.cache.get_many(self.model, texts)
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing:
+            fresh = self.embeddings.embed_documents([texts[i] for i in missing])
+            self.cache.put_many(self.model, [texts[i] for i in missing], fresh)
+            for i, vector in zip(missing, fresh):
+                vectors[i] = vector
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        cached = self.cache.get_many(self.model, [text])[0]
+        if cached is not None:
+            return cached
+        vector = self.embeddings.embed_query(text)
+        self.cache.put_many(self.model, [text], [vector])
+        return vector
+
+    # The async methods run SQLite in a worker thread: a write (and its commit or eviction)
+    # must not stall every other request on the event loop
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = await asyncio.to_thread(self.cache.get_many, self.model, texts)
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing:
+            fresh = await self.embeddings.aembed_documents([texts[i] for i in missing])
+            await asyncio.to_thread(self.cache.put_many, self.model, [texts[i] for i in missing], fresh)
+            for i, vector in zip(missing, fresh):
+                vectors[i] = vector
+        return vectors
+
+    async def aembed_query(self, text: str) -> List[float]:
+        cached = (await asyncio.to_thread(self.cache.get_many, self.model, [text]))[0]
+        if cached is not None:
+            return cached
+        vector = await self.embeddings.aembed_query(text)
+        await asyncio.to_thread(self.cache.put_many, self.model, [text], [vector])
+        return vector
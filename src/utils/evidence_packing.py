@@ -0,0 +1,151 @@
+import os
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+try:
+    import tiktoken
+except ImportError:  # Token counts fall back to a ~4 chars/token estimate
+    tiktoken = None
+
+from src.utils.verdict_cache import claim_vector, normalize_claim
+
+# Evidence tokens handed to the auditor per audit
+EVIDENCE_TOKEN_BUDGET = int(os.getenv("EVIDENCE_TOKEN_BUDGET", "2000"))
+# MMR trade-off: 1.0 ranks by relevance only, lower values favour chunks unlike those already picked
+EVIDENCE_MMR_LAMBDA = float(os.getenv("EVIDENCE_MMR_LAMBDA", "0.7"))
+# Cosine at or above which a chunk is a near-duplicate of one already packed
+EVIDENCE_DUPLICATE_SIMILARITY = float(os.getenv("EVIDENCE_DUPLICATE_SIMILARITY", "0.95"))
+# Shortest shared run of characters treated as chunk overlap rather than coincidence
+MIN_OVERLAP_CHARS = 40
+
+_encoding = None
+
+
+def count_tokens(texts: List[str]) -> List[int]:
+    global _encoding
+    if tiktoken is None:
+        return [len(t) // 4 + 1 for t in texts]
+    if _encoding is None:
+        _encoding = tiktoken.get_encoding("cl100k_base")
+    return [len(ids) for ids in _encoding.encode_ordinary_batch(texts)]
+
+
+@dataclass
+class EvidenceChunk:
+    text: str
+    source: str
+    score: float
+    page: Optional[int] = None
+    vector: Optional[np.ndarray] = None
+
+
+def chunks_from_result(search_result) -> List[EvidenceChunk]:
+    """EvidenceChunks from a RAGSearchResult; pages and vectors are used when the search returned them."""
+    n = len(search_result.contexts)
+    pages = getattr(search_result, "pages", None) or [None] * n
+    vectors = getattr(search_result, "vectors", None) or [None] * n
+    return [
+        EvidenceChunk(text, source, score, page, None if vector is None else np.asarray(vector, dtype=np.float32))
+        for text, source, score, page, vector in zip(search_result.contexts, search_result.sources, search_result.scores, pages, vectors)
+    ]
+
+
+def _merge_text(first: str, second: str) -> Optional[str]:
+    """`first` followed by `second` if `second` starts with a tail of `first` (or is inside it)."""
+    if second in first:
+        return first
+    probe = second[:MIN_OVERLAP_CHARS]
+    if len(probe) < MIN_OVERLAP_CHARS:
+        return None
+    start = first.find(probe)
+    while start != -1:
+        tail = first[start:]
+        if second.startswith(tail):
+            return first + second[len(tail):]
+        start = first.find(probe, start + 1)
+    return None
+
+
+def merge_overlapping(chunks: List[EvidenceChunk]) -> List[EvidenceChunk]:
+    """
+    Joins chunks from the same source and page whose text overlaps (chunker overlap, or the
+    same passage hit by several queries) into one chunk with the better score.
+    """
+    merged: List[EvidenceChunk] = []
+    for chunk in chunks:
+        current = chunk
+        changed = True
+        while changed:
+            changed = False
+            for i, other in enumerate(merged):
+                if (other.source, other.page) != (current.source, current.page):
+                    continue
+                text = _merge_text(other.text, current.text) or _merge_text(current.text, other.text)
+                if text is None:
+                    continue
+                vectors = [v for v in (other.vector, current.vector) if v is not None]
+                vector = None
+                if len(vectors) == 2:
+                    vector = vectors[0] + vectors[1]
+                    vector /= np.linalg.norm(vector) or 1.0
+                elif vectors:
+                    vector = vectors[0]
+                current = EvidenceChunk(text, current.source, max(other.score, current.score), current.page, vector)
+                del merged[i]
+                changed = True
+                break
+        merged.append(current)
+    return merged
+
+
+def mmr_order(
+    chunks: List[EvidenceChunk],
+    mmr_lambda: float = EVIDENCE_MMR_LAMBDA,
+    duplicate_similarity: float = EVIDENCE_DUPLICATE_SIMILARITY,
+) -> List[EvidenceChunk]:
+    """
+    Maximal Marginal Relevance order over the chunk vectors (search vectors when every chunk
+    has one, else local n-gram vectors of the text), dropping near-duplicates.
+    """
+    if len(chunks) < 2:
+        return list(chunks)
+    if all(c.vector is not None for c in chunks):
+        vectors = np.stack([c.vector for c in chunks])
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True).clip(min=1e-12)
+    else:
+        vectors = np.stack([claim_vector(normalize_claim(c.text)) for c in chunks])
+    similarity = vectors @ vectors.T
+
+    scores = np.array([c.score for c in chunks], dtype=np.float32)
+    spread = scores.max() - scores.min()
+    relevance = (scores - scores.min()) / spread if spread > 0 else np.ones_like(scores)
+
+    selected: List[int] = []
+    remaining = np.ones(len(chunks), dtype=bool)
+    # Highest similarity of each chunk to anything selected so far
+    redundancy = np.zeros(len(chunks), dtype=np.float32)
+    while remaining.any():
+        mmr = np.where(remaining, mmr_lambda * relevance - (1 - mmr_lambda) * redundancy, -np.inf)
+        best = int(np.argmax(mmr))
+        remaining[best] = False
+        selected.append(best)
+        redundancy = np.maximum(redundancy, similarity[best])
+        remaining &= redundancy < duplicate_similarity
+    return [chunks[i] for i in selected]
+
+
+def pack_evidence(chunks: List[EvidenceChunk], budget_tokens: int = EVIDENCE_TOKEN_BUDGET) -> List[EvidenceChunk]:
+    """
+    Evidence for the auditor prompt: overlapping chunks merged, near-duplicates dropped, then
+    chunks taken in MMR order while they fit `budget_tokens`. The first chunk is always kept.
+    """
+    ordered = mmr_order(merge_overlapping(chunks))
+    packed, used = [], 0
+    for chunk, tokens in zip(ordered, count_tokens([c.text for c in ordered])):
+        if packed and used + tokens > budget_tokens:
+            continue  # A shorter, lower-ranked chunk may still fit
+        packed.append(chunk)
+        used += tokens
+    return packed
@@ -1,56 +1,86 @@
-import uuid
 import os
-from openai import OpenAI
+from itertools import islice
+from qdrant_client.models import PointIdsList
 from src.utils.data_loader import MedicalDataLoader
 from src.utils.vector_store import MedicalVectorStore
+from src.database.collections import get_schema, provision_collection
+from src.ingestion.embedding_pipeline import EmbeddingPipeline
+from src.utils.embedding_cache import get_embedding_cache
+from src.ingestion.manifest import IngestionManifest, default_manifest_path, file_sha256, stable_point_id
+from src.ingestion.code_index import extract_codes
+from src.ingestion.payload_schema import make_payload
+from src.ingestion.chunking import budget_for
+from src.ingestion.sparse import get_sparse_encoder
 from dotenv import load_dotenv
 
 # Load environment variables (API Keys)
 load_dotenv()
 
-def run_ingestion():
-    # 1. Initialize our Tech With Tim style tools
-    client = OpenAI()
-    loader = MedicalDataLoader(chunk_size=1000, chunk_overlap=200)
-    vs = MedicalVectorStore()
+# Chunks embedded and uploaded per round trip
+UPLOAD_BATCH_SIZE = 256
+
+def run_ingestion(pdf_path: str = "data/medicare_policy.pdf", vs: MedicalVectorStore = None, pipeline: EmbeddingPipeline = None):
+    # 1. Initialize our Tech With Tim style tools (injectable for offline runs and benchmarks)
+    vs = vs or MedicalVectorStore()
+    loader = MedicalDataLoader(budget=budget_for(vs.default_collection))
 
-    # Path to your medical PDF
-    pdf_path = "data/medicare_policy.pdf"
-    
     if not os.path.exists(pdf_path):
         print(f"❌ Error: Could not find {pdf_path}. Ensure it's in the 'data' folder.")
         return
 
-    # 2. Extract and Chunk
+    # 2. Extract and Chunk (streamed, so memory stays flat for large PDFs)
     print("📖 Reading and chunking medical policy...")
-    chunks = loader.load_and_chunk_pdf(pdf_path)
-
-    # 3. Generate High-Accuracy Embeddings
-    print(f"Embedding {len(chunks)} chunks with 'text-embedding-3-large'...")
-    embeddings_response = client.embeddings.create(
-        input=chunks,
-        model="text-embedding-3-large"
-    )
-
-    # 4. Prepare for Qdrant
-    ids = [str(uuid.uuid4()) for _ in chunks]
-    vectors = [e.embedding for e in embeddings_response.data]
-    
-    # Payload matches the schema for the Auditor to cite evidence
-    payloads = [
-        {
-            "text": chunk_text, 
-            "source": os.path.basename(pdf_path),
-            "type": "medical_policy"
-        } 
-        for chunk_text in chunks
-    ]
-
-    # 5. Push to Local Qdrant
-    print("Uploading evidence to Qdrant...")
-    vs.upsert(ids=ids, vectors=vectors, payloads=payloads)
-    
-    print(f"Success! Your Auditor now has {len(chunks)} verified medical rules.")
+    chunks = loader.iter_chunks(pdf_path)
+
+    # 3. Generate High-Accuracy Embeddings (token-bounded batches, not one giant request)
+    schema = get_schema(vs.default_collection)
+    print(f"Embedding chunks with '{schema.model}' @ {schema.dimensions} dims...")
+    pipeline = pipeline or EmbeddingPipeline.from_langchain(schema.embeddings(), cache=get_embedding_cache())
+
+    # Deterministic IDs: re-running overwrites the same points instead of duplicating them
+    doc_hash = file_sha256(pdf_path)
+    total = 0
+    point_ids = []
+    # Creates the collection (with its `codes` keyword index) or fails fast on a dimension mismatch
+    provision_collection(vs.client, vs.default_collection)
+    # BM25 vectors for hybrid search, if the collection was created with a sparse slot
+    sparse_encoder = get_sparse_encoder() if vs.has_sparse_vectors() else None
+
+    while batch := list(islice(chunks, UPLOAD_BATCH_SIZE)):
+        vectors = pipeline.embed(batch)
+
+        # 4. Prepare for Qdrant
+        ids = [stable_point_id(doc_hash, total + i) for i in range(len(batch))]
+
+        # Payload matches the schema for the Auditor to cite evidence
+        payloads = [
+            make_payload(
+                chunk_text,
+                os.path.basename(pdf_path),
+                codes=extract_codes(chunk_text),
+                document_type="medical_policy"
+            )
+            for chunk_text in batch
+        ]
+
+        # 5. Push to Local Qdrant
+        sparse_vectors = sparse_encoder.encode_documents(batch) if sparse_encoder else None
+        vs.upsert(ids=ids, vectors=vectors, payloads=payloads, sparse_vectors=sparse_vectors)
+        point_ids.extend(ids)
+        total += len(batch)
+        print(f"Uploaded {total} chunks to Qdrant...")
+
+    # 6. Record the file in the collection's manifest, like the streaming loaders: chunks
+    # left over from an older version are removed, and the verdict cache's policy
+    # version changes with the new content
+    manifest = IngestionManifest.load(default_manifest_path(vs.default_collection))
+    stale_ids = sorted(set(manifest.chunk_ids(pdf_path)) - set(point_ids))
+    if stale_ids:
+        vs.breaker.call(vs.client.delete, collection_name=vs.default_collection, points_selector=PointIdsList(points=stale_ids))
+    manifest.record(pdf_path, doc_hash, point_ids)
+    manifest.save()
+
+    print(f"Success! Your Auditor now has {total} verified medical rules.")
 
 if __name__ == "__main__":
     run_ingestion()
\ No newline at end of file
@@ -0,0 +1,247 @@
+"""
+Response cache for deterministic LLM calls (temperature 0): the same model, parameters and
+prompt always get the same answer, so re-runs and evaluations reuse it instead of paying
+for another completion.
+
+Keys hash (model, params, prompt template version, prompt). Each call site names a
+`namespace` and passes its template version; writing under a new version drops that
+namespace's entries from older versions. Backends: "memory" (per-process LRU) or "disk"
+(SQLite, shared by processes), both with a TTL; "off" disables caching. A `validate`
+callable keeps answers the caller cannot use (unparseable JSON) out of the cache.
+
+    response = cached_invoke(llm, messages, namespace="auditor", prompt_version="2", validate=is_json)
+"""
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage
+
+from src.utils.metrics import LLM_CACHE_LOOKUPS
+
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "disk")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "data/llm_cache.sqlite3")
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "604800"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "100000"))
+
+
+def cache_key(model: str, params: dict, prompt: Any, prompt_version: str) -> str:
+    raw = json.dumps({"model": model, "params": params, "prompt_version": prompt_version, "prompt": prompt}, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class MemoryLLMCache:
+    """Per-process LRU of responses with a TTL."""
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, ttl_seconds: float = LLM_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (namespace, prompt_version, response, created_at)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[3] > self.ttl_seconds:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: str, response: str, namespace: str, prompt_version: str) -> None:
+        with self._lock:
+            self._entries[key] = (namespace, prompt_version, response, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, namespace: Optional[str] = None, keep_version: Optional[str] = None) -> None:
+        """Drops a namespace's entries (all of them, or those not written under `keep_version`)."""
+        with self._lock:
+            for key, (entry_namespace, entry_version, _, _) in list(self._entries.items()):
+                if namespace in (None, entry_namespace) and entry_version != keep_version:
+                    del self._entries[key]
+
+
+class SQLiteLLMCache:
+    """
+    On-disk responses, shared by the API workers and the evaluation scripts. Expired
+    entries are dropped on read; least-recently-used ones are evicted past `max_entries`.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_entries: int = LLM_CACHE_MAX_ENTRIES, ttl_seconds: float = LLM_CACHE_TTL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                namespace TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str, namespace: str, prompt_version: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, namespace, prompt_version, response, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, namespace, prompt_version, response, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def invalidate(self, namespace: Optional[str] = None, keep_version: Optional[str] = None) -> None:
+        """Drops a namespace's entries (all of them, or those not written under `keep_version`)."""
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM responses WHERE (? IS NULL OR namespace = ?) AND (? IS NULL OR prompt_version != ?)",
+                (namespace, namespace, keep_version, keep_version),
+            )
+            self._conn.commit()
+
+
+_default_cache = None
+_current_versions = set()
+
+
+def get_llm_cache():
+    """Process-wide backend selected by `LLM_CACHE_BACKEND` (None when "off")."""
+    global _default_cache
+    if _default_cache is None and LLM_CACHE_BACKEND != "off":
+        _default_cache = MemoryLLMCache() if LLM_CACHE_BACKEND == "memory" else SQLiteLLMCache()
+    return _default_cache
+
+
+def _lookup(namespace: str, key: str) -> Optional[str]:
+    cache = get_llm_cache()
+    response = cache.get(key) if cache is not None else None
+    LLM_CACHE_LOOKUPS.labels(namespace, "hit" if response is not None else "miss").inc()
+    return response
+
+
+def _store(namespace: str, prompt_version: str, key: str, response: str) -> None:
+    cache = get_llm_cache()
+    if cache is None:
+        return
+    # First write under this template version: answers to older templates are stale
+    if (namespace, prompt_version) not in _current_versions:
+        cache.invalidate(namespace, keep_version=prompt_version)
+        _current_versions.add((namespace, prompt_version))
+    cache.put(key, response, namespace, prompt_version)
+
+
+def _chat_key(llm, prompt, prompt_version: str, call_kwargs: dict) -> Optional[str]:
+    """Cache key for a LangChain chat model call; None when the model is not deterministic."""
+    params = dict(getattr(llm, "_identifying_params", None) or {})
+    if get_llm_cache() is None or params.get("temperature") != 0:
+        return None
+    if isinstance(prompt, str):
+        serialized = [["human", prompt]]
+    else:
+        serialized = [[m.type, m.content] if isinstance(m, BaseMessage) else list(m) for m in prompt]
+    model = params.pop("model_name", None) or params.get("model") or type(llm).__name__
+    params.pop("model", None)
+    # Per-call options such as `response_format` change the answer too
+    params.update(call_kwargs)
+    return cache_key(model, params, serialized, prompt_version)
+
+
+def cached_invoke(llm, prompt, namespace: str, prompt_version: str, validate: Optional[Callable[[str], bool]] = None, **kwargs):
+    """
+    `llm.invoke(prompt, **kwargs)` through the cache; a hit returns an AIMessage with the
+    cached text. Responses failing `validate` are returned but not stored.
+    """
+    key = _chat_key(llm, prompt, prompt_version, kwargs)
+    if key is None:
+        return llm.invoke(prompt, **kwargs)
+    cached = _lookup(namespace, key)
+    if cached is not None:
+        return AIMessage(content=cached)
+    response = llm.invoke(prompt, **kwargs)
+    if validate is None or validate(response.content):
+        _store(namespace, prompt_version, key, response.content)
+    return response
+
+
+async def acached_invoke(llm, prompt, namespace: str, prompt_version: str, validate: Optional[Callable[[str], bool]] = None, **kwargs):
+    """Async `cached_invoke`; cache reads and writes run in a worker thread (SQLite blocks)."""
+    key = _chat_key(llm, prompt, prompt_version, kwargs)
+    if key is None:
+        return await llm.ainvoke(prompt, **kwargs)
+    cached = await asyncio.to_thread(_lookup, namespace, key)
+    if cached is not None:
+        return AIMessage(content=cached)
+    response = await llm.ainvoke(prompt, **kwargs)
+    if validate is None or validate(response.content):
+        await asyncio.to_thread(_store, namespace, prompt_version, key, response.content)
+    return response
+
+
+def cached_completion(client, namespace: str, prompt_version: str, validate: Optional[Callable[[str], bool]] = None, **kwargs) -> str:
+    """
+    `client.chat.completions.create(**kwargs)` (OpenAI SDK) through the cache; returns the
+    message text. Only temperature-0 requests are cached, and only when `validate` passes.
+    """
+    if get_llm_cache() is None or kwargs.get("temperature") != 0:
+        return client.chat.completions.create(**kwargs).choices[0].message.content
+    params = {name: value for name, value in kwargs.items() if name not in ("model", "messages")}
+    key = cache_key(kwargs["model"], params, kwargs["messages"], prompt_version)
+    cached = _lookup(namespace, key)
+    if cached is not None:
+        return cached
+    content = client.chat.completions.create(**kwargs).choices[0].message.content
+    if validate is None or validate(content):
+        _store(namespace, prompt_version, key, content)
+    return content
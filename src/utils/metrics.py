@@ -25,4 +25,72 @@ TOKEN_USAGE_COUNTER = Counter(
     "factguard_tokens_total",
     "Total tokens consumed by agents",
     ["model_name"]
-)
\ No newline at end of file
+)
+
+# 5. Circuit breaker health for external dependencies (0 = closed, 1 = half-open, 2 = open)
+CIRCUIT_BREAKER_STATE = Gauge(
+    "factguard_circuit_breaker_state",
+    "Current circuit breaker state per dependency",
+    ["dependency"]
+)
+
+CIRCUIT_BREAKER_REJECTIONS = Counter(
+    "factguard_circuit_breaker_rejections_total",
+    "Calls rejected without being attempted because the breaker was open",
+    ["dependency"]
+)
+
+# 6. Verdict cache effectiveness (exact / semantic hits vs. misses that ran the graph)
+VERDICT_CACHE_LOOKUPS = Counter(
+    "factguard_verdict_cache_lookups_total",
+    "Verdict cache lookups by outcome",
+    ["result"]
+)
+
+# 7. Evidence tokens sent to the auditor, before and after packing (merge, dedupe, budget)
+EVIDENCE_TOKENS = Histogram(
+    "factguard_evidence_tokens",
+    "Tokens of retrieved evidence per audit prompt",
+    ["stage"],
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000)
+)
+
+# 8. Per-collection search latency inside federated search
+FEDERATED_SEARCH_LATENCY = Histogram(
+    "factguard_federated_search_seconds",
+    "Search latency per collection during federated search",
+    ["collection"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+
+# 9. Auditor cascade: which tier settled each audit, how long it took, and why claims escalated
+AUDITOR_TIER_DECISIONS = Counter(
+    "factguard_auditor_tier_decisions_total",
+    "Audits settled per auditor tier (0 rules, 1 fast model, 2 GPT-4o)",
+    ["tier"]
+)
+AUDITOR_TIER_LATENCY = Histogram(
+    "factguard_auditor_tier_seconds",
+    "Latency of the deciding auditor tier",
+    ["tier"],
+    buckets=(0.001, 0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+AUDITOR_ESCALATIONS = Counter(
+    "factguard_auditor_escalations_total",
+    "Claims escalated to the tier-2 model, by reason",
+    ["reason"]
+)
+
+# 10. LLM response cache (temperature-0 calls answered without a completion)
+LLM_CACHE_LOOKUPS = Counter(
+    "factguard_llm_cache_lookups_total",
+    "LLM response cache lookups by call site and outcome",
+    ["namespace", "result"]
+)
+
+# 11. Auditor output parsing: schema-valid, locally repaired, or unparseable
+AUDITOR_PARSE_OUTCOMES = Counter(
+    "factguard_auditor_parse_outcomes_total",
+    "Auditor LLM outputs by parse outcome",
+    ["outcome"]
+)
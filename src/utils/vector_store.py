@@ -1,61 +1,556 @@
+import asyncio
 import os
-from typing import List, Optional
-from dataclasses import dataclass
-from qdrant_client import QdrantClient
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+import numpy as np
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.models import Batch, CollectionInfo, Fusion, FusionQuery, Prefetch, QueryRequest, SparseVector
+from src.database.collections import COLLECTIONS, schema_problems
+from src.ingestion.code_index import CodeIndex
+from src.ingestion.payload_schema import PAGE_FIELD, SEARCH_FIELDS, SOURCE_FIELD, TEXT_FIELD, is_compact
+from src.ingestion.sparse import SPARSE_VECTOR_NAME, get_sparse_encoder
+from src.utils.circuit_breaker import CircuitBreaker
+from src.utils.metrics import FEDERATED_SEARCH_LATENCY
+
+# How long collection existence/schema is trusted before asking Qdrant again
+COLLECTION_CACHE_TTL_SECONDS = float(os.getenv("COLLECTION_CACHE_TTL_SECONDS", "300"))
+# A missing collection is re-checked sooner: it usually appears once ingestion creates it
+COLLECTION_MISSING_TTL_SECONDS = float(os.getenv("COLLECTION_MISSING_TTL_SECONDS", "10"))
+# Candidates each of the dense and sparse legs contribute before rank fusion
+HYBRID_PREFETCH_MULTIPLIER = 4
+HYBRID_MIN_PREFETCH = 20
+# Reciprocal Rank Fusion constant for merging multi-query result lists
+RRF_K = 60
+# Collections searched together by federated search, in priority order (missing ones are skipped)
+FEDERATED_COLLECTIONS = [
+    name.strip()
+    for name in os.getenv("FEDERATED_COLLECTIONS", "medicare_protocols,medical_policies,medical_knowledge,pubmed_docs").split(",")
+    if name.strip()
+]
+
+# Per collection: the query vectors (embedded with that collection's model) and their texts
+FederatedQueries = Dict[str, Tuple[List[List[float]], List[str]]]
 
 @dataclass
 class RAGSearchResult:
     contexts: List[str]
     sources: List[str]
     scores: List[float]
+    # Page of each chunk and its dense vector, when the search returned them
+    pages: Optional[List[Optional[int]]] = None
+    vectors: Optional[List[List[float]]] = None
+
+@dataclass
+class FederatedSearchResult(RAGSearchResult):
+    # Collection each hit came from, and how long each collection's search took
+    collections: List[str] = field(default_factory=list)
+    latency_ms: Dict[str, float] = field(default_factory=dict)
 
 class MedicalVectorStore:
-    def __init__(self):
+    def __init__(self, client: Optional[QdrantClient] = None, async_client: Optional[AsyncQdrantClient] = None):
         qdrant_url = os.getenv("QDRANT_URL", "http://localhost:6333")
-        self.client = QdrantClient(url=qdrant_url)
+        self.client = client or QdrantClient(url=qdrant_url)
+        # Used by the async graph nodes so searches never block the event loop
+        self.async_client = async_client or AsyncQdrantClient(url=qdrant_url)
         # Default fallback, but we will override this in the search call
         self.default_collection = "medicare_protocols"
+        # Per-collection code -> chunk maps, built lazily on first code lookup
+        self.code_indexes = {}
+        # collection name -> (CollectionInfo, or None if missing; fetched at)
+        self._collections = {}
+        self._collections_lock = threading.Lock()
+        # Every Qdrant call goes through one breaker, so a down or slow cluster fails fast
+        self.breaker = CircuitBreaker("qdrant")
+
+    def is_available(self) -> bool:
+        """Cheap health check for callers: False while the Qdrant breaker is open."""
+        return self.breaker.is_available()
+
+    def _cached_collection(self, collection_name: str):
+        with self._collections_lock:
+            cached = self._collections.get(collection_name)
+        ttl = COLLECTION_CACHE_TTL_SECONDS if cached and cached[0] is not None else COLLECTION_MISSING_TTL_SECONDS
+        if cached and time.monotonic() - cached[1] < ttl:
+            return cached
+        return None
+
+    def _cache_collection(self, collection_name: str, info: Optional[CollectionInfo]):
+        with self._collections_lock:
+            self._collections[collection_name] = (info, time.monotonic())
+
+    def collection_info(self, collection_name: str) -> Optional[CollectionInfo]:
+        """
+        Schema of `collection_name` (None if it does not exist), cached for
+        COLLECTION_CACHE_TTL_SECONDS (COLLECTION_MISSING_TTL_SECONDS when missing)
+        instead of listing collections on every query.
+        """
+        cached = self._cached_collection(collection_name)
+        if cached:
+            return cached[0]
+
+        info = None
+        if self.breaker.call(self.client.collection_exists, collection_name):
+            info = self.breaker.call(self.client.get_collection, collection_name)
+        self._cache_collection(collection_name, info)
+        return info
+
+    async def acollection_info(self, collection_name: str) -> Optional[CollectionInfo]:
+        cached = self._cached_collection(collection_name)
+        if cached:
+            return cached[0]
+
+        info = None
+        if await self.breaker.acall(self.async_client.collection_exists, collection_name):
+            info = await self.breaker.acall(self.async_client.get_collection, collection_name)
+        self._cache_collection(collection_name, info)
+        return info
+
+    def collection_exists(self, collection_name: str) -> bool:
+        return self.collection_info(collection_name) is not None
+
+    async def acollection_exists(self, collection_name: str) -> bool:
+        return await self.acollection_info(collection_name) is not None
+
+    @staticmethod
+    def _supports_sparse(info: Optional[CollectionInfo]) -> bool:
+        return info is not None and SPARSE_VECTOR_NAME in (info.config.params.sparse_vectors or {})
+
+    def has_sparse_vectors(self, collection_name: Optional[str] = None) -> bool:
+        """Whether the collection was created with the BM25 sparse vector (hybrid-capable)."""
+        return self._supports_sparse(self.collection_info(collection_name or self.default_collection))
+
+    def validate_schema(self, collection_name: Optional[str] = None) -> List[str]:
+        """
+        Checks the live collection against the schema registry. Raises CollectionSchemaError
+        when its vector size differs from what the registered model embeds; returns softer
+        problems (missing sparse vectors, HNSW/quantization drift, legacy payloads) for the caller to log.
+        """
+        target_collection = collection_name or self.default_collection
+        info = self.collection_info(target_collection)
+        if info is None or target_collection not in COLLECTIONS:
+            return []
+        problems = schema_problems(COLLECTIONS[target_collection], info)
+
+        # Searches only project compact fields, so old-shape payloads would come back without text
+        sample, _ = self.breaker.call(self.client.scroll, collection_name=target_collection, limit=1, with_payload=True, with_vectors=False)
+        if sample and not is_compact(sample[0].payload or {}):
+            problems.append(f"payloads use a legacy shape; run python -m src.database.migrate_payloads {target_collection}")
+        return problems
+
+    def _query_kwargs(self, collection_name: str, info: CollectionInfo, query_vector: List[float], query_text: Optional[str], top_k: int) -> dict:
+        """
+        Dense-only query, or, with `query_text` on a hybrid collection, one request that
+        prefetches dense and BM25 candidates and fuses them with Reciprocal Rank Fusion.
+        The dense leg uses the registered HNSW ef and quantization rescoring.
+        """
+        schema = COLLECTIONS.get(collection_name)
+        params = schema.search_params() if schema else None
+        if not query_text or not self._supports_sparse(info):
+            return {"query": query_vector, "limit": top_k, "search_params": params}
+        prefetch_k = max(top_k * HYBRID_PREFETCH_MULTIPLIER, HYBRID_MIN_PREFETCH)
+        return {
+            "prefetch": [
+                Prefetch(query=query_vector, limit=prefetch_k, params=params),
+                Prefetch(query=get_sparse_encoder().encode_query(query_text), using=SPARSE_VECTOR_NAME, limit=prefetch_k),
+            ],
+            "query": FusionQuery(fusion=Fusion.RRF),
+            "limit": top_k,
+        }
+
+    def _query_requests(self, collection_name: str, info: CollectionInfo, query_vectors: List[List[float]], query_texts: List[Optional[str]], top_k: int, with_vectors: bool = False) -> List[QueryRequest]:
+        requests = []
+        for query_vector, query_text in zip(query_vectors, query_texts):
+            kwargs = self._query_kwargs(collection_name, info, query_vector, query_text, top_k)
+            # QueryRequest calls `query_points`' search_params just `params`
+            kwargs["params"] = kwargs.pop("search_params", None)
+            requests.append(QueryRequest(**kwargs, with_payload=SEARCH_FIELDS, with_vector=with_vectors))
+        return requests
+
+    @staticmethod
+    def _fuse(responses, top_k: int) -> RAGSearchResult:
+        """Reciprocal Rank Fusion of several ranked point lists, deduplicated by point ID."""
+        fused = {}
+        for response in responses:
+            for rank, point in enumerate(response.points):
+                score = fused[point.id][1] if point.id in fused else 0.0
+                fused[point.id] = (point, score + 1.0 / (RRF_K + rank + 1))
+        ranked = sorted(fused.values(), key=lambda item: item[1], reverse=True)[:top_k]
+        result = MedicalVectorStore._to_result([point for point, _ in ranked])
+        result.scores = [score for _, score in ranked]
+        return result
+
+    def invalidate_collections(self, collection_name: Optional[str] = None):
+        """Drops cached metadata, e.g. after creating or recreating a collection."""
+        with self._collections_lock:
+            if collection_name is None:
+                self._collections.clear()
+            else:
+                self._collections.pop(collection_name, None)
+
+    def upsert(
+        self,
+        ids: List[str],
+        vectors: List[List[float]],
+        payloads: List[dict],
+        collection_name: Optional[str] = None,
+        sparse_vectors: Optional[List[SparseVector]] = None
+    ):
+        """
+        Writes one batch of points. Callers stream fixed-size batches rather than a whole corpus.
+        With `sparse_vectors`, each point also gets its BM25 vector for hybrid search.
+        """
+        if sparse_vectors is not None:
+            vectors = {"": vectors, SPARSE_VECTOR_NAME: sparse_vectors}
+        self.breaker.call(
+            self.client.upsert,
+            collection_name=collection_name or self.default_collection,
+            points=Batch(ids=ids, vectors=vectors, payloads=payloads)
+        )
     
-    def search(self, query_vector: List[float], top_k: int = 3, collection_name: Optional[str] = None) -> RAGSearchResult:
+    def search(
+        self,
+        query_vector: List[float],
+        top_k: int = 3,
+        collection_name: Optional[str] = None,
+        query_text: Optional[str] = None,
+        with_vectors: bool = False
+    ) -> RAGSearchResult:
         """
         Search for clinical evidence. Now accepts a dynamic collection_name.
+        Pass `query_text` for hybrid (dense + BM25) search on collections that support it,
+        so exact codes and policy IDs are matched even when the embedding misses them.
+        `with_vectors` also returns each chunk's dense vector (for evidence de-duplication).
         """
         # Use the passed name, or fall back to the default
         target_collection = collection_name or self.default_collection
         
         try:
-            # Check if the collection exists before searching to avoid 404s
-            collections = self.client.get_collections().collections
-            existing_names = [c.name for c in collections]
-            
-            if target_collection not in existing_names:
-                print(f"⚠️ Warning: Collection '{target_collection}' not found. Available: {existing_names}")
+            # Check if the collection exists before searching to avoid 404s (cached, not a round trip)
+            info = self.collection_info(target_collection)
+            if info is None:
+                print(f"⚠️ Warning: Collection '{target_collection}' not found.")
                 return RAGSearchResult(contexts=[], sources=[], scores=[])
 
-            # Standard Qdrant Search
-            results = self.client.search(
+            # Standard Qdrant Search (hybrid when the collection has sparse vectors)
+            response = self.breaker.call(
+                self.client.query_points,
                 collection_name=target_collection,
-                query_vector=query_vector,
-                limit=top_k,
-                with_payload=True
+                # Projection: only the compact fields a hit needs come back
+                with_payload=SEARCH_FIELDS,
+                with_vectors=with_vectors,
+                **self._query_kwargs(target_collection, info, query_vector, query_text, top_k)
             )
-            
-            contexts = []
-            sources = []
-            scores = []
-            
-            for result in results:
-                # Use .get() to safely access 'text' or 'page_content' depending on your ingestion script
-                payload = result.payload
-                text = payload.get('text') or payload.get('page_content') or ""
-                source = payload.get('source') or payload.get('metadata', {}).get('source', 'Unknown')
-                
-                contexts.append(text)
-                sources.append(source)
-                scores.append(result.score)
-            
-            return RAGSearchResult(contexts=contexts, sources=sources, scores=scores)
+            return self._to_result(response.points)
             
         except Exception as e:
             print(f"⚠️ Vector search error in {target_collection}: {e}")
-            return RAGSearchResult(contexts=[], sources=[], scores=[])
\ No newline at end of file
+            return RAGSearchResult(contexts=[], sources=[], scores=[])
+
+    async def asearch(
+        self,
+        query_vector: List[float],
+        top_k: int = 3,
+        collection_name: Optional[str] = None,
+        query_text: Optional[str] = None,
+        with_vectors: bool = False
+    ) -> RAGSearchResult:
+        """
+        Async `search` on AsyncQdrantClient, sharing the collection cache and breaker.
+        """
+        target_collection = collection_name or self.default_collection
+
+        try:
+            info = await self.acollection_info(target_collection)
+            if info is None:
+                print(f"⚠️ Warning: Collection '{target_collection}' not found.")
+                return RAGSearchResult(contexts=[], sources=[], scores=[])
+
+            response = await self.breaker.acall(
+                self.async_client.query_points,
+                collection_name=target_collection,
+                # Projection: only the compact fields a hit needs come back
+                with_payload=SEARCH_FIELDS,
+                with_vectors=with_vectors,
+                **self._query_kwargs(target_collection, info, query_vector, query_text, top_k)
+            )
+            return self._to_result(response.points)
+
+        except Exception as e:
+            print(f"⚠️ Vector search error in {target_collection}: {e}")
+            return RAGSearchResult(contexts=[], sources=[], scores=[])
+
+    def search_many(
+        self,
+        query_vectors: List[List[float]],
+        top_k: int = 5,
+        collection_name: Optional[str] = None,
+        query_texts: Optional[List[str]] = None,
+        with_vectors: bool = False
+    ) -> RAGSearchResult:
+        """
+        Multi-query search: every (vector, text) variant goes to Qdrant in a single
+        `query_batch_points` round trip, and the result lists are fused with RRF.
+        Chunks several variants agree on rank first.
+        """
+        target_collection = collection_name or self.default_collection
+        query_texts = query_texts or [None] * len(query_vectors)
+
+        try:
+            info = self.collection_info(target_collection)
+            if info is None:
+                print(f"⚠️ Warning: Collection '{target_collection}' not found.")
+                return RAGSearchResult(contexts=[], sources=[], scores=[])
+
+            responses = self.breaker.call(
+                self.client.query_batch_points,
+                collection_name=target_collection,
+                requests=self._query_requests(target_collection, info, query_vectors, query_texts, top_k, with_vectors)
+            )
+            return self._fuse(responses, top_k)
+
+        except Exception as e:
+            print(f"⚠️ Multi-query search error in {target_collection}: {e}")
+            return RAGSearchResult(contexts=[], sources=[], scores=[])
+
+    async def asearch_many(
+        self,
+        query_vectors: List[List[float]],
+        top_k: int = 5,
+        collection_name: Optional[str] = None,
+        query_texts: Optional[List[str]] = None,
+        with_vectors: bool = False
+    ) -> RAGSearchResult:
+        """Async `search_many` on AsyncQdrantClient."""
+        target_collection = collection_name or self.default_collection
+        query_texts = query_texts or [None] * len(query_vectors)
+
+        try:
+            info = await self.acollection_info(target_collection)
+            if info is None:
+                print(f"⚠️ Warning: Collection '{target_collection}' not found.")
+                return RAGSearchResult(contexts=[], sources=[], scores=[])
+
+            responses = await self.breaker.acall(
+                self.async_client.query_batch_points,
+                collection_name=target_collection,
+                requests=self._query_requests(target_collection, info, query_vectors, query_texts, top_k, with_vectors)
+            )
+            return self._fuse(responses, top_k)
+
+        except Exception as e:
+            print(f"⚠️ Multi-query search error in {target_collection}: {e}")
+            return RAGSearchResult(contexts=[], sources=[], scores=[])
+
+    def search_batch(
+        self,
+        query_vectors: List[List[float]],
+        top_k: int = 5,
+        collection_name: Optional[str] = None,
+        query_texts: Optional[List[str]] = None,
+        with_vectors: bool = False
+    ) -> List[RAGSearchResult]:
+        """
+        Independent searches for many claims in one `query_batch_points` round trip;
+        one result per query vector, in order (unlike `search_many`, nothing is fused).
+        """
+        target_collection = collection_name or self.default_collection
+        query_texts = query_texts or [None] * len(query_vectors)
+
+        try:
+            info = self.collection_info(target_collection)
+            if info is None:
+                print(f"⚠️ Warning: Collection '{target_collection}' not found.")
+                return [RAGSearchResult(contexts=[], sources=[], scores=[]) for _ in query_vectors]
+
+            responses = self.breaker.call(
+                self.client.query_batch_points,
+                collection_name=target_collection,
+                requests=self._query_requests(target_collection, info, query_vectors, query_texts, top_k, with_vectors)
+            )
+            return [self._to_result(response.points) for response in responses]
+
+        except Exception as e:
+            print(f"⚠️ Batch search error in {target_collection}: {e}")
+            return [RAGSearchResult(contexts=[], sources=[], scores=[]) for _ in query_vectors]
+
+    async def asearch_batch(
+        self,
+        query_vectors: List[List[float]],
+        top_k: int = 5,
+        collection_name: Optional[str] = None,
+        query_texts: Optional[List[str]] = None,
+        with_vectors: bool = False
+    ) -> List[RAGSearchResult]:
+        """Async `search_batch` on AsyncQdrantClient."""
+        target_collection = collection_name or self.default_collection
+        query_texts = query_texts or [None] * len(query_vectors)
+
+        try:
+            info = await self.acollection_info(target_collection)
+            if info is None:
+                print(f"⚠️ Warning: Collection '{target_collection}' not found.")
+                return [RAGSearchResult(contexts=[], sources=[], scores=[]) for _ in query_vectors]
+
+            responses = await self.breaker.acall(
+                self.async_client.query_batch_points,
+                collection_name=target_collection,
+                requests=self._query_requests(target_collection, info, query_vectors, query_texts, top_k, with_vectors)
+            )
+            return [self._to_result(response.points) for response in responses]
+
+        except Exception as e:
+            print(f"⚠️ Batch search error in {target_collection}: {e}")
+            return [RAGSearchResult(contexts=[], sources=[], scores=[]) for _ in query_vectors]
+
+    @staticmethod
+    def _normalize_scores(scores: List[float]) -> np.ndarray:
+        """
+        Distribution-based normalization (as Qdrant's DBSF): mean +/- 3 std of one result
+        list maps to [0, 1], so cosine scores from different models and RRF scores compare.
+        """
+        values = np.asarray(scores, dtype=np.float64)
+        sigma = values.std()
+        if sigma == 0:
+            return np.full(len(values), 0.5)
+        return np.clip((values - (values.mean() - 3 * sigma)) / (6 * sigma), 0.0, 1.0)
+
+    @classmethod
+    def _merge_federated(cls, results: Dict[str, RAGSearchResult], latency_ms: Dict[str, float], top_k: int) -> FederatedSearchResult:
+        """One ranking over every collection: normalized scores times the collection's search_weight."""
+        hits = {}
+        for name, result in results.items():
+            if not result.contexts:
+                continue
+            weight = COLLECTIONS[name].search_weight if name in COLLECTIONS else 1.0
+            pages = result.pages or [None] * len(result.contexts)
+            for text, source, page, score in zip(result.contexts, result.sources, pages, weight * cls._normalize_scores(result.scores)):
+                # The same chunk loaded into two collections is kept once, at its best score
+                if text not in hits or score > hits[text][3]:
+                    hits[text] = (source, page, name, float(score))
+        ranked = sorted(hits.items(), key=lambda item: item[1][3], reverse=True)[:top_k]
+        return FederatedSearchResult(
+            contexts=[text for text, _ in ranked],
+            sources=[hit[0] for _, hit in ranked],
+            scores=[hit[3] for _, hit in ranked],
+            pages=[hit[1] for _, hit in ranked],
+            # Vectors from different models are not comparable, so none are returned
+            vectors=None,
+            collections=[hit[2] for _, hit in ranked],
+            latency_ms=latency_ms
+        )
+
+    def federated_search(self, queries: FederatedQueries, top_k: int = 5) -> FederatedSearchResult:
+        """
+        Searches several collections at once (one thread each) and merges them into one
+        ranking. `queries` maps each collection to query vectors from its own embedding
+        model; collections that do not exist are skipped.
+        """
+        queries = {name: q for name, q in queries.items() if self.collection_info(name) is not None}
+
+        def run(name: str) -> Tuple[RAGSearchResult, float]:
+            vectors, texts = queries[name]
+            start = time.perf_counter()
+            if len(vectors) > 1:
+                result = self.search_many(vectors, top_k=top_k, collection_name=name, query_texts=texts)
+            else:
+                result = self.search(vectors[0], top_k=top_k, collection_name=name, query_text=texts[0])
+            return result, 1000 * (time.perf_counter() - start)
+
+        if not queries:
+            return FederatedSearchResult(contexts=[], sources=[], scores=[])
+        with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+            outcomes = dict(zip(queries, pool.map(run, queries)))
+        return self._federated_result(outcomes, top_k)
+
+    async def afederated_search(self, queries: FederatedQueries, top_k: int = 5) -> FederatedSearchResult:
+        """Async `federated_search`: the per-collection searches run concurrently on the event loop."""
+        infos = await asyncio.gather(*(self.acollection_info(name) for name in queries))
+        queries = {name: q for (name, q), info in zip(queries.items(), infos) if info is not None}
+
+        async def run(name: str) -> Tuple[RAGSearchResult, float]:
+            vectors, texts = queries[name]
+            start = time.perf_counter()
+            if len(vectors) > 1:
+                result = await self.asearch_many(vectors, top_k=top_k, collection_name=name, query_texts=texts)
+            else:
+                result = await self.asearch(vectors[0], top_k=top_k, collection_name=name, query_text=texts[0])
+            return result, 1000 * (time.perf_counter() - start)
+
+        outcomes = dict(zip(queries, await asyncio.gather(*(run(name) for name in queries))))
+        return self._federated_result(outcomes, top_k)
+
+    def _federated_result(self, outcomes: Dict[str, Tuple[RAGSearchResult, float]], top_k: int) -> FederatedSearchResult:
+        latency_ms = {name: round(ms, 1) for name, (_, ms) in outcomes.items()}
+        for name, ms in latency_ms.items():
+            FEDERATED_SEARCH_LATENCY.labels(name).observe(ms / 1000)
+        if not outcomes:
+            return FederatedSearchResult(contexts=[], sources=[], scores=[])
+        return self._merge_federated({name: result for name, (result, _) in outcomes.items()}, latency_ms, top_k)
+
+    @staticmethod
+    def _to_result(points) -> RAGSearchResult:
+        contexts = []
+        sources = []
+        scores = []
+        pages = []
+        vectors = []
+
+        for result in points:
+            # Compact payload schema (src/ingestion/payload_schema.py)
+            payload = result.payload or {}
+            text = payload.get(TEXT_FIELD, "")
+            source = payload.get(SOURCE_FIELD, "Unknown")
+            page = payload.get(PAGE_FIELD)
+            # Hybrid collections return {"": dense, "sparse": ...}
+            vector = result.vector.get("") if isinstance(result.vector, dict) else result.vector
+
+            contexts.append(text)
+            sources.append(source)
+            scores.append(result.score)
+            pages.append(page)
+            vectors.append(vector)
+
+        return RAGSearchResult(
+            contexts=contexts,
+            sources=sources,
+            scores=scores,
+            pages=pages,
+            vectors=vectors if all(v is not None for v in vectors) else None
+        )
+
+    def lookup_codes(self, codes: List[str], top_k: int = 5, collection_name: Optional[str] = None) -> RAGSearchResult:
+        """
+        Exact CPT/HCPCS/ICD-10 lookup through the in-process code index. No embedding
+        call; returns an empty result when none of the codes are indexed.
+        """
+        target_collection = collection_name or self.default_collection
+        try:
+            # Lookups are dict reads; only the scrolls of a rebuild go through the breaker
+            hits = self._code_index(target_collection).lookup(codes, limit=top_k)
+        except Exception as e:
+            print(f"⚠️ Code index lookup error in {target_collection}: {e}")
+            return RAGSearchResult(contexts=[], sources=[], scores=[])
+
+        return RAGSearchResult(
+            contexts=[hit.text for hit in hits],
+            sources=[hit.source for hit in hits],
+            # Exact matches outrank any cosine similarity
+            scores=[1.0] * len(hits)
+        )
+
+    def _code_index(self, collection_name: str) -> CodeIndex:
+        if collection_name not in self.code_indexes:
+            self.code_indexes[collection_name] = CodeIndex(self.client, collection_name, breaker=self.breaker)
+        return self.code_indexes[collection_name]
+
+    async def alookup_codes(self, codes: List[str], top_k: int = 5, collection_name: Optional[str] = None) -> RAGSearchResult:
+        """
+        Async `lookup_codes`. A fresh index is read in place; an expired one rebuilds
+        with blocking scrolls, so that lookup runs off the event loop.
+        """
+        if self._code_index(collection_name or self.default_collection).is_stale():
+            return await asyncio.to_thread(self.lookup_codes, codes, top_k, collection_name)
+        return self.lookup_codes(codes, top_k, collection_name)
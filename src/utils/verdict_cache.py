@@ -0,0 +1,197 @@
+import hashlib
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set, Tuple
+
+import numpy as np
+
+from src.ingestion.code_index import extract_codes
+from src.ingestion.conditioning import normalize_medical_terms
+from src.ingestion.coverage_table import COVERAGE_TABLE_PATH, POLICY_ID_PATTERN, CoverageTable
+from src.ingestion.manifest import IngestionManifest, default_manifest_path
+from src.utils.metrics import VERDICT_CACHE_LOOKUPS
+
+VERDICT_CACHE_SIMILARITY = float(os.getenv("VERDICT_CACHE_SIMILARITY", "0.90"))
+VERDICT_CACHE_TTL_SECONDS = float(os.getenv("VERDICT_CACHE_TTL_SECONDS", "86400"))
+VERDICT_CACHE_MAX_ENTRIES = int(os.getenv("VERDICT_CACHE_MAX_ENTRIES", "10000"))
+
+# Size of the hashed n-gram vectors used for the semantic tier
+FEATURE_DIMENSIONS = 2048
+NEGATION_PATTERN = re.compile(r"\b(?:not|no|non|never|without|excluded?)\b")
+NUMBER_PATTERN = re.compile(r"\b\d+(?:\.\d+)?\b")
+# Function words and boilerplate that reword a claim without changing the question
+FILLER_WORDS = frozenset(
+    "a an the is are was does do did can will would should be for of in on under by to with "
+    "and or this that it its my me i medicare cpt hcpcs code codes procedure service services".split()
+)
+
+
+def normalize_claim(text: str) -> str:
+    """Canonical claim text: abbreviations expanded, lowercased, punctuation and spacing collapsed."""
+    text = re.sub(r"[^\w.\s]", " ", normalize_medical_terms(text).lower())
+    return " ".join(word.strip(".") for word in text.split() if word.strip("."))
+
+
+def claim_vector(normalized: str) -> np.ndarray:
+    """
+    Local signed-hash vector over words, word bigrams and character trigrams.
+    Good enough to spot rewordings of the same question, and needs no API call.
+    """
+    words = [w for w in normalized.split() if w not in FILLER_WORDS] or normalized.split()
+    padded = f" {' '.join(words)} "
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    features += [padded[i : i + 3] for i in range(len(padded) - 2)]
+
+    vector = np.zeros(FEATURE_DIMENSIONS, dtype=np.float32)
+    for feature in features:
+        h = zlib.crc32(feature.encode("utf-8"))
+        vector[h % FEATURE_DIMENSIONS] += 1.0 if h >> 31 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def claim_guard(text: str) -> tuple:
+    """
+    What a semantic match must agree on exactly: "Is 0058T covered?" and "Is 0059T covered?"
+    (or "type 1" / "type 2") are near-identical as text but are different questions, as is
+    a negated wording.
+    """
+    policies = sorted(set(POLICY_ID_PATTERN.findall(text.upper())))
+    numbers = sorted(set(NUMBER_PATTERN.findall(text)))
+    return tuple(extract_codes(text)), tuple(policies), tuple(numbers), bool(NEGATION_PATTERN.search(text.lower()))
+
+
+_versions: Dict[str, tuple] = {}
+_versions_lock = threading.Lock()
+
+
+def policy_version(collection_name: str) -> str:
+    """
+    Fingerprint of the policy content behind `collection_name`: the ingested files' content
+    hashes (from the ingestion manifest) plus the coverage table's sources. Only a `stat` per
+    call; re-hashed when either file changes, so re-ingesting a policy changes the version.
+    """
+    paths = (default_manifest_path(collection_name), COVERAGE_TABLE_PATH)
+    stamp = tuple(os.path.getmtime(p) if os.path.exists(p) else None for p in paths)
+    with _versions_lock:
+        cached = _versions.get(collection_name)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+        digest = hashlib.sha256()
+        for path, entry in sorted(IngestionManifest.load(paths[0]).entries.items()):
+            digest.update(f"{path}:{entry['sha256']}\n".encode("utf-8"))
+        for source, doc_hash in sorted(CoverageTable.load(paths[1]).sources.items()):
+            digest.update(f"coverage:{source}:{doc_hash}\n".encode("utf-8"))
+        version = digest.hexdigest()[:16]
+        _versions[collection_name] = (stamp, version)
+        return version
+
+
+@dataclass
+class CachedVerdict:
+    result: Any
+    guard: tuple
+    vector: np.ndarray
+    created_at: float
+
+
+class VerdictCache:
+    """
+    In-process cache of final audit states in front of the graph.
+    Tier 1 is an exact match on the normalized claim. Tier 2 is the nearest cached claim
+    (cosine over local n-gram vectors) with the same codes, policy and negation, above
+    `similarity`. Every entry belongs to one policy version; a new version empties the cache.
+    """
+
+    def __init__(
+        self,
+        similarity: float = VERDICT_CACHE_SIMILARITY,
+        ttl_seconds: float = VERDICT_CACHE_TTL_SECONDS,
+        max_entries: int = VERDICT_CACHE_MAX_ENTRIES,
+    ):
+        self.similarity = similarity
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.version: Optional[str] = None
+        self._entries: "OrderedDict[str, CachedVerdict]" = OrderedDict()  # LRU order
+        self._by_guard: Dict[tuple, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(normalized: str) -> str:
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _set_version(self, version: str) -> None:
+        if version != self.version:
+            if self._entries:
+                print(f"♻️ Policy version changed ({self.version} -> {version}); dropping {len(self._entries)} cached verdicts")
+            self._entries.clear()
+            self._by_guard.clear()
+            self.version = version
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        keys = self._by_guard[entry.guard]
+        keys.discard(key)
+        if not keys:
+            del self._by_guard[entry.guard]
+
+    def _expired(self, entry: CachedVerdict) -> bool:
+        return time.time() - entry.created_at > self.ttl_seconds
+
+    def get(self, claim: str, version: str) -> Optional[Tuple[Any, str]]:
+        """Returns (cached final state, "exact" | "semantic"), or None on a miss."""
+        normalized = normalize_claim(claim)
+        key = self.key(normalized)
+        with self._lock:
+            self._set_version(version)
+
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry):
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                VERDICT_CACHE_LOOKUPS.labels("exact").inc()
+                return entry.result, "exact"
+
+            candidates = []
+            for candidate_key in list(self._by_guard.get(claim_guard(claim), ())):
+                if self._expired(self._entries[candidate_key]):
+                    self._remove(candidate_key)
+                else:
+                    candidates.append(candidate_key)
+            if candidates:
+                scores = np.stack([self._entries[k].vector for k in candidates]) @ claim_vector(normalized)
+                best = int(np.argmax(scores))
+                if scores[best] >= self.similarity:
+                    self._entries.move_to_end(candidates[best])
+                    VERDICT_CACHE_LOOKUPS.labels("semantic").inc()
+                    return self._entries[candidates[best]].result, "semantic"
+
+        VERDICT_CACHE_LOOKUPS.labels("miss").inc()
+        return None
+
+    def put(self, claim: str, version: str, result: Any) -> None:
+        normalized = normalize_claim(claim)
+        key = self.key(normalized)
+        entry = CachedVerdict(result, claim_guard(claim), claim_vector(normalized), time.time())
+        with self._lock:
+            if self.version is not None and version != self.version:
+                return  # Policies were re-ingested while this audit ran; its verdict is stale
+            self._set_version(version)
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._by_guard.setdefault(entry.guard, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
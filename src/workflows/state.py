@@ -8,4 +8,8 @@ class AgentState(TypedDict):
     evidence_text: str
     audit_result: Dict[str, Any]
     retry_count: int
-    needs_web_search: bool
\ No newline at end of file
+    needs_web_search: bool
+    # Set once Tavily has run, so the router escalates to the web at most once
+    web_search_done: bool
+    query_variants: List[str]
+    evidence_tokens: Dict[str, int]
\ No newline at end of file
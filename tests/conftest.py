@@ -0,0 +1,23 @@
+import importlib.util
+import os
+import sys
+import tempfile
+
+# Token counting works offline from the cl100k_base file llama-index ships (located
+# before src/ goes on the path: src/workflows shadows llama-index's `workflows` package)
+_llama_index = importlib.util.find_spec("llama_index.core")
+if _llama_index is not None:
+    os.environ.setdefault("TIKTOKEN_CACHE_DIR", os.path.join(os.path.dirname(_llama_index.origin), "_static", "tiktoken_cache"))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The app imports both `src.utils...` and bare `agents...` (src on the path, as in the container)
+for path in (ROOT, os.path.join(ROOT, "src")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("LLM_CACHE_BACKEND", "memory")
+# Caches and the job store that modules open at import time stay out of data/
+_scratch = tempfile.mkdtemp(prefix="clinaudit-tests-")
+os.environ.setdefault("EMBEDDING_CACHE_PATH", os.path.join(_scratch, "embedding_cache.sqlite3"))
+os.environ.setdefault("JOBS_DB_PATH", os.path.join(_scratch, "audit_jobs.sqlite3"))
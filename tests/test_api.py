@@ -0,0 +1,30 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import src.main as main
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+def test_batch_rejects_bad_max_concurrency(client):
+    response = client.post("/analyze/batch", json={"claims": ["Is 0058T covered?"], "max_concurrency": "many"})
+    assert response.status_code == 400
+
+
+def test_batch_rejects_oversized_batches(client, monkeypatch):
+    monkeypatch.setattr(main, "BATCH_MAX_CLAIMS", 2)
+    response = client.post("/analyze/batch", json={"claims": ["a", "b", "c"]})
+    assert response.status_code == 400
+
+
+def test_batch_failures_are_server_errors(client, monkeypatch):
+    async def broken(claims, max_concurrency):
+        raise RuntimeError("qdrant exploded")
+
+    monkeypatch.setattr(main, "audit_batch", broken)
+    response = client.post("/analyze/batch", json={"claims": ["Is 0058T covered?"]})
+    assert response.status_code == 500
+    assert response.json()["detail"] == "qdrant exploded"
@@ -0,0 +1,74 @@
+import pytest
+
+from src.agents.auditor import TIER0_MIN_CONFIDENCE, evidence_rules
+
+CLAIM = "Is CPT 0058T covered?"
+
+
+def test_conditional_coverage_sentence_is_not_a_fail():
+    evidence = "CPT 0058T is covered when the criteria below are met. Services that do not meet these criteria are not covered."
+    result = evidence_rules(CLAIM, evidence)
+    assert result["verdict"] == "PASS"
+    assert result["confidence"] < TIER0_MIN_CONFIDENCE
+
+
+def test_negated_exclusion_is_not_a_fail():
+    result = evidence_rules(CLAIM, "0058T is not excluded from coverage.")
+    assert result["verdict"] == "PASS"
+    assert result["confidence"] < TIER0_MIN_CONFIDENCE
+
+
+def test_sentence_level_fail_is_only_a_hint():
+    result = evidence_rules(CLAIM, "Cryopreservation of ovarian tissue (0058T) is\nnot covered by Medicare.")
+    assert result["verdict"] == "FAIL"
+    assert result["confidence"] < TIER0_MIN_CONFIDENCE
+
+
+def test_table_row_fail_is_confident():
+    evidence = "Group 1 Codes: non-covered services\nCODE | DESCRIPTION\n0058T | Cryopreservation ovary tiss (non-covered)"
+    result = evidence_rules(CLAIM, evidence)
+    assert result["verdict"] == "FAIL"
+    assert result["confidence"] >= TIER0_MIN_CONFIDENCE
+
+
+def test_code_in_another_sentence_than_the_exclusion():
+    evidence = "0058T is listed in Group 1.\nExperimental services are excluded."
+    assert evidence_rules(CLAIM, evidence)["verdict"] == "PASS"
+
+
+@pytest.mark.parametrize("claim", ["Aspirin prevents heart attacks", "Is 0058T covered?"])
+def test_no_verdict_without_mentions(claim):
+    assert evidence_rules(claim, "Nothing relevant here.") is None
+
+
+def test_coverage_verdict_reports_the_non_covered_row(monkeypatch):
+    from src.agents import auditor
+    from src.ingestion.coverage_table import COVERED, NON_COVERED, CoverageRecord, CoverageTable
+
+    table = CoverageTable()
+    table.replace_source("a.pdf", [CoverageRecord("0058T", "Covered elsewhere", COVERED, "L11111", source="a.pdf")])
+    table.replace_source("b.pdf", [CoverageRecord("0058T", "Cryopreservation ovary tiss", NON_COVERED, "L34555", source="b.pdf")])
+    monkeypatch.setattr(auditor, "get_coverage_table", lambda: table)
+
+    result = auditor.coverage_verdict(CLAIM)
+    assert result["verdict"] == "FAIL"
+    assert result["issues"] == ["0058T listed as non-covered under L34555: Cryopreservation ovary tiss"]
+
+
+PASS_JSON = '{"faithfulness_score": 0.9, "verdict": "PASS", "supported_claims": 1, "unsupported_claims": 0, "issues": [], "confidence": 0.9}'
+
+
+def test_unrelated_non_covered_sentence_does_not_override_the_model():
+    from src.agents.auditor import _parse_verdict
+
+    evidence = "CODE | DESCRIPTION | STATUS\n0058T | Cryopreservation ovary tiss | Covered\nCosmetic services are non-covered."
+    assert _parse_verdict(PASS_JSON, CLAIM, evidence)["verdict"] == "PASS"
+
+
+def test_non_covered_table_row_overrides_the_model():
+    from src.agents.auditor import _parse_verdict
+
+    evidence = "0058T | Cryopreservation ovary tiss | Non-covered"
+    result = _parse_verdict(PASS_JSON, CLAIM, evidence)
+    assert result["verdict"] == "FAIL"
+    assert "Manual Override: Non-covered code detected in text." in result["issues"]
@@ -0,0 +1,28 @@
+import pytest
+
+from src.ingestion.code_index import extract_codes
+
+
+@pytest.mark.parametrize("text, codes", [
+    ("Is CPT 0058T covered?", ["0058T"]),
+    ("Is 99213 covered under L34555?", ["99213"]),
+    ("CPT 99213 and 99214 were billed", ["99213", "99214"]),
+    ("HCPCS J1234 for type 2 diabetes, ICD-10 E11.65", ["E11.65", "J1234"]),
+    ("Diagnosis I10 with procedure 93000", ["93000", "I10"]),
+    ("0042T\nCt perfusion w/contrast cbf\n99213\nOffice visit", ["0042T", "99213"]),
+])
+def test_extracts_codes(text, codes):
+    assert extract_codes(text) == codes
+
+
+@pytest.mark.parametrize("text", [
+    "Palmetto GBA A and B MAC 10111 - MAC A, 10112 - MAC B",
+    "Contract Number 10111",
+    "PO Box 100238, Columbia, SC 29202",
+    "ZIP 29202",
+    "See LCD L 34555 and article A 56759",
+    "01/01/2019 R28 Under Group 1: revision",
+    "Vitamin B12 deficiency",
+])
+def test_ignores_numbers_that_are_not_codes(text):
+    assert extract_codes(text) == []
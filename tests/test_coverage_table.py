@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from tests.conftest import ROOT
+
+pytest.importorskip("fitz")
+
+from src.ingestion.coverage_table import NON_COVERED, CoverageTable, extract_coverage_rows
+
+LCD_PDF = os.path.join(ROOT, "data", "policies", "LCD_L34555_NonCovered_Codes.pdf.pdf")
+
+
+@pytest.fixture(scope="module")
+def rows():
+    return extract_coverage_rows(LCD_PDF)
+
+
+def test_only_code_tables_are_extracted(rows):
+    codes = {r.code for r in rows}
+    assert {"0042T", "0058T", "0174T", "0478T"} <= codes
+    # Revision history numbers, contract numbers and the "Not Applicable" filler row
+    assert not {c for c in codes if c.startswith("R")}
+    assert not codes & {"10111", "10112", "99999"}
+    assert all(r.description and r.description.lower() != "not applicable" for r in rows)
+    assert len(rows) == 185
+
+
+def test_rows_carry_the_document_status(rows):
+    assert {r.policy_id for r in rows} == {"L34555"}
+    assert {r.status for r in rows} == {NON_COVERED}
+
+
+def test_row_status_wins_over_inherited_status():
+    from src.ingestion.coverage_table import COVERED, _row_record
+
+    record = _row_record(["0042T", "Ct perfusion w/contrast cbf", "Covered"], NON_COVERED, "L34555", (None, None), "x.pdf")
+    assert record.status == COVERED
+
+
+def test_lookup_by_code(rows):
+    table = CoverageTable()
+    table.replace_source(os.path.basename(LCD_PDF), rows)
+    assert table.is_covered("0058T", "L34555") is False
+    assert table.is_covered("10111") is None
+
+
+def test_rows_carry_the_policy_effective_window(tmp_path):
+    from src.ingestion.coverage_table import build_coverage_table
+
+    table = build_coverage_table([LCD_PDF], path=str(tmp_path / "coverage_table.json"))
+    (row,) = table.lookup("0058T", "L34555")
+    # Latest revision effective date; "Retirement Date N/A" keeps it open-ended,
+    # and the notice period (08/17/2017-10/01/2017) is ignored
+    assert (row.effective_from, row.effective_to) == ("2019-01-01", None)
+    assert table.lookup("0058T", "L34555", on_date="2026-10-18") == [row]
+    assert table.lookup("0058T", "L34555", on_date="2018-06-01") == []
+
+
+def test_document_dates():
+    from src.ingestion.coverage_table import _document_dates
+
+    header = "Revision Effective Date\nFor services performed on or after 03/01/2020\nRetirement Date\n12/31/2022\nNotice Period End Date 10/01/2017"
+    assert _document_dates(header) == ("2020-03-01", "2022-12-31")
@@ -0,0 +1,39 @@
+import sqlite3
+
+from src.utils.embedding_cache import EmbeddingCache
+
+
+def _last_used(path, cache, text):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT last_used FROM embeddings WHERE key = ?", (cache.key("m", text),)).fetchone()[0]
+
+
+def test_hits_are_written_lazily(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = EmbeddingCache(path)
+    cache.put_many("m", ["a"], [[1.0, 2.0]])
+    written = _last_used(path, cache, "a")
+
+    assert cache.get_many("m", ["a", "b"]) == [[1.0, 2.0], None]
+    assert _last_used(path, cache, "a") == written
+    cache.flush()
+    assert _last_used(path, cache, "a") > written
+
+
+def test_eviction_keeps_most_recently_used(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), max_entries=3)
+    for text, vector in (("a", [1.0]), ("b", [2.0]), ("c", [3.0])):
+        cache.put_many("m", [text], [vector])
+    cache.get_many("m", ["a"])
+    cache.put_many("m", ["d"], [[4.0]])
+
+    assert cache.get_many("m", ["a", "b", "c", "d"]) == [[1.0], None, [3.0], [4.0]]
+    assert cache._count == 3
+
+
+def test_running_count_ignores_existing_keys(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"))
+    cache.put_many("m", ["a", "b"], [[1.0], [2.0]])
+    cache.put_many("m", ["a ", "c"], [[1.0], [3.0]])
+    assert cache._count == 3
+    assert EmbeddingCache(cache.path)._count == 3
@@ -0,0 +1,32 @@
+import shutil
+
+from qdrant_client import QdrantClient
+
+from benchmarks.fakes import HashEmbeddings
+from src.database.collections import get_schema
+from src.ingestion import manifest
+from src.ingestion.embedding_pipeline import EmbeddingPipeline
+from src.utils import ingest, verdict_cache
+from src.utils.vector_store import MedicalVectorStore
+from tests.test_coverage_table import LCD_PDF
+
+
+def test_run_ingestion_changes_the_policy_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(manifest, "MANIFEST_DIR", str(tmp_path / "manifests"))
+    monkeypatch.setattr(verdict_cache, "COVERAGE_TABLE_PATH", str(tmp_path / "coverage_table.json"))
+    client = QdrantClient(":memory:")
+    vs = MedicalVectorStore(client=client)
+    pipeline = EmbeddingPipeline.from_langchain(HashEmbeddings(get_schema(vs.default_collection).dimensions))
+    pdf_path = str(tmp_path / "policy.pdf")
+    shutil.copy(LCD_PDF, pdf_path)
+
+    before = verdict_cache.policy_version(vs.default_collection)
+    ingest.run_ingestion(pdf_path, vs=vs, pipeline=pipeline)
+    after = verdict_cache.policy_version(vs.default_collection)
+    assert after != before
+
+    points = client.count(vs.default_collection, exact=True).count
+    # Same file again: same points, same version
+    ingest.run_ingestion(pdf_path, vs=vs, pipeline=pipeline)
+    assert client.count(vs.default_collection, exact=True).count == points
+    assert verdict_cache.policy_version(vs.default_collection) == after
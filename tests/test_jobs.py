@@ -0,0 +1,51 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+from tests.conftest import ROOT
+
+
+def test_main_imports_without_inngest_configuration(tmp_path):
+    env = {k: v for k, v in os.environ.items() if k not in ("INNGEST_DEV", "INNGEST_SIGNING_KEY", "JOBS_EXECUTOR")}
+    env["JOBS_DB_PATH"] = str(tmp_path / "jobs.sqlite3")
+    result = subprocess.run(
+        [sys.executable, "-c", "import src.main as m; from api.jobs import JOBS_EXECUTOR; print(JOBS_EXECUTOR)"],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "local"
+
+
+@pytest.fixture
+def jobs_module(tmp_path, monkeypatch):
+    monkeypatch.setenv("JOBS_DB_PATH", str(tmp_path / "jobs.sqlite3"))
+    from api import jobs
+    return jobs
+
+
+@pytest.mark.parametrize("url", [
+    "ftp://example.com/hook",
+    "file:///etc/passwd",
+    "http://127.0.0.1:6333/collections",
+    "http://localhost/hook",
+    "http://10.0.0.5/hook",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://[::1]/hook",
+])
+def test_webhook_rejects_internal_targets(jobs_module, url):
+    with pytest.raises(jobs_module.WebhookNotAllowedError):
+        asyncio.run(jobs_module.check_webhook_url(url))
+
+
+def test_webhook_allowlist(jobs_module, monkeypatch):
+    monkeypatch.setattr(jobs_module, "JOBS_WEBHOOK_ALLOWED_HOSTS", ["hooks.example.org"])
+    with pytest.raises(jobs_module.WebhookNotAllowedError, match="JOBS_WEBHOOK_ALLOWED_HOSTS"):
+        asyncio.run(jobs_module.check_webhook_url("https://attacker.example.net/hook"))
+
+
+def test_submit_rejects_webhook_before_queueing(jobs_module):
+    with pytest.raises(jobs_module.WebhookNotAllowedError):
+        asyncio.run(jobs_module.submit_job("CPT 0058T is covered", "http://127.0.0.1/hook"))
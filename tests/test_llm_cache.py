@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from src.utils import llm_cache
+
+
+class EchoModel:
+    """Minimal temperature-0 chat model returning queued answers."""
+
+    _identifying_params = {"model_name": "echo", "temperature": 0}
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = 0
+
+    def invoke(self, prompt, **kwargs):
+        self.calls += 1
+        return AIMessage(content=self.answers.pop(0))
+
+    async def ainvoke(self, prompt, **kwargs):
+        return self.invoke(prompt, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def memory_cache(monkeypatch):
+    monkeypatch.setattr(llm_cache, "_default_cache", llm_cache.MemoryLLMCache())
+
+
+def test_invalid_answers_are_not_cached():
+    model = EchoModel("not json", '{"ok": true}', "unused")
+    is_json = lambda content: content.startswith("{")
+
+    assert llm_cache.cached_invoke(model, "p", "t", "1", validate=is_json).content == "not json"
+    assert llm_cache.cached_invoke(model, "p", "t", "1", validate=is_json).content == '{"ok": true}'
+    assert llm_cache.cached_invoke(model, "p", "t", "1", validate=is_json).content == '{"ok": true}'
+    assert model.calls == 2
+
+
+def test_async_path_uses_the_cache():
+    model = EchoModel("a", "b")
+    first = asyncio.run(llm_cache.acached_invoke(model, "p", "t", "1"))
+    second = asyncio.run(llm_cache.acached_invoke(model, "p", "t", "1"))
+    assert first.content == second.content == "a"
+    assert model.calls == 1
+
+
+def test_auditor_only_caches_parseable_verdicts():
+    from src.agents.auditor import _is_verdict
+
+    assert not _is_verdict("I cannot help with that.")
+    assert _is_verdict('```json\n{"faithfulness_score": 0.0, "verdict": "FAIL", "confidence": 0.9,}\n```')
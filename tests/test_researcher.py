@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.models import Distance, PointStruct, VectorParams
+
+from benchmarks.fakes import HashEmbeddings
+from src.agents import researcher
+from src.utils.vector_store import MedicalVectorStore
+
+
+@pytest.fixture
+def only_primary(monkeypatch):
+    client, async_client = QdrantClient(":memory:"), AsyncQdrantClient(":memory:")
+    config = VectorParams(size=8, distance=Distance.COSINE)
+    client.create_collection(researcher.COLLECTION_NAME, vectors_config=config)
+    asyncio.run(async_client.create_collection(researcher.COLLECTION_NAME, vectors_config=config))
+    monkeypatch.setattr(researcher, "vs", MedicalVectorStore(client=client, async_client=async_client))
+    monkeypatch.setattr(researcher, "FEDERATED_COLLECTIONS", [researcher.COLLECTION_NAME, "medical_knowledge", "pubmed_docs"])
+    embedders = {}
+    monkeypatch.setattr(researcher, "_embedder", lambda name: embedders.setdefault(name, HashEmbeddings(8)))
+    return embedders
+
+
+def test_missing_collections_are_not_embedded_for(only_primary):
+    researcher.federated_search("Is 0058T covered?", ["Is 0058T covered?"], top_k=3)
+    assert set(only_primary) == {researcher.COLLECTION_NAME}
+
+
+def test_async_missing_collections_are_not_embedded_for(only_primary):
+    asyncio.run(researcher.afederated_search("Is 0058T covered?", ["Is 0058T covered?"], top_k=3))
+    assert set(only_primary) == {researcher.COLLECTION_NAME}
+    assert only_primary[researcher.COLLECTION_NAME].calls == 1
+
+
+def test_batch_uses_the_code_fast_path(only_primary, monkeypatch):
+    researcher.vs.client.upsert(researcher.COLLECTION_NAME, points=[
+        PointStruct(id=1, vector=[1.0] + [0.0] * 7, payload={"text": "0058T Cryopreservation ovary tiss", "source": "lcd.pdf", "codes": ["0058T"]}),
+    ])
+    embeddings = HashEmbeddings(8)
+    monkeypatch.setattr(researcher, "embeddings", embeddings)
+
+    updates = asyncio.run(researcher.aresearch_batch(["Is CPT 0058T covered?"]))
+    assert "0058T Cryopreservation ovary tiss" in updates[0]["evidence_text"]
+    assert embeddings.calls == 0
@@ -0,0 +1,37 @@
+import pytest
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.models import Distance, PointStruct, VectorParams
+
+from src.utils import vector_store
+from src.utils.vector_store import MedicalVectorStore
+
+
+@pytest.fixture
+def store():
+    client = QdrantClient(":memory:")
+    client.create_collection("policies", vectors_config=VectorParams(size=4, distance=Distance.COSINE))
+    client.upsert("policies", points=[
+        PointStruct(id=1, vector=[1.0, 0.0, 0.0, 0.0], payload={"text": "0058T Cryopreservation ovary tiss", "source": "lcd.pdf", "codes": ["0058T"]}),
+    ])
+    return MedicalVectorStore(client=client, async_client=AsyncQdrantClient(":memory:"))
+
+
+def test_breaker_sees_qdrant_calls_not_index_reads(store):
+    assert store.lookup_codes(["0058T"], collection_name="policies").contexts == ["0058T Cryopreservation ovary tiss"]
+    calls = len(store.breaker._outcomes)
+    assert calls >= 1
+    for _ in range(10):
+        store.lookup_codes(["0058T"], collection_name="policies")
+    assert len(store.breaker._outcomes) == calls
+
+
+def test_missing_collection_is_rechecked_sooner(store, monkeypatch):
+    assert store.collection_info("later") is None
+    store.client.create_collection("later", vectors_config=VectorParams(size=4, distance=Distance.COSINE))
+    assert store.collection_info("later") is None
+    monkeypatch.setattr(vector_store, "COLLECTION_MISSING_TTL_SECONDS", 0)
+    assert store.collection_info("later") is not None
+    # An existing collection keeps the long TTL
+    monkeypatch.setattr(vector_store, "COLLECTION_CACHE_TTL_SECONDS", 300)
+    store.client.delete_collection("later")
+    assert store.collection_info("later") is not None
@@ -0,0 +1,27 @@
+from langchain_core.messages import HumanMessage
+
+from src.agents import tavily_search
+from src.agents.auditor import _evidence_needs_web
+from src.agents.router import routing_logic
+
+LOW_SCORE = {"faithfulness_score": 0.3, "verdict": "PASS"}
+
+
+def test_web_results_become_the_evidence():
+    update = tavily_search._web_update({"results": [{"url": "https://cms.gov/lcd", "content": "0058T is non-covered."}]})
+    assert update["web_search_done"] is True
+    assert "[https://cms.gov/lcd] 0058T is non-covered." in update["evidence_text"]
+    assert not _evidence_needs_web(update["evidence_text"])
+
+
+def test_missing_tavily_key_still_ends_the_escalation(monkeypatch):
+    monkeypatch.delenv("TAVILY_API_KEY", raising=False)
+    update = tavily_search.web_search_node({"messages": [HumanMessage(content="Is 0058T covered?")]})
+    assert update["web_search_done"] is True
+    assert update["evidence_text"].startswith("ERROR:")
+
+
+def test_router_escalates_to_the_web_once():
+    state = {"audit_result": LOW_SCORE, "retry_count": 2, "needs_web_search": True}
+    assert routing_logic(state) == "tavily_search"
+    assert routing_logic({**state, "web_search_done": True}) == "finalize"